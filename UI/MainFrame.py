@@ -10,23 +10,42 @@ import wx
 # begin wxGlade: extracode
 from utils.file_handler import FileHandler
 from utils.settings_manager import SettingsManager
-from utils.worker import convert_async
+from utils.conversion_process import ConversionProcess, RemoteConverter
 from utils.tab_manager import init_tab_manager
 from UI.Parameters import Parameters
 from UI.Position import Position
+from UI.Restart import Restart
 from UI.Speed import Speed
-from core.rendering.visualization import ModelVisualisation
 from core.model.position_presets import PositionPresets
-import logging, os
+from core.Domain.conversion_context import ConversionContext
+from core.Domain.gcode_reader import GCodeReader
+from core.Domain.move_filter import MoveFilter
+from core.Domain.toolpath_cache import ToolpathCache
+import logging, os, time
 # end wxGlade
 
 
 class MainFrame(wx.Frame):
+    GCODE_PREVIEW_LIMIT = 2 * 1024 * 1024
+
     def __init__(self, *args, **kwds):
         # begin wxGlade: MainFrame.__init__
         self.position_presets = PositionPresets()
         self.settings_manager = SettingsManager()
         self.app_settings = self.settings_manager.load_all_settings()
+        self.gcode_reader = None
+        self.toolpath_cache = ToolpathCache.from_settings(self.app_settings)
+        self.last_converter = None
+        self.output_context = None
+        self.output_range = {}
+        self.gcode_generation = 0
+        self.restart_index = None
+        self.restart_generation = -1
+        self.window_1 = None
+        self.gcode_filename = None
+        self.pending_visualization = None
+        self.conversion_job = None
+        self.conversion_process = ConversionProcess()
         kwds["style"] = kwds.get("style", 0) | wx.DEFAULT_FRAME_STYLE
         wx.Frame.__init__(self, *args, **kwds)
         self.SetSize((1200, 800))
@@ -99,14 +118,16 @@ class MainFrame(wx.Frame):
         self.btn_save.SetBackgroundColour(wx.Colour(200, 220, 255))
         button_sizer.Add(self.btn_save, 0, wx.ALL, 5)
 
+        self.btn_restart = wx.Button(self.conversion_tab, wx.ID_ANY, u"Reštart od vrstvy")
+        self.btn_restart.SetBackgroundColour(wx.Colour(200, 220, 255))
+        self.btn_restart.SetToolTip(u"Vygeneruje RAPID len pre zvolený rozsah vrstiev alebo riadkov G-kódu.")
+        button_sizer.Add(self.btn_restart, 0, wx.ALL, 5)
+
         self.visualization_tab = wx.Panel(self.notebook_main, wx.ID_ANY)
         self.notebook_main.AddPage(self.visualization_tab, u"Vizualizácia")
 
         visualization_sizer = wx.BoxSizer(wx.VERTICAL)
 
-        self.window_1 = ModelVisualisation(self.visualization_tab, wx.ID_ANY)
-        visualization_sizer.Add(self.window_1, 1, wx.EXPAND, 0)
-
         self.status_panel = wx.Panel(self, wx.ID_ANY)
         main_sizer.Add(self.status_panel, 0, wx.EXPAND, 0)
 
@@ -144,9 +165,12 @@ class MainFrame(wx.Frame):
         self.btn_load.Bind(wx.EVT_BUTTON, self.load_gcode)
         self.btn_convert.Bind(wx.EVT_BUTTON, self.open_dialog_speed)
         self.btn_save.Bind(wx.EVT_BUTTON, self.save_rapid)
+        self.btn_restart.Bind(wx.EVT_BUTTON, self.open_dialog_restart)
         self.btn_help.Bind(wx.EVT_BUTTON, self.open_help)
+        self.gcode_input.Bind(wx.EVT_TEXT, self.on_gcode_changed)
         self.notebook_main.Bind(wx.EVT_NOTEBOOK_PAGE_CHANGING, self.on_notebook_page_changing)
         self.notebook_main.Bind(wx.EVT_NOTEBOOK_PAGE_CHANGED, self.on_notebook_page_changed)
+        self.Bind(wx.EVT_CLOSE, self.on_close)
 
         self.tab_manager = init_tab_manager(self)
         # end wxGlade
@@ -160,30 +184,166 @@ class MainFrame(wx.Frame):
             return
 
         if self.load_gcode_from_file(file_path):
-            filename = os.path.basename(file_path)
-            self.window_1.set_filename(filename)
+            self.gcode_filename = os.path.basename(file_path)
+            if self.window_1 is not None:
+                self.window_1.set_filename(self.gcode_filename)
         else:
             self.update_status("Chyba načítania", 0)
         event.Skip()
 
-    def start_conversion(self, gcode_text):
-        self.update_status("Prebieha konverzia G-kódu...", 50)
-        convert_async(gcode_text, self.app_settings, self.on_conversion_complete)
+    def has_gcode(self):
+        return self.gcode_reader is not None or bool(self.gcode_input.GetValue())
+
+    def get_gcode_source(self):
+        if self.gcode_reader is not None and not self.gcode_input.IsModified():
+            return self.gcode_reader
+        return self.gcode_input.GetValue()
+
+    def start_conversion(self, gcode_source=None):
+        if gcode_source is None and self.last_converter is not None:
+            self.refresh_rapid_output()
+            return
+        if gcode_source is None:
+            gcode_source = self.get_gcode_source()
+
+        converter = RemoteConverter()
+        generation = self.gcode_generation
+        context = ConversionContext.from_settings(self.app_settings)
+
+        def on_complete(rapid_code, positions):
+            if positions is not None:
+                wx.CallAfter(self.remember_converter, converter, context, generation)
+            self.on_conversion_complete(rapid_code, positions, converter.statistics, converter.get_layer_index())
+
+        self.update_status("Prebieha konverzia G-kódu...", 0)
+        self.start_job(self.conversion_process.convert_async, gcode_source, context, on_complete, cache=self.toolpath_cache,
+                       converter=converter)
 
-    def on_conversion_complete(self, rapid_code):
+    def refresh_rapid_output(self):
+        if self.last_converter is None:
+            return
+        self.update_status("Prebieha generovanie RAPID kódu...", 50)
+        converter = self.last_converter
+        generation = self.gcode_generation
+        context = ConversionContext.from_settings(self.app_settings)
+
+        def on_complete(rapid_code, positions):
+            if positions is not None:
+                wx.CallAfter(self.remember_converter, converter, context, generation)
+            self.on_conversion_complete(rapid_code, positions, converter.statistics, converter.get_layer_index())
+
+        self.start_job(self.conversion_process.reemit_async, converter, context, on_complete)
+
+    def start_restart_conversion(self, first, last, by_layer):
+        if not self.has_gcode():
+            return
+        converter = RemoteConverter()
+        generation = self.gcode_generation
+        context = ConversionContext.from_settings(self.app_settings)
+        restart_index = self.restart_index if self.restart_generation == generation else None
+        output_range = dict(first=first, last=last, by_layer=by_layer)
+
+        def on_complete(rapid_code, positions):
+            if positions is not None:
+                wx.CallAfter(self.remember_restart_output, converter.restart_index, context, output_range, generation)
+            self.on_conversion_complete(rapid_code, positions, converter.statistics, converter.get_layer_index())
+
+        self.output_context = None
+        self.update_status("Prebieha konverzia zvoleného rozsahu...", 50)
+        self.start_job(self.conversion_process.convert_range_async, self.get_gcode_source(), context, on_complete, first, last,
+                       by_layer, restart_index=restart_index, converter=converter)
+
+    def start_job(self, start_async, *args, **kwargs):
+        if self.conversion_job is not None:
+            self.conversion_job.cancel()
+        self.conversion_job = start_async(*args, progress_callback=self.on_conversion_progress, **kwargs)
+
+    def on_conversion_progress(self, job, progress):
+        wx.CallAfter(self.show_conversion_progress, job, progress)
+
+    def show_conversion_progress(self, job, progress):
+        if job is not self.conversion_job or job.is_cancelled:
+            return
+        message = (f"Prebieha konverzia G-kódu... {progress.lines} riadkov, "
+                   f"{progress.bytes_done / 1048576:.1f} / {progress.total_bytes / 1048576:.1f} MB")
+        if progress.eta is not None:
+            message += f", zostáva {progress.eta:.0f} s"
+        self.update_status(message, int(progress.fraction * 100))
+
+    def remember_restart_output(self, restart_index, context, output_range, generation):
+        if generation == self.gcode_generation:
+            self.restart_index = restart_index
+            self.restart_generation = generation
+            self.output_context = context
+            self.output_range = output_range
+
+    def remember_converter(self, converter, context, generation):
+        if generation == self.gcode_generation:
+            self.last_converter = converter
+            self.output_context = context
+            self.output_range = {}
+
+    def on_gcode_changed(self, event):
+        self.gcode_generation += 1
+        self.last_converter = None
+        self.output_context = None
+        event.Skip()
+
+    def on_conversion_complete(self, rapid_code, positions=None, statistics=None, layers=None):
         if rapid_code:
             logging.info("G-code conversion completed successfully.")
             wx.CallAfter(self.rapid_output.SetValue, rapid_code)
-            wx.CallAfter(self.update_status, "Konverzia dokončená", 100)
-            wx.CallAfter(self.window_1.set_rapid_text, rapid_code)
+            wx.CallAfter(self.update_status, self.format_conversion_status(statistics), 100)
+            wx.CallAfter(self.update_visualization, rapid_code, positions, layers)
         else:
             logging.error("G-code conversion returned empty RAPID code.")
             wx.CallAfter(self.update_status, "Chyba konverzie", 0)
 
+    def update_visualization(self, rapid_code, positions=None, layers=None):
+        if self.window_1 is None:
+            self.pending_visualization = (rapid_code, positions, layers)
+            return
+        if positions is not None:
+            self.window_1.set_positions(positions, layers)
+        else:
+            self.window_1.set_rapid_text(rapid_code)
+
+    def create_visualization(self):
+        if self.window_1 is not None:
+            return self.window_1
+        started = time.perf_counter()
+        from core.rendering.visualization import ModelVisualisation
+        self.window_1 = ModelVisualisation(self.visualization_tab, wx.ID_ANY)
+        self.visualization_tab.GetSizer().Add(self.window_1, 1, wx.EXPAND, 0)
+        self.visualization_tab.Layout()
+        if self.gcode_filename:
+            self.window_1.set_filename(self.gcode_filename)
+        logging.info(f"Visualization created in {time.perf_counter() - started:.2f} s")
+        if self.pending_visualization is not None:
+            pending, self.pending_visualization = self.pending_visualization, None
+            self.update_visualization(*pending)
+        return self.window_1
+
+    @staticmethod
+    def format_conversion_status(statistics):
+        statistics = statistics or {}
+        details = []
+        removed = statistics.get('simplified_targets', 0) + statistics.get('arc_targets', 0)
+        if removed:
+            details.append(f"odstránené body: {removed}")
+        skipped = sum(statistics.get(reason, 0) for reason in MoveFilter.REASONS)
+        if skipped:
+            details.append(f"vynechané pohyby: {skipped}")
+        if statistics.get('circular_moves', 0):
+            details.append(f"MoveC: {statistics['circular_moves']}")
+        if not details:
+            return "Konverzia dokončená"
+        logging.info(f"Conversion statistics: {dict(statistics)}")
+        return f"Konverzia dokončená ({', '.join(details)})"
+
     def save_rapid(self, event):  # wxGlade: MainFrame.<event_handler>
         logging.info("Attempting to save RAPID code...")
-        rapid_code = self.rapid_output.GetValue()
-        if not rapid_code:
+        if self.rapid_output.IsEmpty():
             logging.error("RAPID code is empty, cannot save.")
             wx.MessageBox("RAPID kód je prázdny", "Chyba uloženia", wx.ICON_ERROR)
             return
@@ -198,14 +358,34 @@ class MainFrame(wx.Frame):
         output_path = self.get_rapid_save_file_path()
         if output_path:
             logging.info("Saving RAPID code to: %s", output_path)
-            try:
-                self.save_rapid_to_file(rapid_code, output_path)
-                logging.info("RAPID code successfully saved to %s", output_path)
-            except Exception as e:
-                logging.exception("Failed to save RAPID code to %s: %s", output_path, str(e))
-                wx.MessageBox(f"Chyba pri ukladaní súboru: {str(e)}", "Chyba uloženia", wx.ICON_ERROR)
+            if self.is_output_unedited():
+                self.start_save(output_path)
+            else:
+                self.save_rapid_to_file(self.rapid_output.GetValue(), output_path)
         event.Skip()
 
+    def is_output_unedited(self):
+        return (self.output_context is not None and not self.rapid_output.IsModified()
+                and self.output_context == ConversionContext.from_settings(self.app_settings))
+
+    def start_save(self, output_path):
+        def on_complete(message, positions):
+            if positions is None:
+                wx.CallAfter(self.on_save_failed, output_path, message)
+            else:
+                logging.info("RAPID code successfully saved to %s", output_path)
+                wx.CallAfter(self.update_status, "RAPID kód uložený", 100)
+
+        self.update_status("Prebieha ukladanie RAPID kódu...", 0)
+        restart_index = self.restart_index if self.output_range and self.restart_generation == self.gcode_generation else None
+        self.start_job(self.conversion_process.save_async, self.get_gcode_source(), self.output_context, output_path, on_complete,
+                       cache=self.toolpath_cache, restart_index=restart_index, **self.output_range)
+
+    def on_save_failed(self, output_path, message):
+        logging.error("Failed to save RAPID code to %s: %s", output_path, message)
+        wx.MessageBox(f"Chyba pri ukladaní súboru: {message}", "Chyba uloženia", wx.ICON_ERROR)
+        self.update_status("Chyba uloženia", 0)
+
     @staticmethod
     def open_help(event):  # wxGlade: MainFrame.<event_handler>
         help_text = """
@@ -235,11 +415,22 @@ class MainFrame(wx.Frame):
 
     def load_gcode_from_file(self, file_path):
         try:
-            with open(file_path, 'r') as file:
-                self.gcode_input.SetValue(file.read())
+            reader = GCodeReader(file_path)
+            if self.gcode_reader is not None:
+                self.gcode_reader.close()
+            self.gcode_reader = reader
+
+            is_preview = len(reader) > self.GCODE_PREVIEW_LIMIT
+            self.gcode_input.SetValue(reader.read_text(self.GCODE_PREVIEW_LIMIT))
+            self.gcode_input.SetEditable(not is_preview)
             self.rapid_output.SetValue("")
-            self.window_1.reset_visualize_state()
-            self.update_status("G-kód je načítaný", 100)
+            self.pending_visualization = None
+            if self.window_1 is not None:
+                self.window_1.reset_visualize_state()
+            if is_preview:
+                self.update_status("G-kód je načítaný (zobrazený je len začiatok súboru)", 100)
+            else:
+                self.update_status("G-kód je načítaný", 100)
             return True
         except (OSError, IOError) as e:
             wx.MessageBox(f"Error loading file: {e}", "Chyba súboru", wx.ICON_ERROR)
@@ -265,7 +456,7 @@ class MainFrame(wx.Frame):
 
     def save_rapid_to_file(self, rapid_code, output_path):
         try:
-            FileHandler().write_rapid_file(rapid_code.splitlines(), output_path, self.app_settings)
+            FileHandler().write_rapid_text(rapid_code, output_path, self.app_settings)
             self.update_status("RAPID kód uložený", 100)
         except Exception as e:
             wx.MessageBox(f"Error saving file: {str(e)}", "Chyba uloženia", wx.ICON_ERROR)
@@ -294,6 +485,15 @@ class MainFrame(wx.Frame):
 
         event.Skip()
 
+    def open_dialog_restart(self, event):  # wxGlade: MainFrame.<event_handler>
+        if not self.has_gcode():
+            wx.MessageBox("Najprv načítajte G-kód", "Upozornenie", wx.OK | wx.ICON_WARNING)
+            return
+        dialog = Restart(self)
+        dialog.ShowModal()
+        dialog.Destroy()
+        event.Skip()
+
     def open_dialog_parameters(self, event):  # wxGlade: MainFrame.<event_handler>
         dialog = Parameters(self)
         dialog.ShowModal()
@@ -304,8 +504,15 @@ class MainFrame(wx.Frame):
 
         event.Skip()
 
-    @staticmethod
-    def on_notebook_page_changed(event):
+    def on_notebook_page_changed(self, event):
+        if self.notebook_main.GetPage(event.GetSelection()) is self.visualization_tab:
+            self.create_visualization()
+        event.Skip()
+
+    def on_close(self, event):
+        if self.conversion_job is not None:
+            self.conversion_job.cancel()
+        self.conversion_process.close()
         event.Skip()
 
     def on_notebook_page_changing(self, event):
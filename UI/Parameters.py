@@ -112,6 +112,7 @@ class Parameters(wx.Dialog):
             self.parent.save_settings()
             self.parent.update_status("Parametre boli nastavené", 100)
             self.EndModal(wx.ID_OK)
+            self.parent.refresh_rapid_output()
 
 
         except ValueError as e:
@@ -256,6 +256,7 @@ class Position(wx.Dialog):
             self.parent.save_settings()
             self.parent.update_status("Poloha bola nastavená", 100)
             self.EndModal(wx.ID_OK)
+            self.parent.refresh_rapid_output()
         except ValueError as e:
             wx.MessageBox(str(e), "Zadajte platné čísla", wx.OK | wx.ICON_ERROR)
             self.parent.update_status("Chyba nastavenia polohy", 0)
@@ -0,0 +1,112 @@
+# -*- coding: UTF-8 -*-
+#
+# generated by wxGlade 1.1.0 on Thu Jan 23 01:24:00 2025
+#
+
+import wx
+
+# begin wxGlade: dependencies
+# end wxGlade
+
+# begin wxGlade: extracode
+import logging
+# end wxGlade
+
+
+class Restart(wx.Dialog):
+    def __init__(self, *args, **kwds):
+        # begin wxGlade: Restart.__init__
+        self.parent = args[0]
+        kwds["style"] = kwds.get("style", 0) | wx.DEFAULT_DIALOG_STYLE
+        wx.Dialog.__init__(self, *args, **kwds)
+        self.SetTitle(u"Reštart tlače")
+
+        sizer_main = wx.BoxSizer(wx.VERTICAL)
+
+        sizer_content = wx.BoxSizer(wx.VERTICAL)
+        sizer_main.Add(sizer_content, 1, wx.ALL | wx.EXPAND, 5)
+
+        self.radio_box_range = wx.RadioBox(self, wx.ID_ANY, u"Rozsah", choices=[u"Vrstvy", u"Riadky G-kódu"], majorDimension=1, style=wx.RA_SPECIFY_COLS)
+        self.radio_box_range.SetToolTip(u"Vrstvy sa číslujú od 0 podľa komentárov ;LAYER zo slicera, rovnako ako v posuvníku vizualizácie. Vrstva 0 obsahuje aj úvodnú sekvenciu pred prvou vrstvou.")
+        sizer_content.Add(self.radio_box_range, 0, wx.ALL | wx.EXPAND, 10)
+
+        grid_sizer_range = wx.GridSizer(3, 2, 4, 0)
+        sizer_content.Add(grid_sizer_range, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM | wx.EXPAND, 10)
+
+        label_first = wx.StaticText(self, wx.ID_ANY, u"Od:")
+        grid_sizer_range.Add(label_first, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_first = wx.TextCtrl(self, wx.ID_ANY, "1")
+        grid_sizer_range.Add(self.text_first, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        label_last = wx.StaticText(self, wx.ID_ANY, u"Do:")
+        grid_sizer_range.Add(label_last, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_last = wx.TextCtrl(self, wx.ID_ANY, "")
+        self.text_last.SetToolTip(u"Prázdne - až do konca súboru")
+        grid_sizer_range.Add(self.text_last, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        label_clearance = wx.StaticText(self, wx.ID_ANY, u"Výška nájazdu [mm]:")
+        grid_sizer_range.Add(label_clearance, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_clearance = wx.TextCtrl(self, wx.ID_ANY, "")
+        self.text_clearance.SetToolTip(u"Nástroj najprv prejde nad bod reštartu o túto výšku a potom zíde kolmo dole.")
+        grid_sizer_range.Add(self.text_clearance, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        sizer_buttons = wx.StdDialogButtonSizer()
+        sizer_main.Add(sizer_buttons, 0, wx.ALIGN_RIGHT | wx.ALL, 5)
+
+        self.button_cancel = wx.Button(self, wx.ID_CANCEL, "")
+        sizer_buttons.AddButton(self.button_cancel)
+
+        self.button_ok = wx.Button(self, wx.ID_OK, "")
+        sizer_buttons.AddButton(self.button_ok)
+
+        sizer_buttons.Realize()
+
+        self.SetSizer(sizer_main)
+        sizer_main.Fit(self)
+
+        self.SetEscapeId(self.button_cancel.GetId())
+
+        self.Layout()
+        self.Centre()
+        self.load_saved_settings()
+
+        self.button_cancel.Bind(wx.EVT_BUTTON, self.cancel)
+        self.button_ok.Bind(wx.EVT_BUTTON, self.start_restart)
+        # end wxGlade
+
+    def load_saved_settings(self):
+        self.text_clearance.SetValue(str(self.parent.app_settings.get_conversion().restart_clearance))
+
+    def cancel(self, event):  # wxGlade: Restart.<event_handler>
+        self.EndModal(wx.ID_CANCEL)
+        event.Skip()
+
+    def start_restart(self, event):  # wxGlade: Restart.<event_handler>
+        try:
+            by_layer = self.radio_box_range.GetSelection() == 0
+            first = int(self.text_first.GetValue())
+            last_value = self.text_last.GetValue().strip()
+            last = int(last_value) if last_value else None
+            if first < (0 if by_layer else 1) or (last is not None and last < first):
+                raise ValueError(f"Range must start at {0 if by_layer else 1} and end after its start")
+            clearance = float(self.text_clearance.GetValue())
+            if clearance < 0:
+                raise ValueError("Approach clearance must not be negative")
+
+            self.parent.app_settings.set_restart_clearance(clearance)
+            self.parent.save_settings()
+            logging.info(f"Restart {'layers' if by_layer else 'lines'} {first}-{last if last is not None else 'end'}, clearance {clearance} mm")
+            self.EndModal(wx.ID_OK)
+
+            self.parent.start_restart_conversion(first, last, by_layer)
+
+        except ValueError as e:
+            wx.MessageBox(str(e), "Chyba vstupu", wx.OK | wx.ICON_ERROR)
+            self.parent.update_status("Chyba nastavenia reštartu", 0)
+            return
+        event.Skip()
+
+# end of class Restart
@@ -9,6 +9,7 @@ import wx
 
 # begin wxGlade: extracode
 import logging
+from core.model.setting_object import OutputMode
 # end wxGlade
 
 
@@ -52,6 +53,90 @@ class Speed(wx.Dialog):
         self.text_ctrl_1.Enable(False)
         sizer_1.Add(self.text_ctrl_1, 0, 0, 0)
 
+        self.checkbox_simplify = wx.CheckBox(self, wx.ID_ANY, u"Zjednodušiť dráhu")
+        self.checkbox_simplify.SetToolTip(u"Zlúči takmer priamkové segmenty do jedného MoveL.\nTolerancia sa odvodzuje od zóny.")
+        sizer_container.Add(self.checkbox_simplify, 0, wx.ALL, 8)
+
+        self.checkbox_arc_fitting = wx.CheckBox(self, wx.ID_ANY, u"Nahradiť oblúky príkazom MoveC")
+        self.checkbox_arc_fitting.SetToolTip(u"Rozpozná krátke segmenty ležiace na kružnici a nahradí ich jedným MoveC.\nTolerancia sa odvodzuje od zóny.")
+        sizer_container.Add(self.checkbox_arc_fitting, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM, 8)
+
+        self.checkbox_drop_redundant = wx.CheckBox(self, wx.ID_ANY, u"Vynechať nadbytočné pohyby")
+        self.checkbox_drop_redundant.SetToolTip(u"Vynechá pohyby nulovej dĺžky, duplicitné body a riadky meniace len rýchlosť.\nRýchlosť a extrúzia sa prenesú do nasledujúceho pohybu.")
+        sizer_container.Add(self.checkbox_drop_redundant, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM, 8)
+
+        self.radio_box_output_mode = wx.RadioBox(self, wx.ID_ANY, u"Výstup", choices=[u"MoveL pre každý bod", u"Tabuľka bodov s cyklom FOR"], majorDimension=1, style=wx.RA_SPECIFY_COLS)
+        self.radio_box_output_mode.SetToolTip(u"Tabuľka bodov uloží pozície do polí CONST pos a prejde ich v cykle FOR.\nModul je výrazne menší a rýchlejšie sa načíta do riadiacej jednotky.")
+        sizer_container.Add(self.radio_box_output_mode, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM | wx.EXPAND, 8)
+
+        self.checkbox_extrusion_control = wx.CheckBox(self, wx.ID_ANY, u"Riadiť extrúziu cez TriggL")
+        self.checkbox_extrusion_control.SetToolTip(u"Zapína extrúder a ventilátor počas pohybu príkazmi TriggL/TriggC,\nnamiesto zastavenia v bode, takže sa zachová plynulé prechádzanie zónami.")
+        sizer_container.Add(self.checkbox_extrusion_control, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM, 8)
+
+        grid_sizer_modules = wx.GridSizer(9, 2, 4, 0)
+        sizer_container.Add(grid_sizer_modules, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM | wx.EXPAND, 8)
+
+        label_moves_per_module = wx.StaticText(self, wx.ID_ANY, u"Pohybov v module:")
+        grid_sizer_modules.Add(label_moves_per_module, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_moves_per_module = wx.TextCtrl(self, wx.ID_ANY, "")
+        self.text_moves_per_module.SetToolTip(u"Rozdelí program na moduly s najviac týmto počtom pohybov.\nHlavný modul ich postupne načítava (StartLoad/WaitLoad/UnLoad).\n0 - jeden modul")
+        grid_sizer_modules.Add(self.text_moves_per_module, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        label_module_path = wx.StaticText(self, wx.ID_ANY, u"Cesta k modulom:")
+        grid_sizer_modules.Add(label_module_path, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_module_path = wx.TextCtrl(self, wx.ID_ANY, "")
+        self.text_module_path.SetToolTip(u"Adresár na riadiacej jednotke, z ktorého sa moduly načítajú, napr. HOME:")
+        grid_sizer_modules.Add(self.text_module_path, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        label_position_decimals = wx.StaticText(self, wx.ID_ANY, u"Desatinné miesta polohy:")
+        grid_sizer_modules.Add(label_position_decimals, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_position_decimals = wx.TextCtrl(self, wx.ID_ANY, "")
+        self.text_position_decimals.SetToolTip(u"Počet desatinných miest súradníc, nadbytočné nuly sa vynechajú.\nPrázdne - plná presnosť")
+        grid_sizer_modules.Add(self.text_position_decimals, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        label_orientation_decimals = wx.StaticText(self, wx.ID_ANY, u"Desatinné miesta orientácie:")
+        grid_sizer_modules.Add(label_orientation_decimals, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_orientation_decimals = wx.TextCtrl(self, wx.ID_ANY, "")
+        self.text_orientation_decimals.SetToolTip(u"Počet desatinných miest kvaterniónov.\nPrázdne - plná presnosť")
+        grid_sizer_modules.Add(self.text_orientation_decimals, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        label_speed_step = wx.StaticText(self, wx.ID_ANY, u"Krok rýchlosti [mm/s]:")
+        grid_sizer_modules.Add(label_speed_step, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_speed_step = wx.TextCtrl(self, wx.ID_ANY, "")
+        self.text_speed_step.SetToolTip(u"Posuv F z G-kódu sa prepočíta z mm/min na mm/s, zaokrúhli na tento krok\na pre každú rýchlosť sa deklaruje jedna CONST speeddata.\nPrázdne - pôvodné názvy v<F>")
+        grid_sizer_modules.Add(self.text_speed_step, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        label_reorientation_speed = wx.StaticText(self, wx.ID_ANY, u"Rýchlosť preorientácie [°/s]:")
+        grid_sizer_modules.Add(label_reorientation_speed, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_reorientation_speed = wx.TextCtrl(self, wx.ID_ANY, "")
+        self.text_reorientation_speed.SetToolTip(u"Obmedzenie rýchlosti preorientácie nástroja v deklarovaných speeddata.")
+        grid_sizer_modules.Add(self.text_reorientation_speed, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        label_extrusion_lead_time = wx.StaticText(self, wx.ID_ANY, u"Predstih extrúdera [s]:")
+        grid_sizer_modules.Add(label_extrusion_lead_time, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_extrusion_lead_time = wx.TextCtrl(self, wx.ID_ANY, "")
+        self.text_extrusion_lead_time.SetToolTip(u"O koľko skôr sa signál extrúdera prepne pred dosiahnutím bodu (EquipLag v TriggEquip).")
+        grid_sizer_modules.Add(self.text_extrusion_lead_time, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        label_extruder_signal = wx.StaticText(self, wx.ID_ANY, u"Signál extrúdera:")
+        grid_sizer_modules.Add(label_extruder_signal, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_extruder_signal = wx.TextCtrl(self, wx.ID_ANY, "")
+        grid_sizer_modules.Add(self.text_extruder_signal, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        label_fan_signal = wx.StaticText(self, wx.ID_ANY, u"Signál ventilátora:")
+        grid_sizer_modules.Add(label_fan_signal, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
+        self.text_fan_signal = wx.TextCtrl(self, wx.ID_ANY, "")
+        grid_sizer_modules.Add(self.text_fan_signal, 0, wx.ALIGN_CENTER_VERTICAL, 0)
+
         sizer_buttons = wx.StdDialogButtonSizer()
         sizer_main.Add(sizer_buttons, 0, wx.ALIGN_RIGHT | wx.ALL, 4)
 
@@ -80,6 +165,30 @@ class Speed(wx.Dialog):
         conversion = self.parent.app_settings.get_conversion()
         self.text_ctrl_1.SetValue(str(conversion.arm_speed))
         self.text_zone.SetValue(str(conversion.zone))
+        self.checkbox_simplify.SetValue(conversion.simplify)
+        self.checkbox_arc_fitting.SetValue(conversion.arc_fitting)
+        self.checkbox_drop_redundant.SetValue(conversion.drop_redundant)
+        self.radio_box_output_mode.SetSelection(1 if conversion.output_mode == OutputMode.TABLE.value else 0)
+        self.text_moves_per_module.SetValue(str(conversion.moves_per_module))
+        self.text_module_path.SetValue(conversion.module_path)
+        self.text_position_decimals.SetValue("" if conversion.position_decimals is None else str(conversion.position_decimals))
+        self.text_orientation_decimals.SetValue("" if conversion.orientation_decimals is None else str(conversion.orientation_decimals))
+        self.text_speed_step.SetValue("" if conversion.speed_step is None else str(conversion.speed_step))
+        self.text_reorientation_speed.SetValue(str(conversion.reorientation_speed))
+        self.checkbox_extrusion_control.SetValue(conversion.extrusion_control)
+        self.text_extrusion_lead_time.SetValue(str(conversion.extrusion_lead_time))
+        self.text_extruder_signal.SetValue(conversion.extruder_signal)
+        self.text_fan_signal.SetValue(conversion.fan_signal)
+
+    @staticmethod
+    def read_decimals(text_ctrl):
+        value = text_ctrl.GetValue().strip()
+        if not value:
+            return None
+        decimals = int(value)
+        if not 0 <= decimals <= 12:
+            raise ValueError("Decimals must be between 0 and 12")
+        return decimals
 
     def cancel(self, event):  # wxGlade: Speed.<event_handler>
         self.EndModal(wx.ID_CANCEL)
@@ -101,16 +210,63 @@ class Speed(wx.Dialog):
             self.parent.app_settings.get_conversion().zone = zone
             logging.info(f"Zone set to: {zone}")
 
+            simplify = self.checkbox_simplify.GetValue()
+            self.parent.app_settings.set_simplify(simplify)
+            logging.info(f"Path simplification set to: {simplify}")
+
+            arc_fitting = self.checkbox_arc_fitting.GetValue()
+            self.parent.app_settings.set_arc_fitting(arc_fitting)
+            logging.info(f"Arc fitting set to: {arc_fitting}")
+
+            drop_redundant = self.checkbox_drop_redundant.GetValue()
+            self.parent.app_settings.set_drop_redundant(drop_redundant)
+            logging.info(f"Dropping redundant moves set to: {drop_redundant}")
+
+            output_mode = OutputMode.TABLE if self.radio_box_output_mode.GetSelection() == 1 else OutputMode.INLINE
+            self.parent.app_settings.set_output_mode(output_mode.value)
+            logging.info(f"Output mode set to: {output_mode.value}")
+
+            moves_per_module = int(self.text_moves_per_module.GetValue())
+            if moves_per_module < 0:
+                raise ValueError("Moves per module must not be negative")
+            module_path = self.text_module_path.GetValue().strip()
+            self.parent.app_settings.set_module_split(moves_per_module, module_path)
+            logging.info(f"Module split set to: {moves_per_module} moves per module, path {module_path}")
+
+            position_decimals = self.read_decimals(self.text_position_decimals)
+            orientation_decimals = self.read_decimals(self.text_orientation_decimals)
+            self.parent.app_settings.set_precision(position_decimals, orientation_decimals)
+            logging.info(f"Precision set to: position {position_decimals}, orientation {orientation_decimals}")
+
+            speed_step_value = self.text_speed_step.GetValue().strip()
+            speed_step = float(speed_step_value) if speed_step_value else None
+            reorientation_speed = float(self.text_reorientation_speed.GetValue())
+            if (speed_step is not None and speed_step <= 0) or reorientation_speed <= 0:
+                raise ValueError("Speed step and reorientation speed must be positive")
+            self.parent.app_settings.set_speed_table(speed_step, reorientation_speed)
+            logging.info(f"Speed table set to: step {speed_step} mm/s, reorientation {reorientation_speed} deg/s")
+
+            extrusion_control = self.checkbox_extrusion_control.GetValue()
+            extrusion_lead_time = float(self.text_extrusion_lead_time.GetValue())
+            extruder_signal = self.text_extruder_signal.GetValue().strip()
+            fan_signal = self.text_fan_signal.GetValue().strip()
+            if extrusion_lead_time < 0:
+                raise ValueError("Extruder lead time must not be negative")
+            if extrusion_control and not (extruder_signal and fan_signal):
+                raise ValueError("Extruder and fan signal names are required")
+            self.parent.app_settings.set_extrusion_control(extrusion_control, extrusion_lead_time, extruder_signal, fan_signal)
+            logging.info(f"Extrusion control set to: {extrusion_control}, lead time {extrusion_lead_time} s, "
+                         f"signals {extruder_signal}/{fan_signal}")
+
             self.parent.settings_manager.save_all_settings(self.parent.app_settings)
             self.parent.update_status("Rýchlosť a zóna boli nastavené", 100)
             logging.info("Speed and zone settings saved successfully")
             self.EndModal(wx.ID_OK)
 
-            gcode_text = self.parent.gcode_input.GetValue()
-            if gcode_text:
+            if self.parent.has_gcode():
                 logging.info("Starting G-code conversion...")
                 self.parent.update_status("Začína konverzia G-kódu...", 25)
-                self.parent.start_conversion(gcode_text)
+                self.parent.start_conversion()
 
         except ValueError as e:
             logging.error(f"Speed/zone setting error: {str(e)}")
@@ -0,0 +1,36 @@
+import wx
+import logging
+import sys
+from UI.MainFrame import MainFrame
+from utils.startup_timer import get_startup_timer
+
+
+class GCodeToRapidApp(wx.App):
+    def __init__(self, redirect=False, filename=None, usebestvisual=False, clearsigint=True):
+        super().__init__(redirect, filename, usebestvisual, clearsigint)
+        self.frame = None
+
+    def OnInit(self):
+        self.setup_logging()
+        self.frame = MainFrame(None, wx.ID_ANY, "")
+        self.SetTopWindow(self.frame)
+        self.frame.Show()
+        timer = get_startup_timer()
+        if timer is not None:
+            timer.mark("main window")
+            wx.CallAfter(self.report_startup, timer)
+        return True
+
+    @staticmethod
+    def report_startup(timer):
+        timer.mark("first event")
+        timer.report()
+
+    @staticmethod
+    def setup_logging():
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s [%(levelname)s] %(message)s",
+            handlers=[logging.StreamHandler(sys.stdout)]
+        )
+# end of class GCodeToRapidApp
@@ -0,0 +1,48 @@
+import argparse
+import time
+import numpy as np
+from core.Domain.rapid_converter import RAPIDConverter
+from core.model.app_settings import AppSettings
+
+PRECISIONS = ((None, None), (4, 8), (3, 6), (2, 4))
+
+
+def synthetic_gcode(line_count: int, seed: int = 0) -> str:
+    random = np.random.default_rng(seed)
+    points = np.cumsum(random.uniform(-2.0, 2.0, (line_count, 2)), axis=0)
+    extrusion = np.cumsum(random.uniform(0.0, 0.1, line_count))
+    layers = np.arange(line_count) // 1000 * 0.2 + 0.2
+    lines = [f"G1 X{x:.3f} Y{y:.3f} Z{z:.2f} E{e:.5f} F{1800 if index % 50 else 3000}"
+             for index, (x, y, z, e) in enumerate(zip(points[:, 0].tolist(), points[:, 1].tolist(), layers.tolist(), extrusion.tolist()))]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure RAPID output size and emit time per numeric precision.")
+    parser.add_argument("gcode_file", nargs="?", help="G-code file to convert, a synthetic print is used when omitted")
+    parser.add_argument("--lines", type=int, default=500_000, help="number of synthetic G-code lines")
+    parser.add_argument("--repeat", type=int, default=3, help="emit runs per precision, the fastest is reported")
+    args = parser.parse_args()
+
+    if args.gcode_file:
+        with open(args.gcode_file, 'rb') as file:
+            gcode = file.read()
+    else:
+        gcode = synthetic_gcode(args.lines)
+
+    settings = AppSettings()
+    converter = RAPIDConverter(keep_history=True)
+    converter.gcode_to_rapid(gcode, settings)
+    print(f"{'position':>8} {'orientation':>11} {'size [MB]':>10} {'emit [s]':>9}")
+    for position_decimals, orientation_decimals in PRECISIONS:
+        settings.set_precision(position_decimals, orientation_decimals)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            rapid_code = converter.reemit_rapid(settings)
+            timings.append(time.perf_counter() - start)
+        print(f"{str(position_decimals):>8} {str(orientation_decimals):>11} {len(rapid_code) / 1e6:>10.2f} {min(timings):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import math
+from typing import Iterator, Optional
+import numpy as np
+from core.model.toolpath import MoveTable
+
+
+class ArcFitter:
+    MIN_ARC_POINTS = 4
+    MAX_SWEEP = np.pi
+    MAX_TURN = np.radians(30.0)
+    MIN_TURN = 1e-4
+    MIN_ALIGNMENT = 0.9
+
+    @staticmethod
+    def fit(moves: MoveTable, tolerance: Optional[float]) -> tuple[np.ndarray, np.ndarray]:
+        count = len(moves)
+        keep = np.ones(count, dtype=bool)
+        via = np.full(count, -1, dtype=np.int64)
+        if tolerance is None or count < ArcFitter.MIN_ARC_POINTS:
+            return keep, via
+
+        points = moves.positions()
+        arc_end = 0
+        for start, stop in ArcFitter._candidate_runs(moves, points):
+            arc_end = ArcFitter._fit_run(points, max(start, arc_end), stop, tolerance, keep, via)
+        return keep, via
+
+    @staticmethod
+    def _candidate_runs(moves: MoveTable, points: np.ndarray) -> Iterator[tuple[int, int]]:
+        segments = np.diff(points, axis=0)
+        incoming, outgoing = segments[:-1], segments[1:]
+        normals = np.cross(incoming, outgoing)
+        normal_length = np.linalg.norm(normals, axis=1)
+        turn = np.arctan2(normal_length, np.einsum('ij,ij->i', incoming, outgoing))
+
+        same_mode = ~moves.mode_changes()
+        curved = (turn > ArcFitter.MIN_TURN) & (turn <= ArcFitter.MAX_TURN) & same_mode[2:]
+
+        unit = np.divide(normals, normal_length[:, None], out=np.zeros_like(normals), where=normal_length[:, None] > 0)
+        aligned = np.einsum('ij,ij->i', unit[1:], unit[:-1]) >= ArcFitter.MIN_ALIGNMENT
+        linked = np.concatenate(([False], curved[1:] & curved[:-1] & aligned, [False]))
+        edges = np.diff(linked.view(np.int8))
+        for first_vertex, last_vertex in zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()):
+            if last_vertex - first_vertex + 3 >= ArcFitter.MIN_ARC_POINTS:
+                yield first_vertex, last_vertex + 2
+
+    @staticmethod
+    def _fit_run(points: np.ndarray, start: int, stop: int, tolerance: float, keep: np.ndarray, via: np.ndarray) -> int:
+        minimum = ArcFitter.MIN_ARC_POINTS - 1
+        arc_end = start
+        while stop - start >= minimum:
+            end = start + minimum
+            if ArcFitter._circular_via(points, start, end, tolerance) is None:
+                start += 1
+                continue
+
+            failed = stop + 1
+            step = minimum
+            while end < stop:
+                candidate = min(end + step, stop)
+                if ArcFitter._circular_via(points, start, candidate, tolerance) is None:
+                    failed = candidate
+                    break
+                end = candidate
+                step *= 2
+            while failed - end > 1:
+                candidate = (end + failed) // 2
+                if ArcFitter._circular_via(points, start, candidate, tolerance) is None:
+                    failed = candidate
+                else:
+                    end = candidate
+
+            keep[start + 1:end] = False
+            via[end] = ArcFitter._circular_via(points, start, end, tolerance)
+            arc_end = start = end
+        return arc_end
+
+    @staticmethod
+    def _circular_via(points: np.ndarray, start: int, end: int, tolerance: float) -> Optional[int]:
+        arc = points[start:end + 1]
+        first, middle, last = arc[0], arc[len(arc) // 2], arc[-1]
+        a, b = first - last, middle - last
+        normal = ArcFitter._cross(a, b)
+        normal_squared = normal @ normal
+        if normal_squared <= 1e-12:
+            return None
+
+        center = last + ArcFitter._cross((a @ a) * b - (b @ b) * a, normal) / (2.0 * normal_squared)
+        offsets = arc - center
+        radius = math.sqrt(offsets[0] @ offsets[0])
+        normal = normal / math.sqrt(normal_squared)
+        height = offsets @ normal
+        planar = offsets - np.outer(height, normal)
+        if np.abs(height).max() > tolerance or np.abs(np.sqrt(np.einsum('ij,ij->i', planar, planar)) - radius).max() > tolerance:
+            return None
+
+        u = offsets[0] / radius
+        v = ArcFitter._cross(normal, u)
+        angles = np.mod(np.arctan2(planar @ v, planar @ u), 2.0 * np.pi)
+        angles[0] = 0.0
+        steps = np.diff(angles)
+        if (steps <= 0).any() or angles[-1] > ArcFitter.MAX_SWEEP:
+            return None
+        if radius * (1.0 - math.cos(steps.max() / 2.0)) > tolerance:
+            return None
+        return start + int(np.argmin(np.abs(angles - angles[-1] / 2.0)))
+
+    @staticmethod
+    def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.array((a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]))
@@ -0,0 +1,139 @@
+import logging
+import numpy as np
+from core.model.toolpath import GCode, MoveTable
+
+PLANE_AXES = {
+    GCode.G17: (0, 1, 2),
+    GCode.G18: (2, 0, 1),
+    GCode.G19: (1, 2, 0),
+}
+
+
+class ArcInterpolator:
+    MAX_SWEEP = np.pi
+    RENDER_STEP = np.radians(5.0)
+    EPSILON = 1e-9
+    DECIMALS = 4
+
+    @staticmethod
+    def expand(moves: MoveTable, start: np.ndarray, arcs: np.ndarray, clockwise: np.ndarray, offsets: np.ndarray,
+               radius: np.ndarray, planes: np.ndarray) -> MoveTable:
+        rows = np.flatnonzero(arcs)
+        ends = moves.positions()
+        starts = np.vstack((start, ends[:-1]))[rows]
+        ends = ends[rows]
+        axes = np.array([PLANE_AXES.get(plane, PLANE_AXES[GCode.G17]) for plane in planes.tolist()], dtype=np.int64).reshape(-1, 3)
+
+        start_plane = np.take_along_axis(starts, axes, axis=1)
+        end_plane = np.take_along_axis(ends, axes, axis=1)
+        plane_offsets = np.take_along_axis(offsets, axes[:, :2], axis=1)
+        centers, valid = ArcInterpolator._centers(start_plane[:, :2], end_plane[:, :2], plane_offsets, radius, clockwise)
+        if not valid.all():
+            for line in moves.line[rows[~valid]].tolist():
+                logging.warning(f"Arc in line {line} has no valid center, using a linear move")
+            rows, axes, centers, clockwise, ends = rows[valid], axes[valid], centers[valid], clockwise[valid], ends[valid]
+            start_plane, end_plane = start_plane[valid], end_plane[valid]
+            if not rows.size:
+                return moves
+
+        start_offset = start_plane[:, :2] - centers
+        end_offset = end_plane[:, :2] - centers
+        arc_radius = np.hypot(start_offset[:, 0], start_offset[:, 1])
+        start_angle = np.arctan2(start_offset[:, 1], start_offset[:, 0])
+        end_angle = np.arctan2(end_offset[:, 1], end_offset[:, 0])
+        direction = np.where(clockwise, -1.0, 1.0)
+        sweep = np.mod(direction * (end_angle - start_angle), 2.0 * np.pi)
+        sweep[sweep < ArcInterpolator.EPSILON] = 2.0 * np.pi
+        pieces = np.maximum(np.ceil(sweep / ArcInterpolator.MAX_SWEEP - ArcInterpolator.EPSILON), 1).astype(np.int64)
+
+        counts = np.ones(len(moves), dtype=np.int64)
+        counts[rows] = pieces
+        expanded = moves.take(np.repeat(np.arange(len(moves)), counts))
+
+        owner = np.repeat(np.arange(rows.size), pieces)
+        first_piece = np.cumsum(pieces) - pieces
+        piece = np.arange(owner.size) - first_piece[owner] + 1
+        fraction = piece / pieces[owner]
+        via_fraction = (piece - 0.5) / pieces[owner]
+
+        def arc_points(fractions: np.ndarray) -> np.ndarray:
+            angle = start_angle[owner] + direction[owner] * sweep[owner] * fractions
+            local = np.column_stack((
+                centers[owner, 0] + arc_radius[owner] * np.cos(angle),
+                centers[owner, 1] + arc_radius[owner] * np.sin(angle),
+                start_plane[owner, 2] + (end_plane[owner, 2] - start_plane[owner, 2]) * fractions,
+            ))
+            points = np.empty_like(local)
+            np.put_along_axis(points, axes[owner], local, axis=1)
+            return np.round(points, ArcInterpolator.DECIMALS) + 0.0
+
+        targets = np.flatnonzero(np.repeat(np.isin(np.arange(len(moves)), rows), counts))
+        piece_ends = arc_points(fraction)
+        last_piece = piece == pieces[owner]
+        piece_ends[last_piece] = ends[owner[last_piece]]
+        piece_vias = arc_points(via_fraction)
+
+        expanded.x[targets], expanded.y[targets], expanded.z[targets] = piece_ends.T
+        expanded.via_x[targets], expanded.via_y[targets], expanded.via_z[targets] = piece_vias.T
+        expanded.layer_start[targets[piece > 1]] = False
+        return expanded
+
+    @staticmethod
+    def _centers(starts: np.ndarray, ends: np.ndarray, offsets: np.ndarray, radius: np.ndarray,
+                 clockwise: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        has_offset = ~np.isnan(offsets).all(axis=1)
+        centers = starts + np.nan_to_num(offsets)
+
+        chord = ends - starts
+        length = np.hypot(chord[:, 0], chord[:, 1])
+        use_radius = ~has_offset & ~np.isnan(radius) & (length > ArcInterpolator.EPSILON)
+        safe_length = np.where(use_radius, length, 1.0)
+        height = np.sqrt(np.maximum(np.nan_to_num(radius) ** 2 - (length / 2.0) ** 2, 0.0))
+        side = np.where(clockwise, -1.0, 1.0) * np.sign(np.nan_to_num(radius))
+        left = np.column_stack((-chord[:, 1], chord[:, 0])) / safe_length[:, None]
+        radius_centers = (starts + ends) / 2.0 + (side * height)[:, None] * left
+        centers[use_radius] = radius_centers[use_radius]
+        return centers, has_offset | use_radius
+
+    @staticmethod
+    def render_points(moves: MoveTable, start: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        ends = moves.positions()
+        circular = moves.is_circular()
+        if not circular.any():
+            return ends, np.ones(len(moves), dtype=np.int64)
+
+        rows = np.flatnonzero(circular)
+        first = np.vstack((start, ends[:-1]))[rows]
+        via = moves.vias()[rows]
+        last = ends[rows]
+
+        a, b = first - last, via - last
+        normal = np.cross(a, b)
+        normal_squared = np.einsum('ij,ij->i', normal, normal)
+        curved = normal_squared > ArcInterpolator.EPSILON
+        safe_squared = np.where(curved, normal_squared, 1.0)
+        a_squared = np.einsum('ij,ij->i', a, a)
+        b_squared = np.einsum('ij,ij->i', b, b)
+        centers = last + np.cross(a_squared[:, None] * b - b_squared[:, None] * a, normal) / (2.0 * safe_squared[:, None])
+        u = first - centers
+        radius = np.sqrt(np.einsum('ij,ij->i', u, u))
+        u /= np.where(radius > 0, radius, 1.0)[:, None]
+        v = np.cross(normal / np.sqrt(safe_squared)[:, None], u)
+        end_offset = last - centers
+        sweep = np.mod(np.arctan2(np.einsum('ij,ij->i', end_offset, v), np.einsum('ij,ij->i', end_offset, u)), 2.0 * np.pi)
+        samples = np.where(curved, np.maximum(np.ceil(sweep / ArcInterpolator.RENDER_STEP), 1), 1).astype(np.int64)
+
+        counts = np.ones(len(moves), dtype=np.int64)
+        counts[rows] = samples
+        points = np.repeat(ends, counts, axis=0)
+
+        owner = np.repeat(np.arange(rows.size), samples)
+        step = np.arange(owner.size) - (np.cumsum(samples) - samples)[owner] + 1
+        angle = sweep[owner] * step / samples[owner]
+        sampled = centers[owner] + radius[owner, None] * (np.cos(angle)[:, None] * u[owner] + np.sin(angle)[:, None] * v[owner])
+        sampled[~curved[owner]] = last[owner[~curved[owner]]]
+
+        targets = np.flatnonzero(np.repeat(circular, counts))
+        points[targets] = sampled
+        points[np.cumsum(counts) - 1] = ends
+        return points, counts
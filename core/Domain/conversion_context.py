@@ -0,0 +1,125 @@
+import copy
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Iterable, Optional, Union
+import numpy as np
+from core.model.app_settings import AppSettings
+from core.model.setting_object import BaseParameters, Conversion, Gobject, OutputMode
+from core.model.toolpath import MoveTable
+from core.Domain.extrusion_control import ExtrusionControl
+from core.Domain.number_formatter import NumberFormatter
+from core.Domain.path_simplifier import PathSimplifier
+from core.Domain.speed_table import SpeedTable
+
+EXTERNAL_AXES = "[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]"
+CONF_DATA = "[0,0,0,0]"
+
+
+@dataclass(frozen=True)
+class ConversionContext:
+    parameters: BaseParameters
+    conversion: Conversion
+    tcp_object: Gobject
+    work_object: Gobject
+    target_suffix: str
+    move_suffix: str
+    fixed_speed: Optional[str]
+    simplify_tolerance: Optional[float]
+    arc_tolerance: Optional[float]
+    drop_redundant: bool
+    output_mode: str
+    position_decimals: Optional[int]
+    speed_step: Optional[float]
+    extrusion_control: bool
+
+    @classmethod
+    def from_settings(cls, settings: Union[AppSettings, 'ConversionContext']) -> 'ConversionContext':
+        if isinstance(settings, ConversionContext):
+            return settings
+
+        parameters = copy.deepcopy(settings.get_parameters())
+        conversion = copy.deepcopy(settings.get_conversion())
+        work_object = copy.deepcopy(settings.get_work_object())
+        qx, qy, qz, qw = work_object.orientation.as_quaternion()
+        quaternion = ",".join(NumberFormatter.format_number(value, conversion.orientation_decimals) for value in (qw, qx, qy, qz))
+
+        return cls(
+            parameters=parameters,
+            conversion=conversion,
+            tcp_object=copy.deepcopy(settings.get_tcp_object()),
+            work_object=work_object,
+            target_suffix=f"],[{quaternion}],{CONF_DATA},{EXTERNAL_AXES}]",
+            move_suffix=f",z{conversion.zone},{parameters.tool_name}\\WObj:={parameters.workobj_name};",
+            fixed_speed=None if conversion.arm_speed == 0 else f"v{conversion.arm_speed}",
+            simplify_tolerance=PathSimplifier.zone_tolerance(conversion.zone) if conversion.simplify else None,
+            arc_tolerance=PathSimplifier.zone_tolerance(conversion.zone) if conversion.arc_fitting else None,
+            drop_redundant=conversion.drop_redundant,
+            output_mode=conversion.output_mode,
+            position_decimals=conversion.position_decimals,
+            speed_step=conversion.speed_step,
+            extrusion_control=conversion.extrusion_control,
+        )
+
+    @property
+    def plans_path(self) -> bool:
+        return self.drop_redundant or self.fits_path
+
+    @property
+    def fits_path(self) -> bool:
+        return self.simplify_tolerance is not None or self.arc_tolerance is not None
+
+    @property
+    def formats_in_workers(self) -> bool:
+        return not (self.fits_path or self.uses_target_table or self.extrusion_control)
+
+    @property
+    def uses_target_table(self) -> bool:
+        return self.output_mode == OutputMode.TABLE.value
+
+    def get_parameters(self) -> BaseParameters:
+        return self.parameters
+
+    def get_conversion(self) -> Conversion:
+        return self.conversion
+
+    def get_tcp_object(self) -> Gobject:
+        return self.tcp_object
+
+    def get_work_object(self) -> Gobject:
+        return self.work_object
+
+    def format_positions(self, points: np.ndarray) -> list[str]:
+        return NumberFormatter.format_rows(points.T, self.position_decimals)
+
+    def format_speeds(self, feeds: np.ndarray) -> Iterable[str]:
+        if self.fixed_speed:
+            return repeat(self.fixed_speed, len(feeds))
+        if self.speed_step is not None:
+            return SpeedTable.speed_names(feeds, self.speed_step)
+        speeds, index = np.unique(feeds, return_inverse=True)
+        names = np.array([f"v{int(feed)}" for feed in speeds.tolist()], dtype=object)
+        return names[index].tolist()
+
+    def format_move(self, x: float, y: float, z: float, feed: Optional[float]) -> str:
+        position = self.format_positions(np.array([[x, y, z]], dtype=np.float64))[0]
+        speed = next(iter(self.format_speeds(np.array([np.nan if feed is None else feed], dtype=np.float64))))
+        return f"MoveL [[{position}{self.target_suffix},{speed}{self.move_suffix}"
+
+    def format_moves(self, moves: MoveTable, events: Optional[np.ndarray] = None) -> list[str]:
+        target_suffix, move_suffix = self.target_suffix, self.move_suffix
+        positions = self.format_positions(moves.positions())
+        speeds = self.format_speeds(moves.f)
+        circular = moves.is_circular()
+        if not circular.any():
+            lines = [f"MoveL [[{position}{target_suffix},{speed}{move_suffix}" for position, speed in zip(positions, speeds)]
+        else:
+            vias = iter(self.format_positions(moves.vias()[circular]))
+            lines = [f"MoveC [[{next(vias)}{target_suffix},[[{position}{target_suffix},{speed}{move_suffix}" if is_circular
+                     else f"MoveL [[{position}{target_suffix},{speed}{move_suffix}"
+                     for position, speed, is_circular in zip(positions, speeds, circular.tolist())]
+
+        if events is not None:
+            for row in np.flatnonzero(events).tolist():
+                triggers = ExtrusionControl.trigger_arguments(int(events[row]))
+                lines[row] = f"Trigg{lines[row][4:-len(move_suffix)]},{triggers}{move_suffix}"
+        return lines
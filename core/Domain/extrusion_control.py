@@ -0,0 +1,48 @@
+import numpy as np
+from core.model.setting_object import Conversion
+from core.model.toolpath import MoveEvent, MoveTable
+from core.Domain.number_formatter import NumberFormatter
+
+TRIGGERS = {
+    MoveEvent.EXTRUDER_ON: "extruder_on",
+    MoveEvent.EXTRUDER_OFF: "extruder_off",
+    MoveEvent.FAN_ON: "fan_on",
+    MoveEvent.FAN_OFF: "fan_off",
+}
+LEAD_TIME_DECIMALS = 3
+
+
+class ExtrusionControl:
+    @staticmethod
+    def events(moves: MoveTable, extruding: bool, fan: bool) -> np.ndarray:
+        previous_extruding = np.concatenate(([extruding], moves.extruding[:-1]))
+        previous_fan = np.concatenate(([fan], moves.fan[:-1]))
+        events = np.zeros(len(moves), dtype=np.uint8)
+        for event, changed in (
+            (MoveEvent.EXTRUDER_ON, moves.extruding & ~previous_extruding),
+            (MoveEvent.EXTRUDER_OFF, ~moves.extruding & previous_extruding),
+            (MoveEvent.FAN_ON, moves.fan & ~previous_fan),
+            (MoveEvent.FAN_OFF, ~moves.fan & previous_fan),
+        ):
+            events[changed] |= np.uint8(event)
+        return events
+
+    @staticmethod
+    def trigger_arguments(events: int) -> str:
+        triggers = [name for event, name in TRIGGERS.items() if events & event]
+        return triggers[0] + "".join(f"\\T{index}:={name}" for index, name in enumerate(triggers[1:], start=2))
+
+    @staticmethod
+    def format_declarations() -> list[str]:
+        return [f"VAR triggdata {name};" for name in TRIGGERS.values()]
+
+    @staticmethod
+    def format_setup(conversion: Conversion) -> list[str]:
+        lead_time = NumberFormatter.format_number(conversion.extrusion_lead_time, LEAD_TIME_DECIMALS)
+        extruder, fan = conversion.extruder_signal, conversion.fan_signal
+        return [
+            f"TriggEquip {TRIGGERS[MoveEvent.EXTRUDER_ON]},0\\Start,{lead_time}\\DOp:={extruder},1;",
+            f"TriggEquip {TRIGGERS[MoveEvent.EXTRUDER_OFF]},0\\Start,{lead_time}\\DOp:={extruder},0;",
+            f"TriggIO {TRIGGERS[MoveEvent.FAN_ON]},0\\Start\\DOp:={fan},1;",
+            f"TriggIO {TRIGGERS[MoveEvent.FAN_OFF]},0\\Start\\DOp:={fan},0;",
+        ]
@@ -0,0 +1,76 @@
+import logging
+import mmap
+from typing import Iterator, Optional
+from core.Domain.gcode_tokenizer import GCodeBuffer, GCodeTokenizer
+from core.Domain.toolpath_cache import ToolpathCache
+from core.model.toolpath import Toolpath
+
+
+class GCodeReader:
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.__file = open(file_path, 'rb')
+        self.__mapping: Optional[mmap.mmap] = None
+        self.__released = 0
+        try:
+            self.__mapping = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.__mapping = None
+
+    def __enter__(self) -> 'GCodeReader':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def data(self) -> GCodeBuffer:
+        return self.__mapping if self.__mapping is not None else b""
+
+    def iter_toolpaths(self, first_line: int = 1, cache: Optional[ToolpathCache] = None) -> Iterator[Toolpath]:
+        return (toolpath for _, _, toolpath in self.iter_offset_blocks(first_line, cache))
+
+    def iter_offset_blocks(self, first_line: int = 1, cache: Optional[ToolpathCache] = None) -> Iterator[tuple[int, int, Toolpath]]:
+        if cache is not None and first_line == 1:
+            return cache.iter_offset_blocks(self.cache_key(), self.iter_parsed_blocks)
+        return self.iter_parsed_blocks(first_line)
+
+    def iter_parsed_blocks(self, first_line: int = 1) -> Iterator[tuple[int, int, Toolpath]]:
+        for offset, block_line, toolpath in GCodeTokenizer.iter_offset_blocks(self.data, first_line):
+            self.release(offset)
+            yield offset, block_line, toolpath
+
+    def release(self, stop: int) -> None:
+        if self.__mapping is None or not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        stop -= stop % mmap.PAGESIZE
+        if stop > self.__released:
+            self.__mapping.madvise(mmap.MADV_DONTNEED, self.__released, stop - self.__released)
+            self.__released = stop
+
+    def cache_key(self) -> str:
+        key = ToolpathCache.key(self.data)
+        self.release(len(self.data))
+        self.__released = 0
+        return key
+
+    def tokenize(self) -> Toolpath:
+        return GCodeTokenizer.tokenize(self.data)
+
+    def read_text(self, limit: Optional[int] = None) -> str:
+        if limit is None or limit >= len(self.data):
+            return self.data[:].decode('utf-8', errors='replace')
+        cut = self.data.rfind(b"\n", 0, limit)
+        return self.data[:cut + 1 if cut >= 0 else limit].decode('utf-8', errors='replace')
+
+    def close(self) -> None:
+        if self.__mapping is not None:
+            try:
+                self.__mapping.close()
+            except BufferError as e:
+                logging.warning(f"G-code mapping of {self.file_path} is still in use: {e}")
+            self.__mapping = None
+        self.__file.close()
@@ -0,0 +1,240 @@
+import logging
+from typing import BinaryIO, Iterator, Union
+import numpy as np
+from core.model.toolpath import GCode, Toolpath
+
+LF = 10
+CR = 13
+SPACE = 32
+SEMICOLON = 59
+DOT = 46
+MINUS = 45
+PLUS = 43
+ZERO = 48
+
+POW10_FLOAT = 10.0 ** np.arange(19)
+PARAMETER_LETTERS = np.frombuffer(Toolpath.PARAMETERS.encode(), dtype=np.uint8)
+LAYER_COMMENTS = (b";LAYER:", b";LAYER_CHANGE")
+
+GCodeBuffer = Union[str, bytes, bytearray, memoryview]
+
+
+class GCodeTokenizer:
+    PARSER_VERSION = 4
+    BLOCK_SIZE = 1 << 18
+    MAX_FAST_DIGITS = 15
+    MAX_COMMAND_NUMBER = 0xFFFF
+
+    @staticmethod
+    def tokenize(data: GCodeBuffer, first_line: int = 1) -> Toolpath:
+        return Toolpath.concatenate(list(GCodeTokenizer.iter_buffer_blocks(data, first_line)))
+
+    @staticmethod
+    def iter_buffer_blocks(data: GCodeBuffer, first_line: int = 1, block_size: int = BLOCK_SIZE, start: int = 0) -> Iterator[Toolpath]:
+        for _, _, toolpath in GCodeTokenizer.iter_offset_blocks(data, first_line, block_size, start):
+            yield toolpath
+
+    @staticmethod
+    def iter_offset_blocks(data: GCodeBuffer, first_line: int = 1, block_size: int = BLOCK_SIZE,
+                           start: int = 0) -> Iterator[tuple[int, int, Toolpath]]:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        for block_start, stop in GCodeTokenizer.iter_block_bounds(data, block_size, start):
+            toolpath, line_count = GCodeTokenizer._tokenize_block(
+                np.frombuffer(data, dtype=np.uint8, count=stop - block_start, offset=block_start), first_line)
+            yield block_start, first_line, toolpath
+            first_line += line_count
+
+    @staticmethod
+    def iter_block_bounds(data: GCodeBuffer, block_size: int = BLOCK_SIZE, start: int = 0) -> Iterator[tuple[int, int]]:
+        size = len(data)
+        while start < size:
+            stop = GCodeTokenizer._block_end(data, start, block_size)
+            yield start, stop
+            start = stop
+
+    @staticmethod
+    def count_lines(data: GCodeBuffer) -> int:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        count = 0
+        for start, stop in GCodeTokenizer.iter_block_bounds(data):
+            buf = np.frombuffer(data, dtype=np.uint8, count=stop - start, offset=start)
+            is_cr = buf == CR
+            count += np.count_nonzero(buf == LF) + np.count_nonzero(is_cr)
+            count -= np.count_nonzero(is_cr[:-1] & (buf[1:] == LF))
+        return int(count)
+
+    @staticmethod
+    def iter_file_blocks(source: BinaryIO, first_line: int = 1, block_size: int = BLOCK_SIZE) -> Iterator[Toolpath]:
+        pending = b""
+        while True:
+            chunk = source.read(block_size)
+            if not chunk:
+                break
+            data = pending + chunk
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                pending = data
+                continue
+            pending = data[cut:]
+            toolpath, line_count = GCodeTokenizer._tokenize_block(np.frombuffer(data, dtype=np.uint8, count=cut), first_line)
+            yield toolpath
+            first_line += line_count
+        if pending:
+            toolpath, _ = GCodeTokenizer._tokenize_block(np.frombuffer(pending, dtype=np.uint8), first_line)
+            yield toolpath
+
+    @staticmethod
+    def _block_end(data: GCodeBuffer, start: int, block_size: int) -> int:
+        size = len(data)
+        stop = start + block_size
+        if stop >= size:
+            return size
+        cut = data.rfind(b"\n", start, stop)
+        if cut < 0:
+            cut = data.find(b"\n", stop)
+        return size if cut < 0 else cut + 1
+
+    @staticmethod
+    def _tokenize_block(buf: np.ndarray, first_line: int) -> tuple[Toolpath, int]:
+        size = buf.size
+        if size == 0:
+            return Toolpath(), 0
+
+        breaks = np.flatnonzero(buf == LF)
+        carriage_returns = np.flatnonzero(buf == CR)
+        if carriage_returns.size:
+            following = buf[np.minimum(carriage_returns + 1, size - 1)]
+            lone = (following != LF) | (carriage_returns + 1 == size)
+            if lone.any():
+                breaks = np.union1d(breaks, carriage_returns[lone])
+
+        active = buf > SPACE
+        semicolons = np.flatnonzero(buf == SEMICOLON)
+        layer_lines = np.empty(0, dtype=np.int64)
+        if semicolons.size:
+            comment_line = np.searchsorted(breaks, semicolons)
+            first = np.empty(semicolons.size, dtype=bool)
+            first[0] = True
+            first[1:] = comment_line[1:] != comment_line[:-1]
+            comment_line = comment_line[first]
+            layer_lines = comment_line[GCodeTokenizer._match_layer_comments(buf, semicolons[first])] + first_line
+            marks = np.zeros(size + 1, dtype=np.int8)
+            marks[semicolons[first]] = 1
+            marks[np.append(breaks, size)[comment_line]] = -1
+            active &= np.cumsum(marks[:-1], dtype=np.int8) == 0
+
+        edges = np.diff(active.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if starts.size == 0:
+            return GCodeTokenizer._with_layer_markers(Toolpath(), layer_lines), breaks.size
+
+        token_line = np.searchsorted(breaks, starts)
+        is_command = np.empty(starts.size, dtype=bool)
+        is_command[0] = True
+        is_command[1:] = token_line[1:] != token_line[:-1]
+        row_of_token = np.cumsum(is_command) - 1
+        row_count = int(row_of_token[-1]) + 1
+
+        command_starts = starts[is_command]
+        values, _, plain = GCodeTokenizer._parse_spans(buf, command_starts + 1, ends[is_command])
+        letters = buf[command_starts]
+        is_letter = ((letters | 0x20) >= ord('a')) & ((letters | 0x20) <= ord('z'))
+        command_valid = plain & is_letter & (values <= GCodeTokenizer.MAX_COMMAND_NUMBER)
+        command = np.full(row_count, -1, dtype=np.int32)
+        command[command_valid] = (letters[command_valid].astype(np.int32) << 16) | values[command_valid].astype(np.int32)
+
+        toolpath = Toolpath(command=command, line=token_line[is_command] + first_line)
+
+        param_letters = buf[starts]
+        is_param = ~is_command & (ends - starts > 1) & np.isin(param_letters, PARAMETER_LETTERS)
+        param_starts = starts[is_param]
+        param_rows = row_of_token[is_param]
+        param_letters = param_letters[is_param]
+        values, valid, _ = GCodeTokenizer._parse_spans(buf, param_starts + 1, ends[is_param])
+        GCodeTokenizer._parse_fallback(buf, param_starts, ends[is_param], values, valid, toolpath.line[param_rows])
+
+        for parameter in Toolpath.PARAMETERS:
+            column = np.full(row_count, np.nan)
+            selected = valid & (param_letters == ord(parameter))
+            rows = param_rows[selected]
+            if rows.size:
+                last = np.empty(rows.size, dtype=bool)
+                last[:-1] = rows[1:] != rows[:-1]
+                last[-1] = True
+                column[rows[last]] = values[selected][last]
+            setattr(toolpath, parameter.lower(), column)
+
+        return GCodeTokenizer._with_layer_markers(toolpath, layer_lines), breaks.size
+
+    @staticmethod
+    def _match_layer_comments(buf: np.ndarray, comment_starts: np.ndarray) -> np.ndarray:
+        matched = np.zeros(comment_starts.size, dtype=bool)
+        last = buf.size - 1
+        for comment in LAYER_COMMENTS:
+            pattern = np.frombuffer(comment, dtype=np.uint8)
+            offsets = np.minimum(comment_starts[:, None] + np.arange(pattern.size), last)
+            matched |= (buf[offsets] == pattern).all(axis=1) & (comment_starts + pattern.size <= buf.size)
+        return matched
+
+    @staticmethod
+    def _with_layer_markers(toolpath: Toolpath, layer_lines: np.ndarray) -> Toolpath:
+        if not layer_lines.size:
+            return toolpath
+        markers = Toolpath(command=np.full(layer_lines.size, GCode.LAYER, dtype=np.int32), line=layer_lines,
+                           **{parameter.lower(): np.full(layer_lines.size, np.nan) for parameter in Toolpath.PARAMETERS})
+        merged = Toolpath.concatenate([markers, toolpath])
+        return merged.take(np.argsort(merged.line, kind='stable'))
+
+    @staticmethod
+    def _parse_spans(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        count = starts.size
+        lengths = ends - starts
+        width = int(lengths.max()) if count else 0
+        if width == 0:
+            return np.full(count, np.nan), np.zeros(count, dtype=bool), np.zeros(count, dtype=bool)
+        width = min(width, GCodeTokenizer.MAX_FAST_DIGITS + 2)
+
+        mantissa = np.zeros(count)
+        digit_count = np.zeros(count, dtype=np.int8)
+        fraction = np.zeros(count, dtype=np.int8)
+        dot_count = np.zeros(count, dtype=np.int8)
+        bad = lengths > width
+        last = buf.size - 1
+
+        first_chars = buf[np.minimum(starts, last)]
+        negative = first_chars == MINUS
+        signed = (negative | (first_chars == PLUS)) & (lengths > 0)
+        for column in range(width):
+            inside = column < lengths
+            chars = buf[np.minimum(starts + column, last)]
+            digits = chars - ZERO
+            is_digit = (digits < 10) & inside
+            is_dot = (chars == DOT) & inside
+            if column == 0:
+                bad |= inside & ~is_digit & ~is_dot & ~signed
+            else:
+                bad |= inside & ~is_digit & ~is_dot
+            mantissa = np.where(is_digit, mantissa * 10 + digits, mantissa)
+            fraction += is_digit & (dot_count > 0)
+            digit_count += is_digit
+            dot_count += is_dot
+
+        valid = ~bad & (dot_count <= 1) & (digit_count >= 1) & (digit_count <= GCodeTokenizer.MAX_FAST_DIGITS)
+        values = np.full(count, np.nan)
+        values[valid] = mantissa[valid] / POW10_FLOAT[fraction[valid]]
+        values[valid & negative] = -values[valid & negative]
+        plain = valid & (dot_count == 0) & ~signed
+        return values, valid, plain
+
+    @staticmethod
+    def _parse_fallback(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, values: np.ndarray, valid: np.ndarray, lines: np.ndarray) -> None:
+        for index in np.flatnonzero(~valid):
+            token = buf[starts[index]:ends[index]].tobytes()
+            try:
+                values[index] = float(token[1:])
+                valid[index] = True
+            except ValueError:
+                logging.info(f"Ignoring non-numeric value '{token.decode('utf-8', 'replace')}' in line {lines[index]}")
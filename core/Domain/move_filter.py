@@ -0,0 +1,29 @@
+from typing import Optional
+import numpy as np
+from core.Domain.number_formatter import NumberFormatter
+from core.model.toolpath import MoveTable, MoveWords
+
+
+class MoveFilter:
+    REASONS = ("pure_feed", "duplicate", "zero_length")
+    TOLERANCE = 1e-9
+
+    @staticmethod
+    def redundant(moves: MoveTable, previous: np.ndarray, decimals: Optional[int] = None) -> dict[str, np.ndarray]:
+        points = moves.positions()
+        before = np.vstack((previous, points[:-1]))
+        stationary = MoveFilter.same_position(points, before, decimals) & ~moves.is_circular()
+
+        positioned = (moves.words & MoveWords.POSITION) != 0
+        feed_only = (moves.words & (MoveWords.FEED | MoveWords.EXTRUSION)) == MoveWords.FEED
+        return {
+            "pure_feed": stationary & ~positioned & feed_only,
+            "duplicate": stationary & positioned,
+            "zero_length": stationary & ~positioned & ~feed_only,
+        }
+
+    @staticmethod
+    def same_position(points: np.ndarray, before: np.ndarray, decimals: Optional[int]) -> np.ndarray:
+        if decimals is None:
+            return (np.abs(points - before) <= MoveFilter.TOLERANCE).all(axis=1)
+        return (NumberFormatter.scaled(points, decimals) == NumberFormatter.scaled(before, decimals)).all(axis=1)
@@ -0,0 +1,78 @@
+from typing import Optional, Sequence
+import numpy as np
+
+ZERO = ord('0')
+MINUS = ord('-')
+POINT = ord('.')
+NEWLINE = ord('\n')
+
+
+class NumberFormatter:
+    TIE_TOLERANCE = 1e-9
+
+    @staticmethod
+    def format_number(value: float, decimals: Optional[int]) -> str:
+        if decimals is None:
+            return str(value)
+        return NumberFormatter.format_rows((np.array([value], dtype=np.float64),), decimals)[0]
+
+    @staticmethod
+    def format_rows(columns: Sequence[np.ndarray], decimals: Optional[int], separator: str = ",") -> list[str]:
+        if not len(columns[0]):
+            return []
+        if decimals is None:
+            return [separator.join(map(str, row)) for row in zip(*(column.tolist() for column in columns))]
+
+        count = len(columns[0])
+        divider = np.frombuffer(separator.encode('ascii'), dtype=np.uint8)
+        parts = []
+        for column in columns:
+            if parts:
+                parts.append(np.broadcast_to(divider, (count, divider.size)))
+            parts.append(NumberFormatter._digits(column, decimals))
+        parts.append(np.full((count, 1), NEWLINE, dtype=np.uint8))
+
+        chars = np.hstack(parts).ravel()
+        return chars[chars != 0].tobytes().decode('ascii').split('\n')[:-1]
+
+    @staticmethod
+    def scaled(values: np.ndarray, decimals: int) -> np.ndarray:
+        product = values * 10 ** decimals
+        scaled = np.rint(product).astype(np.int64)
+        distance = np.abs(np.abs(product - np.trunc(product)) - 0.5)
+        for index in np.flatnonzero(distance <= NumberFormatter.TIE_TOLERANCE * np.maximum(np.abs(product), 1.0)).tolist():
+            scaled[index] = int(format(float(values[index]), f".{decimals}f").replace(".", ""))
+        return scaled
+
+    @staticmethod
+    def _digits(values: np.ndarray, decimals: int) -> np.ndarray:
+        count = len(values)
+        scale = 10 ** decimals
+        scaled = NumberFormatter.scaled(values, decimals)
+        magnitude = np.abs(scaled)
+        whole = magnitude // scale
+        fraction = magnitude - whole * scale
+        point = len(str(int(whole.max()))) + 1
+        width = point + 1 + decimals
+        chars = np.zeros((count, width), dtype=np.uint8)
+
+        first = np.full(count, point - 1, dtype=np.int64)
+        for column in range(point - 1, 0, -1):
+            digit = whole % 10
+            chars[:, column] = digit + ZERO
+            whole //= 10
+            first[digit != 0] = column
+
+        end = np.full(count, point, dtype=np.int64)
+        for column in range(width - 1, point, -1):
+            digit = fraction % 10
+            chars[:, column] = digit + ZERO
+            fraction //= 10
+            end[(digit != 0) & (end == point)] = column + 1
+        chars[:, point] = POINT
+
+        columns = np.arange(width)
+        chars[(columns < first[:, None]) | (columns >= end[:, None])] = 0
+        negative = np.flatnonzero(scaled < 0)
+        chars[negative, first[negative] - 1] = MINUS
+        return chars
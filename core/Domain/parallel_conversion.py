@@ -0,0 +1,110 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, Union
+import numpy as np
+from core.Domain.conversion_context import ConversionContext
+from core.Domain.gcode_reader import GCodeReader
+from core.Domain.gcode_tokenizer import GCodeTokenizer
+from core.model.toolpath import ModalState, MoveTable
+
+
+@dataclass(frozen=True)
+class FileChunk:
+    file_path: str
+    start: int
+    stop: int
+
+    def load(self) -> bytes:
+        with GCodeReader(self.file_path) as reader:
+            return reader.data[self.start:self.stop]
+
+
+
+class ParallelConversion:
+    MIN_CHUNK_SIZE = 1 << 20
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+
+    def split_chunks(self, source: Union[bytes, GCodeReader]) -> list[Union[bytes, FileChunk]]:
+        data = source.data if isinstance(source, GCodeReader) else source
+        chunk_count = max(1, min(self.workers * self.CHUNKS_PER_WORKER, len(data) // self.MIN_CHUNK_SIZE))
+        chunk_size = -(-len(data) // chunk_count)
+        bounds = GCodeTokenizer.iter_block_bounds(data, chunk_size)
+        if isinstance(source, GCodeReader):
+            return [FileChunk(source.file_path, start, stop) for start, stop in bounds]
+        return [data[start:stop] for start, stop in bounds]
+
+    def iter_rapid_chunks(self, converter, source: Union[bytes, GCodeReader], context: ConversionContext) -> Iterator[str]:
+        for rapid_text, moves in self.iter_chunk_results(converter, source, context):
+            if not context.formats_in_workers:
+                rapid_text = "\n".join(converter.stream_moves(moves, context))
+            if rapid_text:
+                yield rapid_text
+
+        if not context.formats_in_workers:
+            rapid_text = "\n".join(converter.flush_moves(context))
+            if rapid_text:
+                yield rapid_text
+
+    def plan_moves(self, converter, source: Union[bytes, GCodeReader], context: ConversionContext) -> MoveTable:
+        planned = [converter.stream_plan(moves, context) for _, moves in self.iter_chunk_results(converter, source, context)]
+        planned.append(converter.flush_plan(context))
+        return MoveTable.concatenate(planned)
+
+    def iter_chunk_results(self, converter, source: Union[bytes, GCodeReader],
+                           context: ConversionContext) -> Iterator[tuple[str, MoveTable]]:
+        chunks = self.split_chunks(source)
+        converter_class = type(converter)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            summaries = list(executor.map(ParallelConversion.scan_chunk, [converter_class] * len(chunks), chunks))
+
+            states = []
+            first_lines = []
+            state = converter.get_modal_state()
+            first_line = 1
+            for summary, line_count in summaries:
+                states.append(state)
+                first_lines.append(first_line)
+                state = state.merged(summary)
+                first_line += line_count
+
+            results = executor.map(ParallelConversion.convert_chunk, [converter_class] * len(chunks), chunks,
+                                   first_lines, states, [context] * len(chunks), [converter.keep_history] * len(chunks))
+            start = np.array((converter.current_x, converter.current_y, converter.current_z))
+            for rapid_text, moves, statistics in results:
+                converter.statistics.update(statistics)
+                if len(moves):
+                    converter.retain_moves(moves, start)
+                    start = moves.positions()[-1]
+                yield rapid_text, moves
+
+        converter.set_modal_state(state)
+
+    @staticmethod
+    def scan_chunk(converter_class, chunk: Union[bytes, FileChunk]) -> tuple[ModalState, int]:
+        data = chunk.load() if isinstance(chunk, FileChunk) else chunk
+        summary = ModalState()
+        for toolpath in GCodeTokenizer.iter_buffer_blocks(data):
+            summary = summary.merged(converter_class.scan_modal_state(toolpath))
+        return summary, GCodeTokenizer.count_lines(data)
+
+    @staticmethod
+    def convert_chunk(converter_class, chunk: Union[bytes, FileChunk], first_line: int, state: ModalState,
+                      context: ConversionContext, keep_moves: bool) -> tuple[str, MoveTable, Counter]:
+        data = chunk.load() if isinstance(chunk, FileChunk) else chunk
+        converter = converter_class()
+        converter.set_modal_state(state)
+        converter.reset_output()
+        rapid_lines = []
+        move_blocks = []
+        for toolpath in GCodeTokenizer.iter_buffer_blocks(data, first_line):
+            moves = converter.record_moves(toolpath)
+            if context.formats_in_workers:
+                rapid_lines.extend(converter.stream_moves(moves, context))
+            if (keep_moves or not context.formats_in_workers) and len(moves):
+                move_blocks.append(moves)
+        return "\n".join(rapid_lines), MoveTable.concatenate(move_blocks), converter.statistics
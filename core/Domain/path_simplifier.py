@@ -0,0 +1,71 @@
+from typing import Optional
+import numpy as np
+from core.model.toolpath import MoveTable
+
+
+class PathSimplifier:
+    ZONE_TOLERANCE_RATIO = 0.1
+    MIN_TOLERANCE = 0.01
+
+    @staticmethod
+    def zone_tolerance(zone: int) -> float:
+        return max(zone * PathSimplifier.ZONE_TOLERANCE_RATIO, PathSimplifier.MIN_TOLERANCE)
+
+    @staticmethod
+    def simplify(moves: MoveTable, tolerance: Optional[float]) -> np.ndarray:
+        if tolerance is None or len(moves) < 3:
+            return np.ones(len(moves), dtype=bool)
+        return PathSimplifier.keep_mask(moves, tolerance)
+
+    @staticmethod
+    def keep_mask(moves: MoveTable, tolerance: float) -> np.ndarray:
+        count = len(moves)
+        points = moves.positions()
+        keep = np.zeros(count, dtype=bool)
+        keep[-1] = True
+        keep[0] = True
+
+        run_start = moves.mode_changes()
+        starts = np.flatnonzero(run_start)
+        keep[starts[1:] - 1] = True
+
+        first = np.maximum(starts - 1, 0)
+        last = np.append(starts[1:] - 1, count - 1)
+        while first.size:
+            spans = last - first - 1
+            active = spans > 0
+            first, last, spans = first[active], last[active], spans[active]
+            if not first.size:
+                break
+
+            owner = np.repeat(np.arange(first.size), spans)
+            offsets = np.cumsum(spans) - spans
+            inner = first[owner] + 1 + np.arange(owner.size) - offsets[owner]
+            distances = PathSimplifier._segment_distance(points[inner], points[first[owner]], points[last[owner]])
+
+            farthest = np.maximum.reduceat(distances, offsets)
+            split = farthest > tolerance
+            is_farthest = distances == farthest[owner]
+            candidates = np.flatnonzero(is_farthest)
+            candidate_owner = owner[candidates]
+            first_candidate = np.empty(candidates.size, dtype=bool)
+            first_candidate[0] = True
+            first_candidate[1:] = candidate_owner[1:] != candidate_owner[:-1]
+            pivot = inner[candidates[first_candidate]]
+
+            pivot, first, last = pivot[split], first[split], last[split]
+            keep[pivot] = True
+            first, last = np.concatenate((first, pivot)), np.concatenate((pivot, last))
+
+        return keep
+
+    @staticmethod
+    def _segment_distance(points: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        direction = ends - starts
+        length_squared = np.einsum('ij,ij->i', direction, direction)
+        offset = points - starts
+        ratio = np.divide(np.einsum('ij,ij->i', offset, direction), length_squared,
+                          out=np.zeros(len(points)), where=length_squared > 0)
+        np.clip(ratio, 0.0, 1.0, out=ratio)
+        nearest = offset - direction * ratio[:, None]
+        return np.sqrt(np.einsum('ij,ij->i', nearest, nearest))
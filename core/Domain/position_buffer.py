@@ -0,0 +1,56 @@
+import numpy as np
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class PositionBuffer:
+    COLUMNS = ["x", "y", "z"]
+
+    def __init__(self, capacity: int = 1024):
+        self.__data = np.empty((max(capacity, 1), len(self.COLUMNS)), dtype=np.float64)
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def append(self, x: float, y: float, z: float) -> None:
+        self.reserve(1)
+        self.__data[self.__size] = (x, y, z)
+        self.__size += 1
+
+    def extend(self, points: np.ndarray) -> None:
+        points = np.asarray(points, dtype=np.float64).reshape(-1, len(self.COLUMNS))
+        self.reserve(len(points))
+        self.__data[self.__size:self.__size + len(points)] = points
+        self.__size += len(points)
+
+    def reserve(self, count: int) -> None:
+        required = self.__size + count
+        capacity = len(self.__data)
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+        grown = np.empty((capacity, len(self.COLUMNS)), dtype=np.float64)
+        grown[:self.__size] = self.__data[:self.__size]
+        self.__data = grown
+
+    def clear(self) -> None:
+        self.__size = 0
+
+    def as_array(self) -> np.ndarray:
+        return self.__data[:self.__size]
+
+    def to_array(self) -> np.ndarray:
+        return self.as_array().copy()
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+        return self.dataframe(self.as_array().copy())
+
+    @staticmethod
+    def dataframe(positions: np.ndarray) -> 'pd.DataFrame':
+        import pandas as pd
+        return pd.DataFrame(np.asarray(positions, dtype=np.float64).reshape(-1, len(PositionBuffer.COLUMNS)),
+                            columns=PositionBuffer.COLUMNS)
@@ -1,110 +1,542 @@
-import pandas as pd
-from core.model.app_settings import AppSettings
-import logging
 import re
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, Union
+import numpy as np
+from core.model.app_settings import AppSettings
+from core.model.toolpath import GCode, LayerIndex, ModalState, MoveTable, MoveWords, RestartIndex, Toolpath
+from core.Domain.arc_fitter import ArcFitter
+from core.Domain.arc_interpolator import ArcInterpolator
+from core.Domain.conversion_context import ConversionContext
+from core.Domain.extrusion_control import ExtrusionControl
+from core.Domain.gcode_reader import GCodeReader
+from core.Domain.gcode_tokenizer import GCodeBuffer, GCodeTokenizer
+from core.Domain.move_filter import MoveFilter
+from core.Domain.parallel_conversion import ParallelConversion
+from core.Domain.path_simplifier import PathSimplifier
+from core.Domain.position_buffer import PositionBuffer
+from core.Domain.rapid_formatter import RAPIDFormatter
+from core.Domain.toolpath_cache import ToolpathCache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+RAPID_COORDINATES = re.compile(r"^.*?\[\[([-+]?\d*\.\d+|\d+),([-+]?\d*\.\d+|\d+),([-+]?\d*\.\d+|\d+)\]", re.MULTILINE)
+
 
 class RAPIDConverter:
-    def __init__(self):
-        self.positions = pd.DataFrame([[0.0, 0.0, -10.0]], columns=["x", "y", "z"])
-        self.robtargets = []
-        self.moveLs = []
+    MOVE_COMMANDS = (GCode.G0, GCode.G1, GCode.G2, GCode.G3)
+    ARC_COMMANDS = (GCode.G2, GCode.G3)
+    PLANE_COMMANDS = (GCode.G17, GCode.G18, GCode.G19)
+    FAN_COMMANDS = (GCode.M106, GCode.M107)
+    EXTRUSION_MODE_COMMANDS = (GCode.M82, GCode.M83)
+
+    def __init__(self, keep_history: bool = False):
+        self.keep_history = keep_history
+        self.positions = PositionBuffer()
+        self.positions.append(0.0, 0.0, -10.0)
+        self.move_blocks: list[MoveTable] = []
+        self.statistics = Counter()
+        self.pending_moves: Optional[MoveTable] = None
+        self.pending_anchored = False
+        self.origin = np.zeros(3)
+        self.stream_position = self.origin
         self.current_z = 0.0
         self.current_x = 0.0
         self.current_y = 0.0
         self.current_f = None
+        self.current_plane = int(GCode.G17)
+        self.current_fan = False
+        self.current_e = 0.0
+        self.relative_extrusion = False
+        self.emitted_extruding = False
+        self.emitted_fan = False
+        self.layer_pending = False
+        self.layer_markers: list[np.ndarray] = []
+        self.layer_changes: list[np.ndarray] = []
+        self.restart_index: Optional[RestartIndex] = None
+        self.cancel_check: Optional[Callable[[], None]] = None
+
+    def iter_rapid_lines(self, toolpaths: Iterable[Toolpath], settings: Union[AppSettings, ConversionContext]) -> Iterator[str]:
+        context = ConversionContext.from_settings(settings)
+        self.current_f = None
+        self.reset_output()
+
+        for toolpath in toolpaths:
+            self.check_cancelled()
+            yield from self.convert_toolpath(toolpath, context)
+        yield from self.flush_moves(context)
+
+    def check_cancelled(self) -> None:
+        if self.cancel_check is not None:
+            self.cancel_check()
+
+    def reset_output(self) -> None:
+        self.move_blocks = []
+        self.statistics = Counter()
+        self.pending_moves = None
+        self.pending_anchored = False
+        self.origin = np.array((self.current_x, self.current_y, self.current_z))
+        self.emitted_extruding = False
+        self.emitted_fan = False
+        self.stream_position = self.origin
+
+    def convert_toolpath(self, toolpath: Toolpath, context: ConversionContext) -> Iterator[str]:
+        moves = self.record_moves(toolpath)
+        if not context.plans_path:
+            return self.emit_moves(moves, context)
+        return self.stream_moves(moves, context)
+
+    def plan_toolpaths(self, toolpaths: Iterable[Toolpath], settings: Union[AppSettings, ConversionContext]) -> MoveTable:
+        context = ConversionContext.from_settings(settings)
+        self.current_f = None
+        self.reset_output()
+
+        planned = []
+        for toolpath in toolpaths:
+            self.check_cancelled()
+            planned.append(self.stream_plan(self.record_moves(toolpath), context))
+        planned.append(self.flush_plan(context))
+        return MoveTable.concatenate(planned)
+
+    def stream_moves(self, moves: MoveTable, context: ConversionContext, final: bool = False) -> Iterator[str]:
+        return self.emit_moves(self.stream_plan(moves, context, final), context)
+
+    def stream_plan(self, moves: MoveTable, context: ConversionContext, final: bool = False) -> MoveTable:
+        if not context.plans_path:
+            return moves
+        if context.drop_redundant and len(moves):
+            moves = self.drop_redundant(moves, context.position_decimals)
+        if not context.fits_path:
+            return moves
+        anchored = self.pending_anchored
+        table = MoveTable.concatenate([self.pending_moves, moves]) if self.pending_moves is not None else moves
+        if final:
+            ready = len(table)
+        else:
+            starts = np.flatnonzero(table.mode_changes())
+            ready = int(starts[-1]) if starts.size else 0
+        if ready <= int(anchored):
+            self.pending_moves = table if len(table) and not final else None
+            self.pending_anchored = anchored and self.pending_moves is not None
+            return MoveTable()
+
+        planned = self.plan_moves(table.slice(0, ready), context)
+        if anchored:
+            planned = planned.slice(1, len(planned))
+        self.pending_moves = None if final else table.slice(ready - 1, len(table))
+        self.pending_anchored = not final
+        return planned
+
+    def flush_moves(self, context: ConversionContext) -> Iterator[str]:
+        return self.emit_moves(self.flush_plan(context), context)
+
+    def flush_plan(self, context: ConversionContext) -> MoveTable:
+        if self.pending_moves is None:
+            return MoveTable()
+        return self.stream_plan(MoveTable(), context, final=True)
+
+    def drop_redundant(self, moves: MoveTable, decimals: Optional[int] = None) -> MoveTable:
+        reasons = MoveFilter.redundant(moves, self.stream_position, decimals)
+        self.stream_position = moves.positions()[-1]
+        dropped = np.zeros(len(moves), dtype=bool)
+        for reason, mask in reasons.items():
+            count = int(np.count_nonzero(mask))
+            if count:
+                self.statistics[reason] += count
+                dropped |= mask
+        return moves.take(~dropped) if dropped.any() else moves
+
+    def plan_moves(self, moves: MoveTable, context: ConversionContext) -> MoveTable:
+        keep, via = ArcFitter.fit(moves, context.arc_tolerance)
+        planned = moves
+        if not keep.all():
+            self.statistics['arc_targets'] += len(moves) - int(np.count_nonzero(keep))
+            planned = moves.take(keep)
+            via = via[keep]
+            fitted = via >= 0
+            planned.via_x[fitted], planned.via_y[fitted], planned.via_z[fitted] = moves.positions()[via[fitted]].T
+
+        simplified = PathSimplifier.simplify(planned, context.simplify_tolerance)
+        if not simplified.all():
+            self.statistics['simplified_targets'] += len(planned) - int(np.count_nonzero(simplified))
+            planned = planned.take(simplified)
+        return planned
+
+    def record_moves(self, toolpath: Toolpath) -> MoveTable:
+        start = np.array((self.current_x, self.current_y, self.current_z))
+        moves = self.resolve_moves(toolpath)
+        self.retain_moves(moves, start)
+        return moves
+
+    def retain_moves(self, moves: MoveTable, start: np.ndarray) -> None:
+        if self.keep_history and len(moves):
+            self.move_blocks.append(moves)
+            self.record_positions(moves, start)
+
+    def record_positions(self, moves: MoveTable, start: np.ndarray) -> None:
+        points, counts = ArcInterpolator.render_points(moves, start)
+        offsets = len(self.positions) + np.cumsum(counts) - counts
+        self.layer_markers.append(offsets[moves.layer_start])
+        self.layer_changes.append(offsets[moves.z != np.concatenate(([start[2]], moves.z[:-1]))])
+        self.positions.extend(points)
+
+    def get_layer_index(self) -> LayerIndex:
+        markers = np.concatenate(self.layer_markers) if self.layer_markers else np.empty(0, dtype=np.int64)
+        starts = markers if markers.size else np.concatenate(self.layer_changes) if self.layer_changes else markers
+        return LayerIndex.from_starts(starts[1:] - 1, len(self.positions) - 1)
+
+    def resolve_moves(self, toolpath: Toolpath) -> MoveTable:
+        feeds = self._fill_modal(toolpath.f, self.current_f)
+        planes = self._fill_plane(toolpath.command, self.current_plane)
+        fans = self._fill_fan(toolpath, self.current_fan)
+        is_move = np.isin(toolpath.command, self.MOVE_COMMANDS)
+        layer_start = self._layer_starts(toolpath, is_move)
+        relative = self._fill_extrusion_mode(toolpath.command, self.relative_extrusion)
+        extruder = self._fill_modal(self._extrusion_positions(toolpath, is_move), self.current_e)
+        previous_e = np.concatenate(([self.current_e], extruder[:-1]))
+        extruding = np.where(relative, toolpath.e > 0, toolpath.e > previous_e)[is_move]
+        if len(feeds):
+            self.current_f = None if np.isnan(feeds[-1]) else float(feeds[-1])
+            self.current_plane = int(planes[-1])
+            self.current_fan = bool(fans[-1])
+            self.current_e = float(extruder[-1])
+            self.relative_extrusion = bool(relative[-1])
+        if not is_move.any():
+            return MoveTable()
+
+        start = np.array((self.current_x, self.current_y, self.current_z))
+        count = int(np.count_nonzero(is_move))
+        moves = MoveTable(
+            x=self._fill_modal(toolpath.x[is_move], self.current_x),
+            y=self._fill_modal(toolpath.y[is_move], self.current_y),
+            z=self._fill_modal(toolpath.z[is_move], self.current_z),
+            f=feeds[is_move],
+            extruding=extruding,
+            fan=fans[is_move],
+            layer_start=layer_start,
+            words=self._move_words(toolpath, is_move),
+            line=toolpath.line[is_move],
+            via_x=np.full(count, np.nan),
+            via_y=np.full(count, np.nan),
+            via_z=np.full(count, np.nan),
+        )
+        self.current_x, self.current_y, self.current_z = float(moves.x[-1]), float(moves.y[-1]), float(moves.z[-1])
+
+        commands = toolpath.command[is_move]
+        arcs = np.isin(commands, self.ARC_COMMANDS)
+        if arcs.any():
+            rows = np.flatnonzero(is_move)[arcs]
+            moves = ArcInterpolator.expand(
+                moves, start, arcs,
+                clockwise=commands[arcs] == GCode.G2,
+                offsets=np.column_stack((toolpath.i[rows], toolpath.j[rows], toolpath.k[rows])),
+                radius=toolpath.r[rows],
+                planes=planes[rows],
+            )
+        return moves
 
+    def emit_moves(self, moves: MoveTable, context: ConversionContext) -> Iterator[str]:
+        self.statistics['instructions'] += len(moves)
+        circular_count = int(np.count_nonzero(moves.is_circular()))
+        if circular_count:
+            self.statistics['circular_moves'] += circular_count
+        events = None
+        if context.extrusion_control and len(moves):
+            events = ExtrusionControl.events(moves, self.emitted_extruding, self.emitted_fan)
+            self.emitted_extruding, self.emitted_fan = bool(moves.extruding[-1]), bool(moves.fan[-1])
+            self.statistics['extrusion_events'] += int(np.count_nonzero(events))
+        return iter(context.format_moves(moves, events))
 
-    def translate_gcode_to_rapid(self, gcode_cmd, params, settings: AppSettings):
-        tool_name = settings.get_parameters().tool_name
-        workobj_name = settings.get_parameters().workobj_name
-        conversion = settings.get_conversion()
+    def get_move_table(self) -> MoveTable:
+        self.move_blocks = [MoveTable.concatenate(self.move_blocks)] if self.move_blocks else []
+        return self.move_blocks[0] if self.move_blocks else MoveTable()
 
-        qx, qy, qz, qw = settings.get_work_object().orientation.as_quaternion()
+    def iter_table_module(self, moves: MoveTable, context: ConversionContext) -> Iterator[str]:
+        self.count_targets(moves)
+        return RAPIDFormatter.iter_table_module(moves, context)
 
-        if not isinstance(gcode_cmd, list):
-            gcode_cmd = [gcode_cmd]
+    def count_targets(self, moves: MoveTable) -> None:
+        self.statistics['instructions'] += len(moves)
+        self.statistics['circular_moves'] += int(np.count_nonzero(moves.is_circular()))
 
-        if 'Z' in params:
-            self.current_z = params['Z']
-        if 'X' in params:
-            self.current_x = params['X']
-        if 'Y' in params:
-            self.current_y = params['Y']
+    def reemit_rapid(self, settings: Union[AppSettings, ConversionContext]) -> str:
+        context = ConversionContext.from_settings(settings)
+        self.statistics = Counter()
+        self.pending_moves = None
+        self.pending_anchored = False
+        self.stream_position = self.origin
+        moves = self.stream_plan(self.get_move_table(), context, final=True)
+        if context.uses_target_table:
+            return "".join(self.iter_table_module(moves, context))
+        return "\n".join(self.emit_moves(moves, context))
 
-        if any(cmd in ["G0", "G1", "G00", "G01"] for cmd in gcode_cmd):
-            x = params.get('X', self.current_x)
-            y = params.get('Y', self.current_y)
-            z = params.get('Z', self.current_z)
-            if conversion.arm_speed == 0:
-                speed = int(self.current_f)
-            else:
-                speed = conversion.arm_speed
+    def get_modal_state(self) -> ModalState:
+        return ModalState(x=self.current_x, y=self.current_y, z=self.current_z, f=self.current_f, plane=self.current_plane,
+                          fan=self.current_fan, layer_pending=self.layer_pending, e=self.current_e,
+                          relative_extrusion=self.relative_extrusion)
 
-            robtarget = f"[[{x},{y},{z}],[{qw},{qx},{qy},{qz}],[0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]]"
-            return f"MoveL {robtarget},v{speed},z{conversion.zone},{tool_name}\\WObj:={workobj_name};"
+    def set_modal_state(self, state: ModalState) -> None:
+        if state.x is not None:
+            self.current_x = state.x
+        if state.y is not None:
+            self.current_y = state.y
+        if state.z is not None:
+            self.current_z = state.z
+        self.current_f = state.f
+        if state.plane is not None:
+            self.current_plane = state.plane
+        if state.fan is not None:
+            self.current_fan = state.fan
+        if state.layer_pending is not None:
+            self.layer_pending = state.layer_pending
+        if state.e is not None:
+            self.current_e = state.e
+        if state.relative_extrusion is not None:
+            self.relative_extrusion = state.relative_extrusion
 
-        return ""
+    @classmethod
+    def scan_modal_state(cls, toolpath: Toolpath) -> ModalState:
+        is_move = np.isin(toolpath.command, cls.MOVE_COMMANDS)
+        return ModalState(
+            x=cls._last_given(toolpath.x[is_move]),
+            y=cls._last_given(toolpath.y[is_move]),
+            z=cls._last_given(toolpath.z[is_move]),
+            f=cls._last_given(toolpath.f),
+            plane=cls._last_plane(toolpath.command),
+            fan=cls._last_fan(toolpath),
+            layer_pending=cls._last_layer_pending(toolpath, is_move),
+            e=cls._last_given(cls._extrusion_positions(toolpath, is_move)),
+            relative_extrusion=cls._last_extrusion_mode(toolpath.command),
+        )
 
-    def gcode_to_rapid(self, gcode_text: str, settings: AppSettings) -> str:
-        rapid_lines = []
+    @classmethod
+    def _last_plane(cls, commands: np.ndarray) -> Optional[int]:
+        given = np.flatnonzero(np.isin(commands, cls.PLANE_COMMANDS))
+        return int(commands[given[-1]]) if given.size else None
+
+    @classmethod
+    def _last_fan(cls, toolpath: Toolpath) -> Optional[bool]:
+        given = np.flatnonzero(np.isin(toolpath.command, cls.FAN_COMMANDS))
+        return bool(cls._fan_states(toolpath)[given[-1]]) if given.size else None
+
+    @classmethod
+    def _last_extrusion_mode(cls, commands: np.ndarray) -> Optional[bool]:
+        given = np.flatnonzero(np.isin(commands, cls.EXTRUSION_MODE_COMMANDS))
+        return bool(commands[given[-1]] == GCode.M83) if given.size else None
+
+    @staticmethod
+    def _last_layer_pending(toolpath: Toolpath, is_move: np.ndarray) -> Optional[bool]:
+        markers = np.flatnonzero(toolpath.command == GCode.LAYER)
+        moves = np.flatnonzero(is_move)
+        if not markers.size:
+            return False if moves.size else None
+        return bool(not moves.size or markers[-1] > moves[-1])
+
+    def _layer_starts(self, toolpath: Toolpath, is_move: np.ndarray) -> np.ndarray:
+        seen = np.cumsum(toolpath.command == GCode.LAYER)
+        at_moves = seen[is_move]
+        starts = np.diff(at_moves, prepend=0) > 0
+        if starts.size:
+            starts[0] |= self.layer_pending
+            self.layer_pending = bool(seen[-1] > at_moves[-1])
+        elif seen.size:
+            self.layer_pending |= bool(seen[-1])
+        return starts
+
+    @staticmethod
+    def _first_given(values: np.ndarray) -> Optional[float]:
+        given = np.flatnonzero(~np.isnan(values))
+        return float(values[given[0]]) if given.size else None
+
+    @staticmethod
+    def _last_given(values: np.ndarray) -> Optional[float]:
+        given = np.flatnonzero(~np.isnan(values))
+        return float(values[given[-1]]) if given.size else None
+
+    @staticmethod
+    def _fill_modal(values: np.ndarray, initial: Optional[float]) -> np.ndarray:
+        given = np.where(np.isnan(values), -1, np.arange(len(values)))
+        np.maximum.accumulate(given, out=given)
+        initial = np.nan if initial is None else initial
+        return np.where(given < 0, initial, values[np.maximum(given, 0)])
+
+    @staticmethod
+    def _move_words(toolpath: Toolpath, is_move: np.ndarray) -> np.ndarray:
+        positioned = ~(np.isnan(toolpath.x[is_move]) & np.isnan(toolpath.y[is_move]) & np.isnan(toolpath.z[is_move]))
+        words = np.where(positioned, MoveWords.POSITION, MoveWords.NONE).astype(np.uint8)
+        words |= np.where(np.isnan(toolpath.f[is_move]), MoveWords.NONE, MoveWords.FEED).astype(np.uint8)
+        words |= np.where(np.isnan(toolpath.e[is_move]), MoveWords.NONE, MoveWords.EXTRUSION).astype(np.uint8)
+        return words
+
+    @classmethod
+    def _fill_fan(cls, toolpath: Toolpath, initial: bool) -> np.ndarray:
+        given = np.where(np.isin(toolpath.command, cls.FAN_COMMANDS), np.arange(len(toolpath.command)), -1)
+        np.maximum.accumulate(given, out=given)
+        return np.where(given < 0, initial, cls._fan_states(toolpath)[np.maximum(given, 0)])
+
+    @staticmethod
+    def _fan_states(toolpath: Toolpath) -> np.ndarray:
+        return (toolpath.command == GCode.M106) & ~(toolpath.s == 0)
+
+    @classmethod
+    def _fill_extrusion_mode(cls, commands: np.ndarray, initial: bool) -> np.ndarray:
+        given = np.where(np.isin(commands, cls.EXTRUSION_MODE_COMMANDS), np.arange(len(commands)), -1)
+        np.maximum.accumulate(given, out=given)
+        return np.where(given < 0, initial, commands[np.maximum(given, 0)] == GCode.M83)
+
+    @staticmethod
+    def _extrusion_positions(toolpath: Toolpath, is_move: np.ndarray) -> np.ndarray:
+        is_reset = toolpath.command == GCode.G92
+        positions = np.where(is_move | is_reset, toolpath.e, np.nan)
+        bare_reset = is_reset & np.isnan(toolpath.x) & np.isnan(toolpath.y) & np.isnan(toolpath.z) & np.isnan(toolpath.e)
+        positions[bare_reset] = 0.0
+        return positions
+
+    @classmethod
+    def _fill_plane(cls, commands: np.ndarray, initial: int) -> np.ndarray:
+        given = np.where(np.isin(commands, cls.PLANE_COMMANDS), np.arange(len(commands)), -1)
+        np.maximum.accumulate(given, out=given)
+        return np.where(given < 0, initial, commands[np.maximum(given, 0)])
+
+    def gcode_to_rapid(self, gcode_text: GCodeBuffer, settings: Union[AppSettings, ConversionContext], workers: int = 1) -> str:
+        if workers > 1:
+            data = gcode_text.encode('utf-8') if isinstance(gcode_text, str) else gcode_text
+            return self.gcode_to_rapid_parallel(data, settings, workers)
+        return self.toolpaths_to_rapid(GCodeTokenizer.iter_buffer_blocks(gcode_text), settings)
+
+    def gcode_file_to_rapid(self, reader: GCodeReader, settings: Union[AppSettings, ConversionContext], workers: int = 1,
+                            cache: Optional[ToolpathCache] = None) -> str:
+        if workers > 1 and cache is None:
+            return self.gcode_to_rapid_parallel(reader, settings, workers)
+        return self.toolpaths_to_rapid(reader.iter_toolpaths(cache=cache), settings)
+
+    def gcode_range_to_rapid(self, source: Union[GCodeBuffer, GCodeReader], settings: Union[AppSettings, ConversionContext],
+                             first_line: int, last_line: Optional[int] = None, restart_index: Optional[RestartIndex] = None) -> str:
+        return self.toolpaths_to_rapid(self.restart_toolpaths(source, settings, first_line, last_line, False, restart_index), settings)
+
+    def gcode_layers_to_rapid(self, source: Union[GCodeBuffer, GCodeReader], settings: Union[AppSettings, ConversionContext],
+                              first_layer: int, last_layer: Optional[int] = None, restart_index: Optional[RestartIndex] = None) -> str:
+        return self.toolpaths_to_rapid(self.restart_toolpaths(source, settings, first_layer, last_layer, True, restart_index), settings)
+
+    def restart_toolpaths(self, source: Union[GCodeBuffer, GCodeReader], settings: Union[AppSettings, ConversionContext], first: int,
+                          last: Optional[int] = None, by_layer: bool = False,
+                          restart_index: Optional[RestartIndex] = None) -> Iterator[Toolpath]:
+        context = ConversionContext.from_settings(settings)
+        data = self._restart_data(source)
+        self.restart_index = restart_index if restart_index is not None else self.build_restart_index(data)
+        first_line, last_line = self.restart_index.layer_line_range(first, last) if by_layer else (first, last)
+        return self.iter_range_toolpaths(data, self.restart_index, first_line, last_line, context.get_conversion().restart_clearance)
+
+    def iter_range_toolpaths(self, data: GCodeBuffer, restart_index: RestartIndex, first_line: int, last_line: Optional[int],
+                             clearance: float) -> Iterator[Toolpath]:
+        if not len(restart_index):
+            return
+        checkpoint = restart_index.checkpoint(first_line)
+        self.set_modal_state(restart_index.states[checkpoint])
+        unapproached: Optional[list[Toolpath]] = []
+        for toolpath in GCodeTokenizer.iter_buffer_blocks(data, int(restart_index.lines[checkpoint]),
+                                                          start=int(restart_index.offsets[checkpoint])):
+            self.check_cancelled()
+            begin = int(np.searchsorted(toolpath.line, first_line))
+            end = len(toolpath) if last_line is None else int(np.searchsorted(toolpath.line, last_line, side='right'))
+            if begin:
+                self.resolve_moves(toolpath.slice(0, begin))
+            if begin < end:
+                selected = toolpath.slice(begin, end)
+                if unapproached is None:
+                    yield selected
+                else:
+                    unapproached.append(selected)
+                    target = self._approach_target(selected)
+                    if target is not None:
+                        yield self.approach_toolpath(clearance, first_line, target, self._approach_feed(unapproached))
+                        yield from unapproached
+                        unapproached = None
+            if end < len(toolpath):
+                break
+        if unapproached:
+            yield from unapproached
+
+    def approach_toolpath(self, clearance: float, line: int, target: np.ndarray, feed: Optional[float]) -> Toolpath:
+        approach = Toolpath(command=np.full(2, GCode.G0, dtype=np.int32), line=np.full(2, line, dtype=np.int64),
+                            **{parameter.lower(): np.full(2, np.nan) for parameter in Toolpath.PARAMETERS})
+        approach.x[0], approach.y[0] = target[0], target[1]
+        approach.z[:] = target[2] + clearance, target[2]
+        approach.f[0] = np.nan if feed is None else feed
+        return approach
+
+    def _approach_target(self, toolpath: Toolpath) -> Optional[np.ndarray]:
+        current = np.array((self.current_x, self.current_y, self.current_z))
+        given = np.column_stack((toolpath.x, toolpath.y, toolpath.z))
+        positioned = np.flatnonzero(np.isin(toolpath.command, self.MOVE_COMMANDS) & ~np.isnan(given).all(axis=1))
+        if not positioned.size:
+            return None
+        row = positioned[0]
+        if toolpath.command[row] in self.ARC_COMMANDS:
+            return current
+        return np.where(np.isnan(given[row]), current, given[row])
+
+    def _approach_feed(self, toolpaths: list[Toolpath]) -> Optional[float]:
+        if self.current_f is not None:
+            return self.current_f
+        return next((feed for feed in map(self._first_given, (toolpath.f for toolpath in toolpaths)) if feed is not None), None)
+
+    @classmethod
+    def build_restart_index(cls, source: Union[GCodeBuffer, GCodeReader]) -> RestartIndex:
+        converter = cls()
+        offsets, lines, states = [], [], []
+        marker_lines, change_lines = [], []
+        for offset, first_line, toolpath in GCodeTokenizer.iter_offset_blocks(cls._restart_data(source)):
+            offsets.append(offset)
+            lines.append(first_line)
+            states.append(converter.get_modal_state())
+            start_z = converter.current_z
+            moves = converter.resolve_moves(toolpath)
+            if len(moves):
+                marker_lines.append(moves.line[moves.layer_start])
+                change_lines.append(moves.line[moves.z != np.concatenate(([start_z], moves.z[:-1]))])
+        return RestartIndex(offsets=np.array(offsets, dtype=np.int64), lines=np.array(lines, dtype=np.int64), states=states,
+                            layer_lines=cls._layer_lines(marker_lines, change_lines))
+
+    @staticmethod
+    def _layer_lines(marker_lines: list[np.ndarray], change_lines: list[np.ndarray]) -> np.ndarray:
+        markers = np.concatenate(marker_lines) if marker_lines else np.empty(0, dtype=np.int64)
+        starts = np.unique(markers if markers.size or not change_lines else np.concatenate(change_lines))
+        return np.concatenate(([1], starts[1:])).astype(np.int64)
+
+    @staticmethod
+    def _restart_data(source: Union[GCodeBuffer, GCodeReader]) -> GCodeBuffer:
+        if isinstance(source, GCodeReader):
+            return source.data
+        return source.encode('utf-8') if isinstance(source, str) else source
+
+    def toolpaths_to_rapid(self, toolpaths: Iterable[Toolpath], settings: Union[AppSettings, ConversionContext]) -> str:
+        context = ConversionContext.from_settings(settings)
+        if context.uses_target_table:
+            return "".join(self.iter_table_module(self.plan_toolpaths(toolpaths, context), context))
+        return "\n".join(self.iter_rapid_lines(toolpaths, context))
+
+    def gcode_to_rapid_parallel(self, source: Union[bytes, GCodeReader], settings: Union[AppSettings, ConversionContext], workers: int) -> str:
+        context = ConversionContext.from_settings(settings)
         self.current_f = None
+        self.reset_output()
+        parallel = ParallelConversion(workers)
+        if context.uses_target_table:
+            return "".join(self.iter_table_module(parallel.plan_moves(self, source, context), context))
+        return "\n".join(parallel.iter_rapid_chunks(self, source, context))
 
-        for line in gcode_text.splitlines():
-            if line.startswith(';') or not line.strip():
-                continue
-            command = line.split(';')[0].strip()
-            if not command:
-                continue
-            parts = command.split()
-            if not parts:
-                continue
-
-            gcode_cmd = parts[0]
-            params = {}
-            for part in parts[1:]:
-                if len(part) > 1 and part[0].isalpha():
-                    try:
-                        params[part[0]] = float(part[1:])
-                        if part[0] == 'F':
-                            self.current_f = float(part[1:])
-                    except ValueError:
-                        logging.info(f"Ignoring non-numeric value in line: '{line}'")
-                        continue
-
-            if gcode_cmd in ["G0", "G1", "G00", "G01"]:
-                rapid_cmd = self.translate_gcode_to_rapid(gcode_cmd, params, settings)
-                if rapid_cmd:
-                    rapid_lines.append(rapid_cmd)
-
-                x = params.get('X', self.current_x)
-                y = params.get('Y', self.current_y)
-                z = params.get('Z', self.current_z)
-                self.positions = pd.concat([self.positions, pd.DataFrame([[x, y, z]], columns=["x", "y", "z"])],
-                                           ignore_index=True)
-
-        return "\n".join(rapid_lines)
-
-    def get_positions(self):
-        return self.positions
-
-    def extract_coordinates_from_rapid(self, rapid_code):
-        positions_list = []
-        pattern = r"\[\[([-+]?\d*\.\d+|\d+),([-+]?\d*\.\d+|\d+),([-+]?\d*\.\d+|\d+)\]"
-
-        for line in rapid_code.strip().split('\n'):
-            match = re.search(pattern, line)
-            if match:
-                try:
-                    x = float(match.group(1))
-                    y = float(match.group(2))
-                    z = float(match.group(3))
-                    positions_list.append([x, y, z])
-                except (ValueError, IndexError) as e:
-                    logging.error(f"Error extracting coordinates from RAPID: {line}, Error: {str(e)}")
-
-        if positions_list:
-            return pd.DataFrame(positions_list, columns=["x", "y", "z"])
-        else:
-            return pd.DataFrame(columns=["x", "y", "z"])
+    def get_positions(self) -> np.ndarray:
+        return self.positions.to_array()
+
+    def get_move_positions(self) -> np.ndarray:
+        return self.get_positions()[1:]
+
+    def get_positions_dataframe(self) -> 'pd.DataFrame':
+        return PositionBuffer.dataframe(self.get_positions())
+
+    @staticmethod
+    def extract_coordinates_from_rapid(rapid_code: str) -> np.ndarray:
+        coordinates = RAPID_COORDINATES.findall(rapid_code)
+        return np.array(coordinates, dtype=np.float64).reshape(-1, len(PositionBuffer.COLUMNS))
 
 
@@ -1,33 +1,256 @@
+import os
+import re
+from typing import Iterable, Iterator, Optional
+import numpy as np
 from core.model.setting_object import BaseParameters, Gobject, Conversion
+from core.model.toolpath import MoveTable
+from core.Domain.conversion_context import ConversionContext
+from core.Domain.extrusion_control import ExtrusionControl
+from core.Domain.number_formatter import NumberFormatter
+from core.Domain.speed_table import SpeedTable
+
+TARGETS = "targets"
+TARGET = "target"
+SPEEDS = "speeds"
+SPEED_INDEX = "speed_index"
+VIAS = "vias"
+VIA_INDEX = "via_index"
+VIA_TARGET = "via_target"
+EVENTS = "events"
+LOAD_SESSION = "load_session"
+ARRAY_VALUES_PER_LINE = 8
 
 
 class RAPIDFormatter:
     @staticmethod
-    def format_tool_data(params: BaseParameters, tcp: Gobject) -> str:
-        x, y, z = tcp.position.as_position()
-        qx, qy, qz, qw = tcp.orientation.as_quaternion()
-        cog_x, cog_y, cog_z = tcp.get_center_of_gravity().as_position()
-        return f"PERS tooldata {params.tool_name}:=[TRUE,[[{x},{y},{z}],[{qw},{qx},{qy},{qz}]],[1,[{cog_x},{cog_y},{cog_z}],[1,0,0,0],0,0,0]];"
+    def format_tool_data(params: BaseParameters, tcp: Gobject, conversion: Optional[Conversion] = None) -> str:
+        position = RAPIDFormatter.format_position(tcp.position.as_position(), conversion)
+        orientation = RAPIDFormatter.format_orientation(tcp.orientation.as_quaternion(), conversion)
+        center_of_gravity = RAPIDFormatter.format_position(tcp.get_center_of_gravity().as_position(), conversion)
+        return f"PERS tooldata {params.tool_name}:=[TRUE,[[{position}],[{orientation}]],[1,[{center_of_gravity}],[1,0,0,0],0,0,0]];"
+
+    @staticmethod
+    def format_workobj_data(params: BaseParameters, workobj: Gobject, conversion: Optional[Conversion] = None) -> str:
+        position = RAPIDFormatter.format_position(workobj.position.as_position(), conversion)
+        orientation = RAPIDFormatter.format_orientation(workobj.orientation.as_quaternion(), conversion)
+        return f"TASK PERS wobjdata {params.workobj_name}:=[FALSE,TRUE,\"\",[[{position}],[{orientation}]],[[0,0,0],[1,0,0,0]]];"
+
+    @staticmethod
+    def format_position(position: tuple[float, float, float], conversion: Optional[Conversion]) -> str:
+        decimals = conversion.position_decimals if conversion else None
+        return ",".join(NumberFormatter.format_number(value, decimals) for value in position)
+
+    @staticmethod
+    def format_orientation(quaternion: tuple[float, float, float, float], conversion: Optional[Conversion]) -> str:
+        decimals = conversion.orientation_decimals if conversion else None
+        qx, qy, qz, qw = quaternion
+        return ",".join(NumberFormatter.format_number(value, decimals) for value in (qw, qx, qy, qz))
 
     @staticmethod
-    def format_workobj_data(params: BaseParameters, workobj: Gobject) -> str:
-        x, y, z = workobj.position.as_position()
-        qx, qy, qz, qw = workobj.orientation.as_quaternion()
-        return f"TASK PERS wobjdata {params.workobj_name}:=[FALSE,TRUE,\"\",[[{x},{y},{z}],[{qw},{qx},{qy},{qz}]],[[0,0,0],[1,0,0,0]]];"
+    def format_module_header(params: BaseParameters, tool_data: str, workobj_data: str, conversion: Conversion) -> str:
+        return RAPIDFormatter.format_module_data(params, tool_data, workobj_data) + RAPIDFormatter.format_module_procedures(params, conversion)
 
     @staticmethod
-    def format_module(params: BaseParameters, tool_data: str, workobj_data: str, rapid_lines: list[str], conversion: Conversion) -> str:
-        new_line = '\n'
+    def format_module_data(params: BaseParameters, tool_data: str, workobj_data: str) -> str:
         return f"""MODULE {params.module_name}
         {tool_data}
 
         {workobj_data}
-        PROC main()
+"""
+
+    @staticmethod
+    def format_module_procedures(params: BaseParameters, conversion: Conversion) -> str:
+        declarations = setup = ""
+        if conversion.extrusion_control:
+            declarations = "".join(f"        {line}\n" for line in ExtrusionControl.format_declarations())
+            setup = "".join(f"            {line}\n" for line in ExtrusionControl.format_setup(conversion))
+        return f"""{declarations}        PROC main()
             {params.proc_name};
         ENDPROC
 
         PROC {params.proc_name}()
             MoveAbsJ [[0,8.5,24.5,0,57,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]],v{conversion.arm_speed},z{conversion.zone},tool0\\Wobj:={params.workobj_name};
-    {"".join(f'        {line}{new_line}' for line in rapid_lines)}    
+{setup}    """
+
+    @staticmethod
+    def format_module_line(rapid_line: str) -> str:
+        return f"        {rapid_line}\n"
+
+    @staticmethod
+    def format_module_lines(rapid_lines: list[str]) -> str:
+        if not rapid_lines:
+            return ""
+        return "        " + "\n        ".join(rapid_lines) + "\n"
+
+    @staticmethod
+    def format_module_footer() -> str:
+        return """    
         ENDPROC
-    ENDMODULE"""
\ No newline at end of file
+    ENDMODULE"""
+
+    @staticmethod
+    def iter_module(params: BaseParameters, tool_data: str, workobj_data: str, rapid_lines: Iterable[str], conversion: Conversion,
+                    declarations: Iterable[str] = ()) -> Iterator[str]:
+        yield from RAPIDFormatter.iter_module_head(params, tool_data, workobj_data, conversion, declarations)
+        for line in rapid_lines:
+            yield RAPIDFormatter.format_module_line(line)
+        yield RAPIDFormatter.format_module_footer()
+
+    @staticmethod
+    def iter_module_head(params: BaseParameters, tool_data: str, workobj_data: str, conversion: Conversion,
+                         declarations: Iterable[str] = ()) -> Iterator[str]:
+        yield RAPIDFormatter.format_module_data(params, tool_data, workobj_data)
+        yield from declarations
+        yield RAPIDFormatter.format_module_procedures(params, conversion)
+
+    @staticmethod
+    def format_module(params: BaseParameters, tool_data: str, workobj_data: str, rapid_lines: Iterable[str], conversion: Conversion,
+                      declarations: Iterable[str] = ()) -> str:
+        return "".join(RAPIDFormatter.iter_module(params, tool_data, workobj_data, rapid_lines, conversion, declarations))
+
+    @staticmethod
+    def part_name(output_file: str) -> str:
+        name = re.sub(r"\W", "_", os.path.splitext(os.path.basename(output_file))[0], flags=re.ASCII)
+        return name if name[:1].isalpha() else f"M{name}"
+
+    @staticmethod
+    def part_module_name(part_name: str, part: int) -> str:
+        return f"{part_name}_{part}"
+
+    @staticmethod
+    def part_proc_name(params: BaseParameters, part: int) -> str:
+        return f"{params.proc_name}_{part}"
+
+    @staticmethod
+    def iter_part_module(params: BaseParameters, part_name: str, part: int, rapid_lines: Iterable[str],
+                         declarations: Iterable[str] = ()) -> Iterator[str]:
+        yield f"MODULE {RAPIDFormatter.part_module_name(part_name, part)}\n"
+        yield from declarations
+        yield f"        PROC {RAPIDFormatter.part_proc_name(params, part)}()\n"
+        for line in rapid_lines:
+            yield RAPIDFormatter.format_module_line(line)
+        yield RAPIDFormatter.format_module_footer()
+
+    @staticmethod
+    def iter_table_part_module(moves: MoveTable, context: ConversionContext, part_name: str, part: int,
+                               events: Optional[np.ndarray] = None) -> Iterator[str]:
+        return RAPIDFormatter.iter_part_module(context.get_parameters(), part_name, part,
+                                               RAPIDFormatter.format_target_loop(context, bool(moves.is_circular().any()), events),
+                                               RAPIDFormatter.iter_target_table(moves, context, events))
+
+    @staticmethod
+    def iter_loader_module(params: BaseParameters, tool_data: str, workobj_data: str, conversion: Conversion,
+                           part_name: str, part_count: int) -> Iterator[str]:
+        path = conversion.module_path
+        part_file = f"\"{part_name}_\" + NumToStr(i, 0) + \".mod\""
+        next_part_file = f"\"{part_name}_\" + NumToStr(i + 1, 0) + \".mod\""
+        yield RAPIDFormatter.format_module_data(params, tool_data, workobj_data)
+        yield f"        VAR loadsession {LOAD_SESSION};\n"
+        yield RAPIDFormatter.format_module_procedures(params, conversion)
+        yield from map(RAPIDFormatter.format_module_line, [
+            f"StartLoad \\Dynamic, \"{path}\" \\File:=\"{RAPIDFormatter.part_module_name(part_name, 1)}.mod\", {LOAD_SESSION};",
+            f"WaitLoad {LOAD_SESSION};",
+            f"FOR i FROM 1 TO {part_count} DO",
+            f"    IF i < {part_count} THEN",
+            f"        StartLoad \\Dynamic, \"{path}\" \\File:={next_part_file}, {LOAD_SESSION};",
+            "    ENDIF",
+            f"    %\"{params.proc_name}_\" + NumToStr(i, 0)%;",
+            f"    IF i < {part_count} THEN",
+            f"        WaitLoad \\UnloadPath:=\"{path}\" \\UnloadFile:={part_file}, {LOAD_SESSION};",
+            "    ELSE",
+            f"        UnLoad \"{path}\" \\File:={part_file};",
+            "    ENDIF",
+            "ENDFOR",
+        ])
+        yield RAPIDFormatter.format_module_footer()
+
+    @staticmethod
+    def iter_table_module(moves: MoveTable, context: ConversionContext) -> Iterator[str]:
+        params = context.get_parameters()
+        tool_data = RAPIDFormatter.format_tool_data(params, context.get_tcp_object(), context.get_conversion())
+        workobj_data = RAPIDFormatter.format_workobj_data(params, context.get_work_object(), context.get_conversion())
+        if not len(moves):
+            return RAPIDFormatter.iter_module(params, tool_data, workobj_data, (), context.get_conversion())
+        circular = bool(moves.is_circular().any())
+        events = RAPIDFormatter.table_events(moves, context)
+        return RAPIDFormatter.iter_module(params, tool_data, workobj_data, RAPIDFormatter.format_target_loop(context, circular, events),
+                                          context.get_conversion(), RAPIDFormatter.iter_target_table(moves, context, events))
+
+    @staticmethod
+    def table_events(moves: MoveTable, context: ConversionContext) -> Optional[np.ndarray]:
+        if not context.extrusion_control:
+            return None
+        return ExtrusionControl.events(moves, False, False)
+
+    @staticmethod
+    def iter_target_table(moves: MoveTable, context: ConversionContext, events: Optional[np.ndarray] = None) -> Iterator[str]:
+        speed_names = list(context.format_speeds(moves.f))
+        speeds = list(dict.fromkeys(speed_names))
+        speed_index = {name: index for index, name in enumerate(speeds, start=1)}
+
+        yield from RAPIDFormatter.iter_speed_declarations(speeds, context.get_conversion())
+        yield from RAPIDFormatter.iter_array("pos", TARGETS, RAPIDFormatter.format_positions(moves.positions(), context))
+        yield from RAPIDFormatter.iter_array("speeddata", SPEEDS, speeds)
+        yield from RAPIDFormatter.iter_array("num", SPEED_INDEX, [str(speed_index[name]) for name in speed_names])
+
+        circular = moves.is_circular()
+        if circular.any():
+            via_index = np.zeros(len(moves), dtype=np.int64)
+            via_index[circular] = np.arange(1, np.count_nonzero(circular) + 1)
+            yield from RAPIDFormatter.iter_array("pos", VIAS, RAPIDFormatter.format_positions(moves.vias()[circular], context))
+            yield from RAPIDFormatter.iter_array("num", VIA_INDEX, map(str, via_index.tolist()))
+            yield f"        LOCAL VAR robtarget {VIA_TARGET}:=[[0,0,0{context.target_suffix};\n"
+        if events is not None and events.any():
+            yield from RAPIDFormatter.iter_array("num", EVENTS, map(str, events.tolist()))
+        yield f"        LOCAL VAR robtarget {TARGET}:=[[0,0,0{context.target_suffix};\n"
+
+    @staticmethod
+    def iter_speed_declarations(speed_names: Iterable[str], conversion: Conversion) -> Iterator[str]:
+        for declaration in SpeedTable.format_declarations(speed_names, conversion.reorientation_speed):
+            yield f"        {declaration}\n"
+
+    @staticmethod
+    def format_positions(points: np.ndarray, context: ConversionContext) -> list[str]:
+        return [f"[{position}]" for position in context.format_positions(points)]
+
+    @staticmethod
+    def iter_array(data_type: str, name: str, values: Iterable[str]) -> Iterator[str]:
+        values = list(values)
+        yield f"        LOCAL CONST {data_type} {name}{{{len(values)}}}:=[\n"
+        for start in range(0, len(values), ARRAY_VALUES_PER_LINE):
+            separator = "," if start + ARRAY_VALUES_PER_LINE < len(values) else ""
+            yield f"            {','.join(values[start:start + ARRAY_VALUES_PER_LINE])}{separator}\n"
+        yield "        ];\n"
+
+    @staticmethod
+    def format_target_loop(context: ConversionContext, circular: bool, events: Optional[np.ndarray] = None) -> list[str]:
+        lines = [f"FOR i FROM 1 TO Dim({TARGETS},1) DO", f"    {TARGET}.trans:={TARGETS}{{i}};"]
+        if events is None or not events.any():
+            lines += RAPIDFormatter.format_target_moves(context, circular, "", "    ")
+        else:
+            lines.append(f"    TEST {EVENTS}{{i}}")
+            for code in np.unique(events[events != 0]).tolist():
+                lines.append(f"    CASE {code}:")
+                lines += RAPIDFormatter.format_target_moves(context, circular, ExtrusionControl.trigger_arguments(code), "        ")
+            lines.append("    DEFAULT:")
+            lines += RAPIDFormatter.format_target_moves(context, circular, "", "        ")
+            lines.append("    ENDTEST")
+        lines.append("ENDFOR")
+        return lines
+
+    @staticmethod
+    def format_target_moves(context: ConversionContext, circular: bool, triggers: str, indent: str) -> list[str]:
+        params = context.get_parameters()
+        speed = f"{SPEEDS}{{{SPEED_INDEX}{{i}}}}"
+        move_suffix = f"z{context.get_conversion().zone},{params.tool_name}\\WObj:={params.workobj_name};"
+        instruction, arguments = ("Trigg", f"{speed},{triggers},{move_suffix}") if triggers else ("Move", f"{speed},{move_suffix}")
+        if not circular:
+            return [f"{indent}{instruction}L {TARGET},{arguments}"]
+        return [
+            f"{indent}IF {VIA_INDEX}{{i}}>0 THEN",
+            f"{indent}    {VIA_TARGET}.trans:={VIAS}{{{VIA_INDEX}{{i}}}};",
+            f"{indent}    {instruction}C {VIA_TARGET},{TARGET},{arguments}",
+            f"{indent}ELSE",
+            f"{indent}    {instruction}L {TARGET},{arguments}",
+            f"{indent}ENDIF",
+        ]
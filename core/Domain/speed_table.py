@@ -0,0 +1,43 @@
+import re
+from typing import Iterable
+import numpy as np
+from core.Domain.number_formatter import NumberFormatter
+
+SPEED_PREFIX = "speed_"
+SPEED_DECIMALS = 3
+SPEED_NAME = re.compile(rf"{SPEED_PREFIX}\d+(?:_\d+)?(?!\w)")
+
+
+class SpeedTable:
+    SECONDS_PER_MINUTE = 60.0
+    LINEAR_AXIS_SPEED = 5000
+    ROTATION_AXIS_SPEED = 1000
+
+    @staticmethod
+    def quantize(feeds: np.ndarray, step: float) -> np.ndarray:
+        if np.isnan(feeds).any():
+            raise ValueError("Move without a feed rate (F) and no fixed speed is set")
+        speeds = np.round(feeds / SpeedTable.SECONDS_PER_MINUTE / step) * step
+        return np.maximum(speeds, step)
+
+    @staticmethod
+    def speed_names(feeds: np.ndarray, step: float) -> list[str]:
+        speeds, index = np.unique(SpeedTable.quantize(feeds, step), return_inverse=True)
+        names = np.array([SpeedTable.name(speed) for speed in speeds.tolist()], dtype=object)
+        return names[index].tolist()
+
+    @staticmethod
+    def name(speed: float) -> str:
+        return SPEED_PREFIX + NumberFormatter.format_number(speed, SPEED_DECIMALS).replace(".", "_")
+
+    @staticmethod
+    def used_names(text: str) -> set[str]:
+        return set(SPEED_NAME.findall(text))
+
+    @staticmethod
+    def format_declarations(names: Iterable[str], reorientation_speed: float) -> list[str]:
+        speeds = sorted((float(name[len(SPEED_PREFIX):].replace("_", ".")), name) for name in set(names) if SPEED_NAME.fullmatch(name))
+        reorientation = NumberFormatter.format_number(reorientation_speed, SPEED_DECIMALS)
+        return [f"LOCAL CONST speeddata {name}:=[{NumberFormatter.format_number(speed, SPEED_DECIMALS)},{reorientation},"
+                f"{SpeedTable.LINEAR_AXIS_SPEED},{SpeedTable.ROTATION_AXIS_SPEED}];"
+                for speed, name in speeds]
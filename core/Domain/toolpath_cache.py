@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import os
+import tempfile
+import zipfile
+from typing import Callable, Iterator, Optional
+import numpy as np
+from core.Domain.gcode_tokenizer import GCodeBuffer, GCodeTokenizer
+from core.model.toolpath import Toolpath
+
+OffsetBlock = tuple[int, int, Toolpath]
+BLOCK_OFFSETS = "offsets"
+BLOCK_LINES = "lines"
+
+
+class ToolpathCache:
+    HASH_BLOCK_SIZE = 1 << 22
+    FORMAT_VERSION = 2
+    EXTENSION = ".npz"
+    COMPRESS_LEVEL = 1
+    BYTES_PER_MB = 1024 * 1024
+
+    def __init__(self, cache_dir: str = "toolpath_cache", max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, settings, cache_dir: str = "toolpath_cache") -> 'ToolpathCache':
+        return cls(cache_dir, settings.get_conversion().cache_size_mb * cls.BYTES_PER_MB)
+
+    @staticmethod
+    def key(data: GCodeBuffer) -> str:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{GCodeTokenizer.PARSER_VERSION}:{ToolpathCache.FORMAT_VERSION}:{Toolpath.PARAMETERS}:".encode())
+        view = memoryview(data)
+        for start in range(0, len(view), ToolpathCache.HASH_BLOCK_SIZE):
+            digest.update(view[start:start + ToolpathCache.HASH_BLOCK_SIZE])
+        view.release()
+        return digest.hexdigest()
+
+    def iter_offset_blocks(self, key: str, parse: Callable[[], Iterator[OffsetBlock]]) -> Iterator[OffsetBlock]:
+        archive = self.open(key)
+        if archive is None:
+            return self.store(key, parse())
+        return self.load(key, archive)
+
+    def open(self, key: str) -> Optional[np.lib.npyio.NpzFile]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        archive = None
+        try:
+            archive = np.load(path, allow_pickle=False)
+            if BLOCK_OFFSETS not in archive.files or BLOCK_LINES not in archive.files:
+                raise ValueError("missing block index")
+            os.utime(path)
+            return archive
+        except Exception as e:
+            logging.warning(f"Discarding unreadable toolpath cache entry {key}: {e}")
+            if archive is not None:
+                archive.close()
+            self._remove(path)
+            return None
+
+    def load(self, key: str, archive: np.lib.npyio.NpzFile) -> Iterator[OffsetBlock]:
+        with archive:
+            members = set(archive.files)
+            offsets, lines = archive[BLOCK_OFFSETS].tolist(), archive[BLOCK_LINES].tolist()
+            logging.info(f"Toolpath loaded from cache: {key}")
+            for block, (offset, first_line) in enumerate(zip(offsets, lines)):
+                try:
+                    toolpath = self.read_block(archive, members, block)
+                except Exception as e:
+                    logging.warning(f"Discarding unreadable toolpath cache entry {key}: {e}")
+                    archive.close()
+                    self._remove(self._path(key))
+                    raise
+                yield offset, first_line, toolpath
+
+    @staticmethod
+    def read_block(archive: np.lib.npyio.NpzFile, members: set[str], block: int) -> Toolpath:
+        columns = {name: archive[f"{name}_{block}"] for name in Toolpath().as_dict() if f"{name}_{block}" in members}
+        count = len(columns['command'])
+        for name, empty in Toolpath().as_dict().items():
+            if name not in columns:
+                columns[name] = np.full(count, np.nan, dtype=empty.dtype)
+        return Toolpath(**columns)
+
+    def store(self, key: str, blocks: Iterator[OffsetBlock]) -> Iterator[OffsetBlock]:
+        writer = self.create_writer(key)
+        offsets, lines = [], []
+        try:
+            for offset, first_line, toolpath in blocks:
+                if writer is not None:
+                    writer = self.write_block(key, writer, len(offsets), toolpath)
+                    offsets.append(offset)
+                    lines.append(first_line)
+                yield offset, first_line, toolpath
+            if writer is not None:
+                self.commit(key, writer, np.array(offsets, dtype=np.int64), np.array(lines, dtype=np.int64))
+                writer = None
+        finally:
+            if writer is not None:
+                self.discard(writer)
+
+    def create_writer(self, key: str) -> Optional[tuple[str, zipfile.ZipFile]]:
+        try:
+            handle, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+            os.close(handle)
+            return temp_path, zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=self.COMPRESS_LEVEL)
+        except OSError as e:
+            logging.warning(f"Could not store toolpath cache entry {key}: {e}")
+            return None
+
+    def write_block(self, key: str, writer: tuple[str, zipfile.ZipFile], block: int,
+                    toolpath: Toolpath) -> Optional[tuple[str, zipfile.ZipFile]]:
+        temp_path, archive = writer
+        try:
+            for name, values in toolpath.as_dict().items():
+                if values.dtype.kind != 'f' or not np.isnan(values).all():
+                    self.write_member(archive, f"{name}_{block}", values)
+            if os.path.getsize(temp_path) <= self.max_bytes:
+                return writer
+            logging.info(f"Toolpath {key} exceeds the cache limit of {self.max_bytes} bytes and is not cached")
+        except OSError as e:
+            logging.warning(f"Could not store toolpath cache entry {key}: {e}")
+        self.discard(writer)
+        return None
+
+    def commit(self, key: str, writer: tuple[str, zipfile.ZipFile], offsets: np.ndarray, lines: np.ndarray) -> None:
+        temp_path, archive = writer
+        try:
+            self.write_member(archive, BLOCK_OFFSETS, offsets)
+            self.write_member(archive, BLOCK_LINES, lines)
+            archive.close()
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            logging.warning(f"Could not store toolpath cache entry {key}: {e}")
+            self.discard(writer)
+            return
+        self.evict()
+
+    def discard(self, writer: tuple[str, zipfile.ZipFile]) -> None:
+        temp_path, archive = writer
+        try:
+            archive.close()
+        except OSError:
+            pass
+        self._remove(temp_path)
+
+    @staticmethod
+    def write_member(archive: zipfile.ZipFile, name: str, values: np.ndarray) -> None:
+        with archive.open(f"{name}.npy", 'w', force_zip64=True) as member:
+            np.lib.format.write_array(member, np.ascontiguousarray(values), allow_pickle=False)
+
+    def evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.EXTENSION):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self) -> None:
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(self.EXTENSION):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{self.EXTENSION}")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logging.warning(f"Could not remove toolpath cache entry {path}: {e}")
@@ -1,5 +1,5 @@
 import logging
-from typing import Union, Tuple, Dict, Any
+from typing import Union, Tuple, Dict, Any, Optional
 from core.model.setting_object import Gobject, BaseParameters, ParameterType, Coordinates, Orientation, Conversion, EulerAngles, OrientationPresets
 from utils.settings_helper import validate_name, format_coordinate
 
@@ -53,6 +53,38 @@ class AppSettings:
                 self.__conversion.arm_speed = conversion_data["arm_speed"]
             if "zone" in conversion_data.keys():
                 self.__conversion.zone = conversion_data["zone"]
+            if "simplify" in conversion_data.keys():
+                self.__conversion.simplify = conversion_data["simplify"]
+            if "arc_fitting" in conversion_data.keys():
+                self.__conversion.arc_fitting = conversion_data["arc_fitting"]
+            if "drop_redundant" in conversion_data.keys():
+                self.__conversion.drop_redundant = conversion_data["drop_redundant"]
+            if "output_mode" in conversion_data.keys():
+                self.__conversion.output_mode = conversion_data["output_mode"]
+            if "moves_per_module" in conversion_data.keys():
+                self.__conversion.moves_per_module = conversion_data["moves_per_module"]
+            if "module_path" in conversion_data.keys():
+                self.__conversion.module_path = conversion_data["module_path"]
+            if "position_decimals" in conversion_data.keys():
+                self.__conversion.position_decimals = conversion_data["position_decimals"]
+            if "orientation_decimals" in conversion_data.keys():
+                self.__conversion.orientation_decimals = conversion_data["orientation_decimals"]
+            if "speed_step" in conversion_data.keys():
+                self.__conversion.speed_step = conversion_data["speed_step"]
+            if "reorientation_speed" in conversion_data.keys():
+                self.__conversion.reorientation_speed = conversion_data["reorientation_speed"]
+            if "extrusion_control" in conversion_data.keys():
+                self.__conversion.extrusion_control = conversion_data["extrusion_control"]
+            if "extrusion_lead_time" in conversion_data.keys():
+                self.__conversion.extrusion_lead_time = conversion_data["extrusion_lead_time"]
+            if "extruder_signal" in conversion_data.keys():
+                self.__conversion.extruder_signal = conversion_data["extruder_signal"]
+            if "fan_signal" in conversion_data.keys():
+                self.__conversion.fan_signal = conversion_data["fan_signal"]
+            if "restart_clearance" in conversion_data.keys():
+                self.__conversion.restart_clearance = conversion_data["restart_clearance"]
+            if "cache_size_mb" in conversion_data.keys():
+                self.__conversion.cache_size_mb = conversion_data["cache_size_mb"]
 
         orientation_presets_data = data.get("orientation_presets", {})
         if not orientation_presets_data:
@@ -95,6 +127,42 @@ class AppSettings:
     def set_zone(self, zone: int) -> None:
         self.__conversion.zone = zone
 
+    def set_simplify(self, simplify: bool) -> None:
+        self.__conversion.simplify = simplify
+
+    def set_arc_fitting(self, arc_fitting: bool) -> None:
+        self.__conversion.arc_fitting = arc_fitting
+
+    def set_drop_redundant(self, drop_redundant: bool) -> None:
+        self.__conversion.drop_redundant = drop_redundant
+
+    def set_output_mode(self, output_mode: str) -> None:
+        self.__conversion.output_mode = output_mode
+
+    def set_module_split(self, moves_per_module: int, module_path: str) -> None:
+        self.__conversion.moves_per_module = moves_per_module
+        self.__conversion.module_path = module_path
+
+    def set_precision(self, position_decimals: Optional[int], orientation_decimals: Optional[int]) -> None:
+        self.__conversion.position_decimals = position_decimals
+        self.__conversion.orientation_decimals = orientation_decimals
+
+    def set_speed_table(self, speed_step: Optional[float], reorientation_speed: float) -> None:
+        self.__conversion.speed_step = speed_step
+        self.__conversion.reorientation_speed = reorientation_speed
+
+    def set_extrusion_control(self, enabled: bool, lead_time: float, extruder_signal: str, fan_signal: str) -> None:
+        self.__conversion.extrusion_control = enabled
+        self.__conversion.extrusion_lead_time = lead_time
+        self.__conversion.extruder_signal = extruder_signal
+        self.__conversion.fan_signal = fan_signal
+
+    def set_restart_clearance(self, restart_clearance: float) -> None:
+        self.__conversion.restart_clearance = restart_clearance
+
+    def set_cache_size(self, cache_size_mb: int) -> None:
+        self.__conversion.cache_size_mb = cache_size_mb
+
     def set_orientation_presets(self, tcp_preset: int, workobj_preset: int) -> None:
         self.__orientation_presets.tcp_preset = tcp_preset
         self.__orientation_presets.workobj_preset = workobj_preset
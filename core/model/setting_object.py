@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple, Union
 from enum import Enum
 from utils.quaternion_calculator import QuaternionCalculator
 
@@ -93,15 +93,51 @@ class BaseParameters:
             ParameterType.WORKOBJ_NAME.value: self.workobj_name,
         }
 
+class OutputMode(Enum):
+    INLINE = "inline"
+    TABLE = "table"
+
 @dataclass
 class Conversion:
     arm_speed: int = 0
     zone: int = 0
-
-    def as_dict(self) -> dict[str, int]:
+    simplify: bool = False
+    arc_fitting: bool = False
+    drop_redundant: bool = True
+    output_mode: str = OutputMode.INLINE.value
+    moves_per_module: int = 0
+    module_path: str = "HOME:"
+    position_decimals: Optional[int] = 3
+    orientation_decimals: Optional[int] = 6
+    speed_step: Optional[float] = 1.0
+    reorientation_speed: float = 500.0
+    extrusion_control: bool = False
+    extrusion_lead_time: float = 0.0
+    extruder_signal: str = "do_extruder"
+    fan_signal: str = "do_fan"
+    restart_clearance: float = 10.0
+    cache_size_mb: int = 512
+
+    def as_dict(self) -> dict[str, Union[int, float, bool, str, None]]:
         return {
             'arm_speed': self.arm_speed,
-            'zone': self.zone
+            'zone': self.zone,
+            'simplify': self.simplify,
+            'arc_fitting': self.arc_fitting,
+            'drop_redundant': self.drop_redundant,
+            'output_mode': self.output_mode,
+            'moves_per_module': self.moves_per_module,
+            'module_path': self.module_path,
+            'position_decimals': self.position_decimals,
+            'orientation_decimals': self.orientation_decimals,
+            'speed_step': self.speed_step,
+            'reorientation_speed': self.reorientation_speed,
+            'extrusion_control': self.extrusion_control,
+            'extrusion_lead_time': self.extrusion_lead_time,
+            'extruder_signal': self.extruder_signal,
+            'fan_signal': self.fan_signal,
+            'restart_clearance': self.restart_clearance,
+            'cache_size_mb': self.cache_size_mb
         }
 
 @dataclass
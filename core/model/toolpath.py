@@ -0,0 +1,204 @@
+from dataclasses import dataclass, field, fields
+from enum import IntEnum, IntFlag
+from typing import ClassVar, Optional, Sequence
+import numpy as np
+
+
+def command_code(letter: str, number: int) -> int:
+    return (ord(letter) << 16) | number
+
+
+class GCode(IntEnum):
+    UNKNOWN = -1
+    G0 = command_code('G', 0)
+    G1 = command_code('G', 1)
+    G2 = command_code('G', 2)
+    G3 = command_code('G', 3)
+    G17 = command_code('G', 17)
+    G18 = command_code('G', 18)
+    G19 = command_code('G', 19)
+    G92 = command_code('G', 92)
+    M82 = command_code('M', 82)
+    M83 = command_code('M', 83)
+    M106 = command_code('M', 106)
+    M107 = command_code('M', 107)
+    LAYER = command_code(';', 0)
+
+
+class MoveWords(IntFlag):
+    NONE = 0
+    POSITION = 1
+    FEED = 2
+    EXTRUSION = 4
+
+
+class MoveEvent(IntFlag):
+    NONE = 0
+    EXTRUDER_ON = 1
+    EXTRUDER_OFF = 2
+    FAN_ON = 4
+    FAN_OFF = 8
+
+
+def _float_column() -> np.ndarray:
+    return np.empty(0, dtype=np.float64)
+
+
+def _int_column() -> np.ndarray:
+    return np.empty(0, dtype=np.int64)
+
+
+def _bool_column() -> np.ndarray:
+    return np.empty(0, dtype=bool)
+
+
+def _word_column() -> np.ndarray:
+    return np.empty(0, dtype=np.uint8)
+
+
+@dataclass
+class ColumnTable:
+    def __len__(self) -> int:
+        return len(getattr(self, fields(self)[0].name))
+
+    def as_dict(self) -> dict[str, np.ndarray]:
+        return {column.name: getattr(self, column.name) for column in fields(self)}
+
+    def slice(self, start: int, stop: int):
+        return type(self)(**{name: values[start:stop] for name, values in self.as_dict().items()})
+
+    def take(self, indices: np.ndarray):
+        return type(self)(**{name: values[indices] for name, values in self.as_dict().items()})
+
+    @classmethod
+    def concatenate(cls, parts: Sequence['ColumnTable']):
+        if not parts:
+            return cls()
+        if len(parts) == 1:
+            return parts[0]
+        return cls(**{column.name: np.concatenate([getattr(part, column.name) for part in parts]) for column in fields(cls)})
+
+
+@dataclass
+class Toolpath(ColumnTable):
+    PARAMETERS: ClassVar[str] = "XYZFEIJKRS"
+
+    command: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    x: np.ndarray = field(default_factory=_float_column)
+    y: np.ndarray = field(default_factory=_float_column)
+    z: np.ndarray = field(default_factory=_float_column)
+    f: np.ndarray = field(default_factory=_float_column)
+    e: np.ndarray = field(default_factory=_float_column)
+    i: np.ndarray = field(default_factory=_float_column)
+    j: np.ndarray = field(default_factory=_float_column)
+    k: np.ndarray = field(default_factory=_float_column)
+    r: np.ndarray = field(default_factory=_float_column)
+    s: np.ndarray = field(default_factory=_float_column)
+    line: np.ndarray = field(default_factory=_int_column)
+
+    def column(self, parameter: str) -> np.ndarray:
+        return getattr(self, parameter.lower())
+
+
+@dataclass
+class MoveTable(ColumnTable):
+    x: np.ndarray = field(default_factory=_float_column)
+    y: np.ndarray = field(default_factory=_float_column)
+    z: np.ndarray = field(default_factory=_float_column)
+    f: np.ndarray = field(default_factory=_float_column)
+    extruding: np.ndarray = field(default_factory=_bool_column)
+    fan: np.ndarray = field(default_factory=_bool_column)
+    layer_start: np.ndarray = field(default_factory=_bool_column)
+    words: np.ndarray = field(default_factory=_word_column)
+    line: np.ndarray = field(default_factory=_int_column)
+    via_x: np.ndarray = field(default_factory=_float_column)
+    via_y: np.ndarray = field(default_factory=_float_column)
+    via_z: np.ndarray = field(default_factory=_float_column)
+
+    def positions(self) -> np.ndarray:
+        return np.column_stack((self.x, self.y, self.z))
+
+    def vias(self) -> np.ndarray:
+        return np.column_stack((self.via_x, self.via_y, self.via_z))
+
+    def is_circular(self) -> np.ndarray:
+        return ~np.isnan(self.via_x)
+
+    def mode_changes(self) -> np.ndarray:
+        changes = np.ones(len(self), dtype=bool)
+        same_feed = (self.f[1:] == self.f[:-1]) | (np.isnan(self.f[1:]) & np.isnan(self.f[:-1]))
+        changes[1:] = ~same_feed | (self.extruding[1:] != self.extruding[:-1]) | (self.fan[1:] != self.fan[:-1])
+        circular = self.is_circular()
+        changes |= circular
+        changes[1:] |= circular[:-1]
+        return changes
+
+
+@dataclass
+class LayerIndex:
+    bounds: np.ndarray = field(default_factory=lambda: np.zeros(1, dtype=np.int64))
+
+    @classmethod
+    def from_starts(cls, starts: np.ndarray, size: int) -> 'LayerIndex':
+        starts = np.asarray(starts, dtype=np.int64)
+        return cls(np.unique(np.concatenate(([0], starts[(starts > 0) & (starts < size)], [size]))))
+
+    def __len__(self) -> int:
+        return len(self.bounds) - 1
+
+    def span(self, first: int, last: int) -> tuple[int, int]:
+        return int(self.bounds[first]), int(self.bounds[last + 1])
+
+    def layer_of(self, offset: int) -> int:
+        return int(np.searchsorted(self.bounds, offset, side='right')) - 1
+
+
+@dataclass
+class ModalState:
+    x: Optional[float] = None
+    y: Optional[float] = None
+    z: Optional[float] = None
+    f: Optional[float] = None
+    plane: Optional[int] = None
+    fan: Optional[bool] = None
+    layer_pending: Optional[bool] = None
+    e: Optional[float] = None
+    relative_extrusion: Optional[bool] = None
+
+    def merged(self, update: 'ModalState') -> 'ModalState':
+        return ModalState(
+            x=self.x if update.x is None else update.x,
+            y=self.y if update.y is None else update.y,
+            z=self.z if update.z is None else update.z,
+            f=self.f if update.f is None else update.f,
+            plane=self.plane if update.plane is None else update.plane,
+            fan=self.fan if update.fan is None else update.fan,
+            layer_pending=self.layer_pending if update.layer_pending is None else update.layer_pending,
+            e=self.e if update.e is None else update.e,
+            relative_extrusion=self.relative_extrusion if update.relative_extrusion is None else update.relative_extrusion,
+        )
+
+
+@dataclass
+class RestartIndex:
+    offsets: np.ndarray = field(default_factory=_int_column)
+    lines: np.ndarray = field(default_factory=_int_column)
+    states: list[ModalState] = field(default_factory=list)
+    layer_lines: np.ndarray = field(default_factory=lambda: np.ones(1, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def layer_count(self) -> int:
+        return len(self.layer_lines)
+
+    def checkpoint(self, line: int) -> int:
+        return max(int(np.searchsorted(self.lines, line, side='right')) - 1, 0)
+
+    def layer_line_range(self, first_layer: int, last_layer: Optional[int] = None) -> tuple[int, Optional[int]]:
+        if not 0 <= first_layer < self.layer_count or (last_layer is not None and last_layer < first_layer):
+            raise ValueError(f"Layer range {first_layer}-{last_layer} is outside of 0-{self.layer_count - 1}")
+        if last_layer is None or last_layer + 1 >= self.layer_count:
+            return int(self.layer_lines[first_layer]), None
+        return int(self.layer_lines[first_layer]), int(self.layer_lines[last_layer + 1]) - 1
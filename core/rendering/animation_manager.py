@@ -15,6 +15,8 @@ class AnimationManager:
         self.animation_running = False
         self.animation_lock = threading.Lock()
         self.current_frame = 0
+        self.first_frame = 0
+        self.last_frame = 0
         self.is_visualize_finished = False
 
         self.start_points = None
@@ -29,14 +31,21 @@ class AnimationManager:
         self.rotation_matrix = rotation_matrix
 
     def set_data(self, positions):
-        if not positions.empty:
-            self.start_points = np.array([positions['x'], positions['y'], positions['z']])
+        if len(positions):
+            self.start_points = np.ascontiguousarray(np.asarray(positions, dtype=np.float64).T)
             self.current_points = np.array([[], [], []])
-            self.current_frame = 0
-            self.is_visualize_finished = False
+            self.set_frame_range(0, len(self.start_points[0]))
             return True
         return False
 
+    def set_frame_range(self, first_frame, last_frame):
+        self.stop_visualize()
+        with self.animation_lock:
+            self.first_frame = first_frame
+            self.last_frame = last_frame
+            self.current_frame = first_frame
+            self.is_visualize_finished = False
+
     def start_visualize(self):
         if self.start_points is None:
             logging.warning("No data to visualize")
@@ -48,7 +57,7 @@ class AnimationManager:
             self.history_line = self.plot_manager.ax.plot([], [], [], color='#48D1CC', alpha=1, linestyle='-', linewidth=1)[0]
             self.line = self.plot_manager.ax.plot([], [], [], color='red', alpha=1, linestyle='-', linewidth=2)[0]
 
-        remaining_frames = len(self.start_points[0]) - self.current_frame
+        remaining_frames = self.last_frame - self.current_frame
 
         if remaining_frames <= 0:
             logging.warning("No frames left to animate")
@@ -73,17 +82,11 @@ class AnimationManager:
         self.stop_visualize()
 
         with self.animation_lock:
-            self.current_frame = len(self.start_points[0])
+            self.current_frame = self.last_frame
             self.is_visualize_finished = True
 
-            if self.current_frame > 0:
-                all_points = np.array([
-                    self.start_points[0][:self.current_frame],
-                    self.start_points[1][:self.current_frame],
-                    self.start_points[2][:self.current_frame]
-                ])
-
-                rotated_points = np.dot(self.rotation_matrix, all_points)
+            if self.current_frame > self.first_frame:
+                rotated_points = np.dot(self.rotation_matrix, self.start_points[:, self.first_frame:self.current_frame])
 
                 self.history_line.set_data_3d(
                     rotated_points[0],
@@ -108,7 +111,7 @@ class AnimationManager:
 
     def animation_worker(self):
         try:
-            total_frames = len(self.start_points[0]) if self.start_points is not None else 0
+            total_frames = self.last_frame if self.start_points is not None else 0
 
             if self.parent and hasattr(self.parent, 'update_parent_status'):
                 self.parent.update_parent_status("Vizualizácia...", 0)
@@ -130,7 +133,8 @@ class AnimationManager:
                         break
 
                     self.current_frame += 1
-                    progress_percent = int((self.current_frame / total_frames) * 100) if total_frames > 0 else 0
+                    range_frames = total_frames - self.first_frame
+                    progress_percent = int(((self.current_frame - self.first_frame) / range_frames) * 100) if range_frames > 0 else 0
                     current_interval = self.animation_interval
 
                     if self.current_frame % 5 == 0 and self.parent and hasattr(self.parent, 'update_parent_status'):
@@ -153,15 +157,10 @@ class AnimationManager:
         try:
             with self.animation_lock:
                 current_frame = self.current_frame
+                first_frame, last_frame = self.first_frame, self.last_frame
 
-            if current_frame > 1:
-                history_points = np.array([
-                    self.start_points[0][:current_frame - 1],
-                    self.start_points[1][:current_frame - 1],
-                    self.start_points[2][:current_frame - 1]
-                ])
-
-                rotated_history = np.dot(rotation_matrix, history_points)
+            if current_frame > first_frame + 1:
+                rotated_history = np.dot(rotation_matrix, self.start_points[:, first_frame:current_frame - 1])
 
                 self.history_line.set_data_3d(
                     rotated_history[0],
@@ -169,13 +168,7 @@ class AnimationManager:
                     rotated_history[2]
                 )
 
-            current_segment = np.array([
-                self.start_points[0][max(0, current_frame - 1):current_frame + 1],
-                self.start_points[1][max(0, current_frame - 1):current_frame + 1],
-                self.start_points[2][max(0, current_frame - 1):current_frame + 1]
-            ])
-
-            rotated_current = np.dot(rotation_matrix, current_segment)
+            rotated_current = np.dot(rotation_matrix, self.start_points[:, max(first_frame, current_frame - 1):min(current_frame + 1, last_frame)])
             self.line.set_data_3d(
                 rotated_current[0],
                 rotated_current[1],
@@ -195,7 +188,7 @@ class AnimationManager:
         self.animation_thread = None
 
     def reset_visualize_state(self):
-        self.current_frame = 0
+        self.current_frame = self.first_frame
         self.is_visualize_finished = False
         self.current_points = np.array([[], [], []])
         self.stop_visualize()
@@ -3,6 +3,7 @@ import numpy as np
 import logging
 import threading
 from core.Domain.rapid_converter import RAPIDConverter
+from core.model.toolpath import LayerIndex
 from utils.tab_manager import get_tab_manager
 
 from .plot_manager import PlotManager
@@ -39,6 +40,9 @@ class ModelVisualisation(wx.Panel):
         self.file_info_label = None
         self.file_info_sizer = None
         self.speed_choice = None
+        self.first_layer_slider = None
+        self.last_layer_slider = None
+        self.layers = LayerIndex()
         self.create_ui()
 
         self.bind_events()
@@ -85,6 +89,22 @@ class ModelVisualisation(wx.Panel):
         mode_panel.SetSizer(mode_sizer)
         self.sizer.Add(mode_panel, 0, wx.EXPAND | wx.BOTTOM, 5)
 
+        layer_panel = wx.Panel(self, wx.ID_ANY)
+        layer_sizer = wx.BoxSizer(wx.HORIZONTAL)
+
+        layer_label = wx.StaticText(layer_panel, wx.ID_ANY, "Vrstvy od - do:")
+        layer_sizer.Add(layer_label, 0, wx.ALIGN_CENTER_VERTICAL | wx.LEFT, 5)
+
+        self.first_layer_slider = wx.Slider(layer_panel, wx.ID_ANY, 0, 0, 1, style=wx.SL_HORIZONTAL | wx.SL_LABELS)
+        layer_sizer.Add(self.first_layer_slider, 1, wx.ALIGN_CENTER_VERTICAL | wx.LEFT, 5)
+
+        self.last_layer_slider = wx.Slider(layer_panel, wx.ID_ANY, 1, 0, 1, style=wx.SL_HORIZONTAL | wx.SL_LABELS)
+        layer_sizer.Add(self.last_layer_slider, 1, wx.ALIGN_CENTER_VERTICAL | wx.LEFT, 5)
+
+        layer_panel.SetSizer(layer_sizer)
+        self.sizer.Add(layer_panel, 0, wx.EXPAND | wx.BOTTOM, 5)
+        self.update_layer_sliders()
+
         self.button_sizer = wx.BoxSizer(wx.HORIZONTAL)
         self.visualize_button = wx.Button(self, label="Spustiť vizualizáciu")
         self.stop_button = wx.Button(self, label="Zastaviť vizualizáciu")
@@ -103,16 +123,26 @@ class ModelVisualisation(wx.Panel):
         self.stop_button.Bind(wx.EVT_BUTTON, self.on_stop_button)
         self.mode_choice.Bind(wx.EVT_CHOICE, self.on_mode_change)
         self.speed_choice.Bind(wx.EVT_CHOICE, self.on_speed_change)
+        self.first_layer_slider.Bind(wx.EVT_SLIDER, self.on_layer_range_change)
+        self.last_layer_slider.Bind(wx.EVT_SLIDER, self.on_layer_range_change)
         self.Bind(wx.EVT_SHOW, self.event_handler.on_show)
         self.Bind(wx.EVT_SIZE, self.event_handler.on_size)
 
     def set_rapid_text(self, rapid_text):
-        self.animation_manager.reset_visualize_state()
-
         try:
             positions = RAPIDConverter().extract_coordinates_from_rapid(rapid_text)
+        except Exception as e:
+            logging.error(f"Error when parsing RAPID code: {str(e)}")
+            return False
+        return self.set_positions(positions)
+
+    def set_positions(self, positions, layers=None):
+        self.animation_manager.reset_visualize_state()
+        self.layers = layers if layers is not None and len(layers) else LayerIndex.from_starts(np.empty(0), len(positions))
+        self.update_layer_sliders()
 
-            if positions.empty:
+        try:
+            if len(positions) == 0:
                 logging.warning("No coordinates found in RAPID code")
                 wx.MessageBox("V kóde RAPID sa nenašli žiadne súradnice", "Upozornenie", wx.OK | wx.ICON_WARNING)
                 return False
@@ -125,7 +155,7 @@ class ModelVisualisation(wx.Panel):
             return True
 
         except Exception as e:
-            logging.error(f"Error when parsing RAPID code: {str(e)}")
+            logging.error(f"Error when preparing positions for visualization: {str(e)}")
             return False
 
     def _setup_plot_with_data(self):
@@ -163,6 +193,36 @@ class ModelVisualisation(wx.Panel):
 
         return True
 
+    def update_layer_sliders(self):
+        layer_count = len(self.layers)
+        enabled = layer_count > 1
+        for slider, value in ((self.first_layer_slider, 0), (self.last_layer_slider, max(layer_count - 1, 1))):
+            slider.SetRange(0, max(layer_count - 1, 1))
+            slider.SetValue(value)
+            slider.Enable(enabled)
+
+    def on_layer_range_change(self, event):
+        first_layer = self.first_layer_slider.GetValue()
+        last_layer = self.last_layer_slider.GetValue()
+        if first_layer > last_layer:
+            if event.GetEventObject() is self.first_layer_slider:
+                self.last_layer_slider.SetValue(first_layer)
+            else:
+                self.first_layer_slider.SetValue(last_layer)
+            first_layer = last_layer = event.GetEventObject().GetValue()
+        self.show_layer_range(first_layer, last_layer)
+        event.Skip()
+
+    def show_layer_range(self, first_layer, last_layer):
+        if not self.ready_for_visualization or self.animation_manager.start_points is None:
+            return
+        first_frame, last_frame = self.layers.span(first_layer, last_layer)
+        self.animation_manager.reset_visualize_state()
+        self.animation_manager.set_frame_range(first_frame, last_frame)
+        self.ready_for_visualization = True
+        if self.visualization_mode == "immediate":
+            self.animation_manager.show_immediate_result()
+
     def update_lines(self):
         with self.rotation_lock:
             rotation_matrix = self.rotation_matrix
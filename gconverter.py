@@ -1,30 +1,30 @@
-import wx
-import logging
+import argparse
 import sys
-from UI.MainFrame import MainFrame
+from typing import Optional
+from utils.startup_timer import STARTUP_BUDGET, start_startup_timer
 
 
-class GCodeToRapidApp(wx.App):
-    def __init__(self, redirect=False, filename=None, usebestvisual=False, clearsigint=True):
-        super().__init__(redirect, filename, usebestvisual, clearsigint)
-        self.frame = None
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "convert":
+        from utils.batch_converter import main as convert_main
+        return convert_main(argv[1:])
+    if argv and argv[0] == "serve":
+        from utils.conversion_service import main as serve_main
+        return serve_main(argv[1:])
 
-    def OnInit(self):
-        self.setup_logging()
-        self.frame = MainFrame(None, wx.ID_ANY, "")
-        self.SetTopWindow(self.frame)
-        self.frame.Show()
-        return True
+    parser = argparse.ArgumentParser(prog="gconverter", description="G-code to RAPID converter.")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET,
+                        help="warn when the main window takes longer than this many seconds to appear")
+    args = parser.parse_args(argv)
 
-    @staticmethod
-    def setup_logging():
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s [%(levelname)s] %(message)s",
-            handlers=[logging.StreamHandler(sys.stdout)]
-        )
-# end of class GCodeToRapidApp
-
-if __name__ == "__main__":
+    timer = start_startup_timer(args.startup_budget)
+    from UI.application import GCodeToRapidApp
+    timer.mark("imports")
     app = GCodeToRapidApp()
     app.MainLoop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
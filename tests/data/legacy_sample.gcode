@@ -0,0 +1,22 @@
+; generated by slicer
+G21
+G90
+M82
+M104 S210
+G28
+G92 E0
+G1 Z5 F3000
+G0 X10 Y10 Z0.2 F6000
+G1 F1200 X20 Y10 E1.0
+G1 X20 Y20 E2.0 ; perimeter
+G1 X10.25 Y20 E3.0
+G1 X10.25 Y10.5 E4.0
+G1 F1500.5
+G1 X-2.5 Y.5 E4.5
+G1 X0.1234567890123 Y12.500 E5
+G0 Z0.4
+G1 X10 Y20 E6.0
+G1 X10 Y20
+G1 X30 Y25.75 E7.25
+M107
+G1 X30.5 Y26 Z0.6 E7.5
@@ -0,0 +1,47 @@
+import numpy as np
+from core.Domain.arc_fitter import ArcFitter
+from core.Domain.gcode_tokenizer import GCodeTokenizer
+from core.Domain.rapid_converter import RAPIDConverter
+
+
+def circle_moves(degrees: float, radius: float = 10.0):
+    angles = np.radians(np.arange(0.0, degrees + 1.0, 7.5))
+    gcode = b"G1 F1200\n" + b"".join(f"G1 X{radius * np.cos(angle):.4f} Y{radius * np.sin(angle):.4f} E{index}\n".encode()
+                                     for index, angle in enumerate(angles))
+    return RAPIDConverter().resolve_moves(GCodeTokenizer.tokenize(gcode))
+
+
+def test_points_on_a_circle_become_one_arc():
+    keep, via = ArcFitter.fit(circle_moves(90), 0.05)
+
+    assert np.flatnonzero(keep).tolist() == [0, 1, 13]
+    assert via[13] == 7
+    assert (via[:13] == -1).all()
+
+
+def test_arcs_do_not_sweep_more_than_half_a_circle():
+    moves = circle_moves(270)
+    keep, via = ArcFitter.fit(moves, 0.05)
+    points = moves.positions()
+
+    ends = np.flatnonzero(via >= 0)
+    starts = np.concatenate(([1], ends[:-1]))
+    assert ends.size == 2 and keep[ends].all()
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        chord = np.linalg.norm(points[end] - points[start])
+        assert chord <= 20.0 + 1e-9
+
+
+def test_tolerance_below_chord_error_keeps_every_point():
+    keep, via = ArcFitter.fit(circle_moves(90), 0.01)
+
+    assert keep.all()
+    assert (via == -1).all()
+
+
+def test_straight_and_disabled_paths_are_not_fitted():
+    gcode = b"G1 F1200\n" + b"".join(f"G1 X{index} Y{index % 2 * 0.001} E{index}\n".encode() for index in range(10))
+    moves = RAPIDConverter().resolve_moves(GCodeTokenizer.tokenize(gcode))
+
+    assert ArcFitter.fit(moves, 0.05)[0].all()
+    assert ArcFitter.fit(circle_moves(90), None)[0].all()
@@ -0,0 +1,46 @@
+import numpy as np
+from core.Domain.arc_interpolator import ArcInterpolator
+from core.Domain.gcode_tokenizer import GCodeTokenizer
+from core.Domain.rapid_converter import RAPIDConverter
+
+
+def resolve(gcode: bytes):
+    return RAPIDConverter().resolve_moves(GCodeTokenizer.tokenize(b"G1 F600 X10 Y10\n" + gcode))
+
+
+def test_center_offset_and_radius_give_the_same_arc():
+    for gcode in (b"G2 X20 Y10 I5 J0\n", b"G2 X20 Y10 R5\n"):
+        moves = resolve(gcode)
+
+        assert moves.positions().tolist() == [[10, 10, 0], [20, 10, 0]]
+        assert moves.is_circular().tolist() == [False, True]
+        assert moves.vias()[1].tolist() == [15, 15, 0]
+
+
+def test_full_circle_is_split_into_half_circles():
+    moves = resolve(b"G3 X10 Y10 I5\n")
+
+    assert moves.positions().tolist() == [[10, 10, 0], [20, 10, 0], [10, 10, 0]]
+    assert moves.vias()[1:].tolist() == [[15, 5, 0], [15, 15, 0]]
+
+
+def test_plane_selection_maps_the_arc_axes():
+    moves = resolve(b"G18\nG2 X20 Z0 I5 K0\n")
+
+    assert moves.vias()[1].tolist() == [15, 10, -5]
+
+
+def test_arc_without_center_becomes_a_linear_move():
+    moves = resolve(b"G2 X20 Y10\n")
+
+    assert moves.positions()[-1].tolist() == [20, 10, 0]
+    assert not moves.is_circular().any()
+
+
+def test_render_points_sample_arcs_and_end_on_targets():
+    moves = resolve(b"G2 X20 Y10 I5 J0\n")
+    points, counts = ArcInterpolator.render_points(moves, np.zeros(3))
+
+    assert counts.tolist() == [1, 36]
+    assert points[-1].tolist() == [20, 10, 0]
+    assert np.allclose(np.hypot(points[1:, 0] - 15, points[1:, 1] - 10), 5)
@@ -0,0 +1,35 @@
+import os
+from core.model.app_settings import AppSettings
+from utils import batch_converter
+from utils.settings_manager import SettingsManager
+
+GCODES = {
+    "first.gcode": b"".join(f"G1 F1200 X{index} Y{index % 7} Z0.2 E{index}\n".encode() for index in range(1, 11)),
+    "second.gcode": b"".join(f"G1 F1800 X{index % 5} Y{index} Z0.4 E{index}\n".encode() for index in range(1, 14)),
+}
+
+
+def read_outputs(directory) -> dict[str, str]:
+    return {name: open(os.path.join(directory, name)).read() for name in sorted(os.listdir(directory))}
+
+
+def test_parallel_batch_keeps_split_outputs_of_each_file(tmp_path):
+    input_dir, serial_dir, parallel_dir = tmp_path / "gcode", tmp_path / "serial", tmp_path / "parallel"
+    input_dir.mkdir()
+    for name, gcode in GCODES.items():
+        (input_dir / name).write_bytes(gcode)
+    settings = AppSettings()
+    settings.from_dict({"conversion": {"moves_per_module": 4}})
+    settings_file = str(tmp_path / "settings.json")
+    SettingsManager(settings_file).save_all_settings(settings)
+
+    assert batch_converter.main([str(input_dir), "-s", settings_file, "-o", str(serial_dir), "-j", "1"]) == 0
+    assert batch_converter.main([str(input_dir), "-s", settings_file, "-o", str(parallel_dir), "-j", "2"]) == 0
+
+    outputs = read_outputs(parallel_dir)
+    assert list(outputs) == ["first.mod", "first_1.mod", "first_2.mod", "first_3.mod",
+                             "second.mod", "second_1.mod", "second_2.mod", "second_3.mod", "second_4.mod"]
+    assert outputs == read_outputs(serial_dir)
+    assert '"first_" + NumToStr(i, 0)' in outputs["first.mod"] and '"second_" + NumToStr(i, 0)' in outputs["second.mod"]
+    assert sum(outputs[f"first_{part}.mod"].count("MoveL") for part in range(1, 4)) == 10
+    assert sum(outputs[f"second_{part}.mod"].count("MoveL") for part in range(1, 5)) == 13
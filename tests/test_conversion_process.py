@@ -0,0 +1,58 @@
+import threading
+import pytest
+from core.Domain.gcode_reader import GCodeReader
+from core.Domain.rapid_converter import RAPIDConverter
+from core.model.app_settings import AppSettings
+from utils.conversion_process import ConversionProcess, RemoteConverter
+from utils.file_handler import FileHandler
+
+GCODE = "".join(f";LAYER:{layer}\n" + "".join(f"G1 F1200 X{step} Y{layer} Z{layer * 0.2 + 0.2:.1f} E{layer * 10 + step}\n"
+                                               for step in range(10))
+                for layer in range(5))
+
+
+@pytest.fixture
+def process():
+    process = ConversionProcess()
+    yield process
+    process.close()
+
+
+def wait_for(submit, *args, **kwargs):
+    done = threading.Event()
+    results = []
+    submit(*args, lambda rapid_code, positions: (results.append((rapid_code, positions)), done.set()), **kwargs)
+    assert done.wait(60)
+    return results[0]
+
+
+def test_layer_range_runs_in_the_process(tmp_path, process):
+    gcode_file = tmp_path / "part.gcode"
+    gcode_file.write_text(GCODE)
+    expected = RAPIDConverter(keep_history=True)
+    expected_code = expected.gcode_layers_to_rapid(GCODE, AppSettings(), 2, 3)
+    converter = RemoteConverter()
+
+    with GCodeReader(str(gcode_file)) as reader:
+        rapid_code, positions = wait_for(process.convert_range_async, reader, AppSettings(), first=2, last=3, by_layer=True,
+                                         converter=converter)
+
+    assert rapid_code == expected_code
+    assert positions.tolist() == expected.get_move_positions().tolist()
+    assert converter.restart_index.layer_lines.tolist() == expected.restart_index.layer_lines.tolist()
+
+
+def test_save_streams_the_source_into_split_modules(tmp_path, process):
+    settings = AppSettings()
+    settings.from_dict({"conversion": {"moves_per_module": 20}})
+    gcode_file = tmp_path / "part.gcode"
+    gcode_file.write_text(GCODE)
+    FileHandler().convert_gcode_file(str(gcode_file), str(tmp_path / "direct.mod"), settings)
+
+    with GCodeReader(str(gcode_file)) as reader:
+        _, positions = wait_for(process.save_async, reader, settings, str(tmp_path / "saved.mod"))
+
+    assert positions is not None
+    for part in ("", "_1", "_3"):
+        saved = (tmp_path / f"saved{part}.mod").read_text().replace("saved_", "direct_")
+        assert saved == (tmp_path / f"direct{part}.mod").read_text()
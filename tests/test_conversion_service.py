@@ -0,0 +1,80 @@
+import asyncio
+import json
+import os
+from core.model.app_settings import AppSettings
+from utils.conversion_service import ConversionService
+from utils.file_handler import FileHandler
+
+GCODE = "".join(f"G1 F1200 X{index} Y{index % 7} Z0.2 E{index}\n" for index in range(1, 11))
+
+
+async def wait_finished(service: ConversionService, job_id: int) -> dict:
+    for _ in range(600):
+        status, job = await service.route("GET", f"/jobs/{job_id}", b"")
+        if job["status"] not in ("queued", "running"):
+            return job
+        await asyncio.sleep(0.1)
+    raise TimeoutError(f"Job {job_id} did not finish")
+
+
+async def request(port: int, raw: bytes) -> tuple[str, bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return head.decode("latin-1").split("\r\n")[0], body
+
+
+def test_service_endpoints(tmp_path):
+    expected_file = str(tmp_path / "expected.mod")
+    gcode_file = tmp_path / "expected.gcode"
+    gcode_file.write_text(GCODE)
+    FileHandler().convert_gcode_file(str(gcode_file), expected_file, AppSettings())
+    output_dir = tmp_path / "service"
+    output_dir.mkdir()
+
+    async def scenario():
+        service = ConversionService(AppSettings(), str(output_dir), 1)
+        await service.start()
+        try:
+            assert await service.route("GET", "/health", b"") == (200, {"status": "ok"})
+
+            status, job = await service.route("POST", "/jobs", json.dumps({"gcode": GCODE, "output_file": "expected.mod"}).encode())
+            assert status == 202 and job["status"] == "queued" and job["gcode_file"] is None
+            assert (await service.route("GET", f"/jobs/{job['id']}/rapid", b""))[0] == 409
+
+            finished = await wait_finished(service, job["id"])
+            assert finished["status"] == "done" and finished["progress"]["fraction"] == 1.0
+            status, rapid = await service.route("GET", f"/jobs/{job['id']}/rapid", b"")
+            assert status == 200 and rapid == open(expected_file).read()
+
+            status, queued = await service.route("POST", "/jobs", json.dumps({"gcode_file": str(gcode_file)}).encode())
+            status, cancelled = await service.route("DELETE", f"/jobs/{queued['id']}", b"")
+            assert status == 202 and cancelled["status"] == "cancelled"
+            assert not os.path.exists(os.path.dirname(cancelled["output_file"]))
+
+            assert (await service.route("POST", "/jobs", b"{}"))[0] == 400
+            assert (await service.route("POST", "/jobs", b"[]"))[0] == 400
+            assert (await service.route("POST", "/jobs", json.dumps({"gcode": GCODE, "output_file": "../x.mod"}).encode()))[0] == 400
+            assert (await service.route("PUT", "/jobs", b""))[0] == 405
+            assert (await service.route("GET", "/jobs/99", b""))[0] == 404
+            assert (await service.route("GET", "/unknown", b""))[0] == 404
+            assert [listed["status"] for listed in (await service.route("GET", "/jobs", b""))[1]] == ["done", "cancelled"]
+            metrics = (await service.route("GET", "/metrics", b""))[1]
+            assert metrics["jobs"] == {"done": 1, "cancelled": 1} and metrics["queued"] == metrics["running"] == 0
+
+            server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                status_line, body = await request(port, b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
+                assert status_line == "HTTP/1.1 200 OK" and json.loads(body) == {"status": "ok"}
+                status_line, body = await request(port, f"GET /jobs/{job['id']}/rapid HTTP/1.1\r\n\r\n".encode())
+                assert status_line == "HTTP/1.1 200 OK" and body.decode() == rapid
+                status_line, _ = await request(port, b"POST /jobs HTTP/1.1\r\nContent-Length: 999999999999\r\n\r\n")
+                assert status_line == "HTTP/1.1 413 Payload Too Large"
+        finally:
+            await service.stop()
+
+    asyncio.run(scenario())
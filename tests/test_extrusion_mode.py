@@ -0,0 +1,36 @@
+from core.Domain.gcode_tokenizer import GCodeTokenizer
+from core.Domain.rapid_converter import RAPIDConverter
+
+GCODE = b"""M82
+G92 E0
+G1 F1200 X1 Y0 E1
+G1 X2 Y0 E2
+G1 E1.2
+G1 X3 Y0
+G1 E2
+G1 X4 Y0 E3
+G92 E0
+G1 X5 Y0 E0.5
+M83
+G1 X6 Y0 E0.5
+G1 X7 Y0 E-0.5
+G1 X8 Y0 E0.5
+"""
+
+
+def test_extruding_follows_extrusion_mode():
+    converter = RAPIDConverter()
+    moves = converter.resolve_moves(GCodeTokenizer.tokenize(GCODE))
+
+    assert moves.extruding.tolist() == [True, True, False, False, True, True, True, True, False, True]
+    assert converter.current_e == 0.5
+    assert converter.relative_extrusion
+
+
+def test_extrusion_state_carries_across_blocks():
+    whole = RAPIDConverter().resolve_moves(GCodeTokenizer.tokenize(GCODE))
+    converter = RAPIDConverter()
+    blocks = [converter.resolve_moves(toolpath) for toolpath in GCodeTokenizer.iter_buffer_blocks(GCODE, block_size=24)]
+
+    assert [extruding for block in blocks for extruding in block.extruding.tolist()] == whole.extruding.tolist()
+    assert RAPIDConverter.scan_modal_state(GCodeTokenizer.tokenize(GCODE)).relative_extrusion
@@ -0,0 +1,30 @@
+import os
+from core.model.app_settings import AppSettings
+from utils.file_handler import FileHandler
+
+GCODE = b"".join(f"G1 F1200 X{index} Y{index % 7} Z0.2 E{index}\n".encode() for index in range(1, 11))
+
+
+def split_settings(output_mode: str) -> AppSettings:
+    settings = AppSettings()
+    settings.from_dict({"conversion": {"moves_per_module": 4, "output_mode": output_mode}})
+    return settings
+
+
+def test_split_outputs_in_one_directory_keep_their_own_parts(tmp_path):
+    gcode_file = tmp_path / "part.gcode"
+    gcode_file.write_bytes(GCODE)
+    inline_file, table_file = str(tmp_path / "inline.mod"), str(tmp_path / "table-2.mod")
+
+    FileHandler().convert_gcode_file(str(gcode_file), inline_file, split_settings("inline"))
+    FileHandler().convert_gcode_file(str(gcode_file), table_file, split_settings("table"))
+
+    assert sorted(os.listdir(tmp_path)) == ["inline.mod", "inline_1.mod", "inline_2.mod", "inline_3.mod", "part.gcode",
+                                            "table-2.mod", "table_2_1.mod", "table_2_2.mod", "table_2_3.mod"]
+    inline_loader, table_loader = (open(path).read() for path in (inline_file, table_file))
+    assert '\\File:="inline_1.mod"' in inline_loader and '"inline_" + NumToStr(i, 0)' in inline_loader
+    assert '\\File:="table_2_1.mod"' in table_loader and '"table_2_" + NumToStr(i, 0)' in table_loader
+    assert open(tmp_path / "inline_3.mod").read().startswith("MODULE inline_3\n")
+    assert open(tmp_path / "table_2_3.mod").read().startswith("MODULE table_2_3\n")
+    assert "MoveL" in open(tmp_path / "inline_1.mod").read()
+    assert "LOCAL CONST pos targets{2}" in open(tmp_path / "table_2_3.mod").read()
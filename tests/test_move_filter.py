@@ -0,0 +1,32 @@
+from core.Domain.rapid_converter import RAPIDConverter
+from core.model.app_settings import AppSettings
+
+GCODE = b"""G1 F1200 X10 Y10 Z0.2
+G1 X10.0001 Y10 Z0.2
+G1 X10.3 Y10 Z0.2
+G1 X10.30000000001 Y10 Z0.2
+G1 X10.4 Y10 Z0.2
+"""
+
+
+def convert(position_decimals):
+    settings = AppSettings()
+    settings.set_precision(position_decimals, 4)
+    converter = RAPIDConverter()
+    rapid_lines = converter.gcode_to_rapid(GCODE, settings).splitlines()
+    return rapid_lines, converter.statistics["duplicate"]
+
+
+def test_duplicates_are_compared_at_output_precision():
+    rapid_lines, duplicates = convert(3)
+
+    assert [line[:line.index("],")] for line in rapid_lines] == ["MoveL [[10,10,0.2", "MoveL [[10.3,10,0.2", "MoveL [[10.4,10,0.2"]
+    assert duplicates == 2
+
+
+def test_full_precision_tolerates_float_noise_only():
+    rapid_lines, duplicates = convert(None)
+
+    assert len(rapid_lines) == 4
+    assert duplicates == 1
+
@@ -0,0 +1,26 @@
+import numpy as np
+from core.Domain.number_formatter import NumberFormatter
+
+
+def python_format(value: float, decimals: int) -> str:
+    text = format(value, f".{decimals}f")
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def test_half_way_values_match_str_format():
+    for decimals in (0, 1, 2, 3, 4):
+        steps = np.arange(-2000, 2000) + 0.5
+        values = np.concatenate((steps / 10 ** decimals, [0.0005, -0.0005, 1.0005, 2.675, 0.125, 1e6 + 0.5]))
+
+        vectorized = NumberFormatter.format_rows((values,), decimals)
+
+        assert vectorized == [python_format(value, decimals) for value in values.tolist()]
+        assert vectorized[:3] == [NumberFormatter.format_number(value, decimals) for value in values[:3].tolist()]
+
+
+def test_rows_are_joined_without_trailing_zeros():
+    columns = (np.array([10.0, -0.25]), np.array([0.0004, 3.10001]))
+
+    assert NumberFormatter.format_rows(columns, 3) == ["10,0", "-0.25,3.1"]
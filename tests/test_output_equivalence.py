@@ -0,0 +1,58 @@
+import os
+import pytest
+from core.Domain.gcode_reader import GCodeReader
+from core.Domain.parallel_conversion import ParallelConversion
+from core.Domain.rapid_converter import RAPIDConverter
+from core.model.app_settings import AppSettings
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def sample_gcode() -> bytes:
+    lines = ["G21", "G90", "M82", "G92 E0", "G1 Z5 F3000"]
+    extrusion = 0.0
+    for layer in range(20):
+        lines += [f";LAYER:{layer}", f"G0 X10 Y10 Z{0.2 * (layer + 1):.1f} F6000", "G1 F1200"]
+        for index in range(40):
+            extrusion += 0.05
+            lines.append(f"G1 X{10 + index * 0.5:.2f} Y{10 + (index * 7) % 13 * 0.25:.2f} E{extrusion:.5f}")
+        lines += ["G1 X30 Y20", "G1 X30 Y20", "G2 X20 Y30 I-10 J0 E{:.5f}".format(extrusion + 1.0), "M107"]
+        extrusion += 1.0
+    return ("\n".join(lines) + "\n").encode()
+
+
+def settings_variants() -> dict[str, AppSettings]:
+    legacy = AppSettings()
+    legacy.set_drop_redundant(False)
+    legacy.set_precision(None, None)
+    legacy.set_speed_table(None, 500.0)
+    fitted = AppSettings()
+    fitted.set_simplify(True)
+    fitted.set_arc_fitting(True)
+    return {"default": AppSettings(), "legacy": legacy, "fitted": fitted}
+
+
+@pytest.mark.parametrize("variant", ["default", "legacy", "fitted"])
+def test_parallel_output_matches_serial_output(variant, tmp_path, monkeypatch):
+    monkeypatch.setattr(ParallelConversion, "MIN_CHUNK_SIZE", 1024)
+    settings = settings_variants()[variant]
+    gcode = sample_gcode()
+    gcode_file = tmp_path / "sample.gcode"
+    gcode_file.write_bytes(gcode)
+
+    serial = RAPIDConverter().gcode_to_rapid(gcode, settings)
+    with GCodeReader(str(gcode_file)) as reader:
+        parallel_file = RAPIDConverter().gcode_file_to_rapid(reader, settings, workers=2)
+
+    assert RAPIDConverter().gcode_to_rapid(gcode, settings, workers=2) == serial
+    assert parallel_file == serial
+
+
+def test_legacy_settings_reproduce_baseline_output():
+    with open(os.path.join(DATA_DIR, "legacy_sample.gcode"), "rb") as file:
+        gcode = file.read()
+    with open(os.path.join(DATA_DIR, "legacy_sample.rapid"), "r", encoding="utf-8") as file:
+        baseline = file.read()
+
+    assert RAPIDConverter().gcode_to_rapid(gcode, settings_variants()["legacy"]) == baseline
+    assert RAPIDConverter().gcode_to_rapid(gcode, settings_variants()["legacy"], workers=2) == baseline
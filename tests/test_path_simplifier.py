@@ -0,0 +1,38 @@
+import numpy as np
+from core.Domain.gcode_tokenizer import GCodeTokenizer
+from core.Domain.path_simplifier import PathSimplifier
+from core.Domain.rapid_converter import RAPIDConverter
+
+
+def resolve(gcode: bytes):
+    return RAPIDConverter().resolve_moves(GCodeTokenizer.tokenize(gcode))
+
+
+def test_collinear_points_are_removed_and_corners_kept():
+    moves = resolve(b"G1 F1200 X0 Y0\nG1 X1 Y0.001\nG1 X2 Y0\nG1 X3 Y0\nG1 X3 Y1\nG1 X3 Y2\n")
+
+    assert PathSimplifier.simplify(moves, 0.01).tolist() == [True, False, False, True, False, True]
+
+
+def test_deviation_above_tolerance_is_kept():
+    moves = resolve(b"G1 F1200 X0 Y0\nG1 X1 Y0.5\nG1 X2 Y0\n")
+
+    assert PathSimplifier.simplify(moves, 0.1).all()
+    assert PathSimplifier.simplify(moves, 1.0).tolist() == [True, False, True]
+
+
+def test_mode_changes_are_kept():
+    moves = resolve(b"G1 F1200 X0 Y0\nG1 X1 Y0\nG1 X2 Y0 F600\nG1 X3 Y0\nG1 X4 Y0 E1\nG1 X5 Y0 E2\n")
+
+    keep = PathSimplifier.simplify(moves, 0.01)
+
+    assert keep[np.flatnonzero(moves.mode_changes()[1:])].all()
+    assert keep[[0, -1]].all()
+
+
+def test_disabled_simplification_keeps_every_move():
+    moves = resolve(b"G1 F1200 X0 Y0\nG1 X1 Y0\nG1 X2 Y0\n")
+
+    assert PathSimplifier.simplify(moves, None).all()
+    assert PathSimplifier.zone_tolerance(0) == PathSimplifier.MIN_TOLERANCE
+    assert PathSimplifier.zone_tolerance(5) == 0.5
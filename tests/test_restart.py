@@ -0,0 +1,45 @@
+from core.Domain.rapid_converter import RAPIDConverter
+from core.model.app_settings import AppSettings
+
+GCODE = b"""; generated by slicer
+G21
+G90
+M82
+;LAYER:0
+G0 X10 Y10 Z0.2
+G1 F1200 X20 Y10 E1.0
+G1 X20 Y20 E2.0
+;LAYER:1
+G0 Z0.4
+G1 X10 Y20 E3.0
+G1 X10 Y10 E4.0
+"""
+
+
+def test_restart_from_first_layer_without_active_feed():
+    rapid_lines = RAPIDConverter().gcode_layers_to_rapid(GCODE, AppSettings(), 0, 0).splitlines()
+
+    assert len(rapid_lines) == 4
+    assert rapid_lines[0].startswith("MoveL [[10,10,10.2],")
+    assert rapid_lines[1].startswith("MoveL [[10,10,0.2],")
+    assert all(",speed_20," in line for line in rapid_lines)
+    assert rapid_lines[-1].startswith("MoveL [[20,20,0.2],")
+
+
+def test_restart_approaches_first_move_of_later_layer():
+    rapid_lines = RAPIDConverter().gcode_layers_to_rapid(GCODE, AppSettings(), 1).splitlines()
+
+    assert rapid_lines[0].startswith("MoveL [[20,20,10.4],")
+    assert rapid_lines[1].startswith("MoveL [[20,20,0.4],")
+    assert rapid_lines[-1].startswith("MoveL [[10,10,0.4],")
+
+
+def test_layer_numbers_follow_slicer_comments():
+    gcode = GCODE.replace(b"M82\n", b"M82\nG0 X0 Y0 Z5 F3000\n")
+    restart_index = RAPIDConverter.build_restart_index(gcode)
+    converter = RAPIDConverter(keep_history=True)
+    converter.gcode_to_rapid(gcode, AppSettings())
+
+    assert restart_index.layer_line_range(0, 0) == (1, 10)
+    assert restart_index.layer_line_range(1) == (11, None)
+    assert converter.get_layer_index().bounds.tolist() == [0, 4, 7]
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from core.Domain.speed_table import SpeedTable
+
+
+def test_feeds_are_quantized_to_the_speed_step():
+    speeds = SpeedTable.quantize(np.array([1200.0, 1230.0, 1380.0, 100.0, 0.0]), 5.0)
+
+    assert speeds.tolist() == [20.0, 20.0, 25.0, 5.0, 5.0]
+
+
+def test_missing_feed_is_rejected():
+    with pytest.raises(ValueError):
+        SpeedTable.quantize(np.array([1200.0, np.nan]), 5.0)
+
+
+def test_speed_names_are_shared_by_equal_speeds():
+    names = SpeedTable.speed_names(np.array([1200.0, 1230.0, 150.0, 1200.0]), 2.5)
+
+    assert names == ["speed_20", "speed_20", "speed_2_5", "speed_20"]
+
+
+def test_declarations_cover_used_names_in_speed_order():
+    used = SpeedTable.used_names("MoveL p1,speed_20,z0;\nMoveL p2,speed_2_5,z0;\nMoveL p3,speed_20x,z0;")
+
+    assert used == {"speed_20", "speed_2_5"}
+    assert SpeedTable.format_declarations(used | {"v100"}, 500) == [
+        "LOCAL CONST speeddata speed_2_5:=[2.5,500,5000,1000];",
+        "LOCAL CONST speeddata speed_20:=[20,500,5000,1000];",
+    ]
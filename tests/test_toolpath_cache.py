@@ -0,0 +1,82 @@
+import os
+import numpy as np
+from core.Domain.gcode_reader import GCodeReader
+from core.Domain.gcode_tokenizer import GCodeTokenizer
+from core.Domain.toolpath_cache import ToolpathCache
+
+GCODE = b"".join(f"G1 X{index % 97}.5 Y{index % 89} Z0.2 E{index}.25 F1800\n".encode() for index in range(20000))
+
+
+def write_gcode(tmp_path):
+    gcode_file = tmp_path / "part.gcode"
+    gcode_file.write_bytes(GCODE)
+    return str(gcode_file)
+
+
+def cache_entries(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir))
+
+
+def assert_same_blocks(blocks, expected):
+    assert [(offset, line) for offset, line, _ in blocks] == [(offset, line) for offset, line, _ in expected]
+    for (_, _, toolpath), (_, _, other) in zip(blocks, expected):
+        for name, values in toolpath.as_dict().items():
+            np.testing.assert_array_equal(values, other.as_dict()[name])
+
+
+def test_cache_hit_yields_the_parsed_blocks(tmp_path):
+    cache = ToolpathCache(str(tmp_path / "cache"))
+    expected = list(GCodeTokenizer.iter_offset_blocks(GCODE))
+    with GCodeReader(write_gcode(tmp_path)) as reader:
+        stored = list(reader.iter_offset_blocks(cache=cache))
+        assert len(cache_entries(cache)) == 1
+        key = reader.cache_key()
+        loaded = list(cache.iter_offset_blocks(key, lambda: iter(())))
+
+    assert len(expected) > 1
+    assert_same_blocks(stored, expected)
+    assert_same_blocks(loaded, expected)
+    assert os.path.getsize(cache._path(key)) < len(GCODE)
+
+
+def test_entry_over_the_limit_is_not_stored(tmp_path):
+    cache = ToolpathCache(str(tmp_path / "cache"), max_bytes=16 * 1024)
+    with GCodeReader(write_gcode(tmp_path)) as reader:
+        blocks = list(reader.iter_offset_blocks(cache=cache))
+
+    assert_same_blocks(blocks, list(GCodeTokenizer.iter_offset_blocks(GCODE)))
+    assert cache_entries(cache) == []
+
+
+def test_interrupted_conversion_leaves_no_entry(tmp_path):
+    cache = ToolpathCache(str(tmp_path / "cache"))
+    with GCodeReader(write_gcode(tmp_path)) as reader:
+        blocks = reader.iter_offset_blocks(cache=cache)
+        next(blocks)
+        blocks.close()
+
+    assert cache_entries(cache) == []
+
+
+def test_unreadable_entry_is_discarded(tmp_path):
+    cache = ToolpathCache(str(tmp_path / "cache"))
+    key = ToolpathCache.key(GCODE)
+    with open(cache._path(key), "wb") as file:
+        file.write(b"not a cache entry")
+
+    blocks = list(cache.iter_offset_blocks(key, lambda: GCodeTokenizer.iter_offset_blocks(GCODE)))
+
+    assert_same_blocks(blocks, list(GCodeTokenizer.iter_offset_blocks(GCODE)))
+    assert cache_entries(cache) == [f"{key}.npz"]
+
+
+def test_eviction_keeps_the_cache_under_its_limit(tmp_path):
+    cache = ToolpathCache(str(tmp_path / "cache"))
+    for index in range(3):
+        data = GCODE + f"G1 X{index}\n".encode()
+        list(cache.iter_offset_blocks(ToolpathCache.key(data), lambda: GCodeTokenizer.iter_offset_blocks(data)))
+    sizes = [os.path.getsize(os.path.join(cache.cache_dir, name)) for name in cache_entries(cache)]
+    cache.max_bytes = sum(sizes) - 1
+    cache.evict()
+
+    assert len(cache_entries(cache)) == 2
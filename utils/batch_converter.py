@@ -0,0 +1,146 @@
+import argparse
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+from core.Domain.conversion_context import ConversionContext
+from core.Domain.move_filter import MoveFilter
+from utils.file_handler import FileHandler
+from utils.settings_manager import SettingsManager
+
+GCODE_EXTENSIONS = (".gcode", ".gco", ".g")
+RAPID_EXTENSION = ".mod"
+BYTES_PER_MB = 1024 * 1024
+
+
+@dataclass
+class BatchResult:
+    gcode_file: str
+    output_file: str
+    size: int = 0
+    seconds: float = 0.0
+    instructions: int = 0
+    statistics: dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def throughput(self) -> float:
+        return self.size / BYTES_PER_MB / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def removed(self) -> int:
+        return self.statistics.get('simplified_targets', 0) + self.statistics.get('arc_targets', 0)
+
+    @property
+    def skipped(self) -> int:
+        return sum(self.statistics.get(reason, 0) for reason in MoveFilter.REASONS)
+
+
+class BatchConverter:
+    def __init__(self, context: ConversionContext, workers: int = 1, output_dir: Optional[str] = None):
+        self.context = context
+        self.workers = max(workers, 1)
+        self.output_dir = output_dir
+
+    @staticmethod
+    def expand_inputs(patterns: Iterable[str]) -> list[str]:
+        files = []
+        for pattern in patterns:
+            if os.path.isdir(pattern):
+                matches = [os.path.join(pattern, name) for name in sorted(os.listdir(pattern))
+                           if name.lower().endswith(GCODE_EXTENSIONS)]
+            else:
+                matches = sorted(glob.glob(pattern, recursive=True))
+            matches = [match for match in matches if os.path.isfile(match)]
+            if not matches:
+                logging.warning(f"No G-code files match {pattern}")
+            files.extend(os.path.abspath(match) for match in matches)
+        return list(dict.fromkeys(files))
+
+    def output_path(self, gcode_file: str) -> str:
+        directory = self.output_dir or os.path.dirname(gcode_file)
+        return os.path.join(directory, os.path.splitext(os.path.basename(gcode_file))[0] + RAPID_EXTENSION)
+
+    def convert(self, gcode_files: list[str]) -> Iterator[BatchResult]:
+        if self.workers == 1 or len(gcode_files) == 1:
+            for gcode_file in gcode_files:
+                yield self.convert_file(gcode_file, self.output_path(gcode_file), self.context)
+            return
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(gcode_files))) as executor:
+            futures = [executor.submit(BatchConverter.convert_file, gcode_file, self.output_path(gcode_file), self.context)
+                       for gcode_file in gcode_files]
+            for future in as_completed(futures):
+                yield future.result()
+
+    @staticmethod
+    def convert_file(gcode_file: str, output_file: str, context: ConversionContext) -> BatchResult:
+        result = BatchResult(gcode_file, output_file)
+        start = time.perf_counter()
+        try:
+            result.size = os.path.getsize(gcode_file)
+            converter = FileHandler().convert_gcode_file(gcode_file, output_file, context)
+            result.instructions = converter.statistics.get('instructions', 0)
+            result.statistics = dict(converter.statistics)
+        except Exception as e:
+            logging.error(f"Conversion of {gcode_file} failed: {e}")
+            result.error = str(e)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def format_header() -> str:
+        return f"{'file':<40} {'size [MB]':>10} {'time [s]':>9} {'MB/s':>8} {'instructions':>12} {'removed':>8} {'skipped':>8}"
+
+    @staticmethod
+    def format_result(result: BatchResult) -> str:
+        name = os.path.basename(result.gcode_file)
+        if result.error is not None:
+            return f"{name:<40} FAILED: {result.error}"
+        return (f"{name:<40} {result.size / BYTES_PER_MB:>10.2f} {result.seconds:>9.2f} {result.throughput:>8.2f} "
+                f"{result.instructions:>12} {result.removed:>8} {result.skipped:>8}")
+
+    @staticmethod
+    def format_total(results: list[BatchResult], wall_seconds: float) -> str:
+        converted = [result for result in results if result.error is None]
+        size = sum(result.size for result in converted) / BYTES_PER_MB
+        throughput = size / wall_seconds if wall_seconds > 0 else 0.0
+        return (f"{len(converted)}/{len(results)} files, {size:.2f} MB in {wall_seconds:.2f} s ({throughput:.2f} MB/s), "
+                f"{sum(result.instructions for result in converted)} instructions, {sum(result.removed for result in converted)} removed, "
+                f"{sum(result.skipped for result in converted)} skipped")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="gconverter convert", description="Convert G-code files to RAPID modules without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="G-code files, directories or glob patterns")
+    parser.add_argument("-s", "--settings", default="settings.json", help="settings JSON saved by the application")
+    parser.add_argument("-o", "--output-dir", help="directory for the RAPID modules, next to each G-code file when omitted")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="number of files converted in parallel")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every conversion step")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    if not os.path.isfile(args.settings):
+        parser.error(f"settings file {args.settings} does not exist")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    gcode_files = BatchConverter.expand_inputs(args.inputs)
+    if not gcode_files:
+        parser.error("no G-code files found")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    settings = SettingsManager(args.settings).load_all_settings()
+    batch = BatchConverter(ConversionContext.from_settings(settings), args.workers, args.output_dir)
+    print(BatchConverter.format_header(), flush=True)
+    start = time.perf_counter()
+    results = []
+    for result in batch.convert(gcode_files):
+        results.append(result)
+        print(BatchConverter.format_result(result), flush=True)
+    print(BatchConverter.format_total(results, time.perf_counter() - start))
+    return 1 if any(result.error is not None for result in results) else 0
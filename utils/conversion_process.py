@@ -0,0 +1,329 @@
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Callable, Optional, Union
+import numpy as np
+from core.Domain.conversion_context import ConversionContext
+from core.Domain.gcode_reader import GCodeReader
+from core.Domain.rapid_converter import RAPIDConverter
+from core.Domain.toolpath_cache import ToolpathCache
+from core.model.app_settings import AppSettings
+from core.model.toolpath import LayerIndex, RestartIndex
+from utils.file_handler import FileHandler
+from utils.worker import ConversionJob
+
+POSITION_COLUMNS = 3
+MAX_RETAINED_CONVERTERS = 2
+
+
+@dataclass(frozen=True)
+class ConversionRequest:
+    job_id: int
+    context: ConversionContext
+    source: Optional[str] = None
+    is_file: bool = False
+    cache_dir: Optional[str] = None
+    reemit_of: Optional[int] = None
+    output_file: Optional[str] = None
+    first: Optional[int] = None
+    last: Optional[int] = None
+    by_layer: bool = False
+    restart_index: Optional[RestartIndex] = None
+
+    @property
+    def keeps_converter(self) -> bool:
+        return self.output_file is None and self.first is None
+
+
+@dataclass
+class ConversionResult:
+    job_id: int
+    rapid_file: Optional[str] = None
+    memory_name: Optional[str] = None
+    count: int = 0
+    has_positions: bool = False
+    statistics: Counter = field(default_factory=Counter)
+    layers: LayerIndex = field(default_factory=LayerIndex)
+    restart_index: Optional[RestartIndex] = None
+    cancelled: bool = False
+
+
+class RemoteConverter:
+    def __init__(self):
+        self.job_id: Optional[int] = None
+        self.statistics = Counter()
+        self.layers = LayerIndex()
+        self.restart_index: Optional[RestartIndex] = None
+
+    def get_layer_index(self) -> LayerIndex:
+        return self.layers
+
+
+class ProcessJob(ConversionJob):
+    def __init__(self, job_id: int, cancelled_job, converter: RAPIDConverter, callback: Callable,
+                 progress_callback: Optional[Callable] = None):
+        super().__init__(converter, callback, progress_callback)
+        self.job_id = job_id
+        self.cancelled_job = cancelled_job
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.cancelled_job.value >= self.job_id
+
+
+class RemoteJob:
+    def __init__(self, process: 'ConversionProcess', job_id: int, converter: RemoteConverter, callback: Callable,
+                 progress_callback: Optional[Callable] = None):
+        self.process = process
+        self.job_id = job_id
+        self.converter = converter
+        self.callback = callback
+        self.progress_callback = progress_callback
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        self.process.cancel(self.job_id)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        self.done.wait(timeout)
+
+
+class ConversionProcess:
+    POLL_INTERVAL = 1.0
+
+    def __init__(self):
+        self.mp_context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.requests = None
+        self.responses = None
+        self.cancelled_job = None
+        self.jobs: dict[int, RemoteJob] = {}
+        self.next_job_id = 0
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        if self.process is not None and self.process.is_alive():
+            return
+        self.requests = self.mp_context.Queue()
+        self.responses = self.mp_context.Queue()
+        self.cancelled_job = self.mp_context.Value('q', self.next_job_id)
+        self.process = self.mp_context.Process(target=serve, args=(self.requests, self.responses, self.cancelled_job),
+                                               name="gconverter-worker", daemon=True)
+        self.process.start()
+        listener = threading.Thread(target=self.listen, args=(self.process, self.responses))
+        listener.daemon = True
+        listener.start()
+        logging.info(f"Conversion process {self.process.pid} started")
+
+    def close(self) -> None:
+        if self.process is not None and self.process.is_alive():
+            self.requests.put(None)
+            self.process.join(5)
+        self.process = None
+
+    def convert_async(self, gcode_source: Union[str, GCodeReader], settings: AppSettings, callback: Callable,
+                      cache: Optional[ToolpathCache] = None, converter: Optional[RemoteConverter] = None,
+                      progress_callback: Optional[Callable] = None) -> RemoteJob:
+        return self.submit(converter or RemoteConverter(), callback, progress_callback,
+                           **self.source_request(gcode_source, settings, cache))
+
+    def convert_range_async(self, gcode_source: Union[str, GCodeReader], settings: AppSettings, callback: Callable, first: int,
+                            last: Optional[int] = None, by_layer: bool = False, restart_index: Optional[RestartIndex] = None,
+                            converter: Optional[RemoteConverter] = None, progress_callback: Optional[Callable] = None) -> RemoteJob:
+        converter = converter or RemoteConverter()
+        converter.restart_index = restart_index
+        return self.submit(converter, callback, progress_callback, **self.source_request(gcode_source, settings),
+                           first=first, last=last, by_layer=by_layer, restart_index=restart_index)
+
+    def save_async(self, gcode_source: Union[str, GCodeReader], settings: AppSettings, output_file: str, callback: Callable,
+                   cache: Optional[ToolpathCache] = None, progress_callback: Optional[Callable] = None, first: Optional[int] = None,
+                   last: Optional[int] = None, by_layer: bool = False, restart_index: Optional[RestartIndex] = None) -> RemoteJob:
+        return self.submit(RemoteConverter(), callback, progress_callback, **self.source_request(gcode_source, settings, cache),
+                           output_file=output_file, first=first, last=last, by_layer=by_layer, restart_index=restart_index)
+
+    @staticmethod
+    def source_request(gcode_source: Union[str, GCodeReader], settings: AppSettings,
+                       cache: Optional[ToolpathCache] = None) -> dict:
+        is_file = isinstance(gcode_source, GCodeReader)
+        return dict(context=ConversionContext.from_settings(settings), source=gcode_source.file_path if is_file else gcode_source,
+                    is_file=is_file, cache_dir=cache.cache_dir if cache is not None else None)
+
+    def reemit_async(self, converter: RemoteConverter, settings: AppSettings, callback: Callable,
+                     progress_callback: Optional[Callable] = None) -> RemoteJob:
+        if converter.job_id is None:
+            raise ValueError("Only a completed conversion can be emitted again")
+        return self.submit(converter, callback, progress_callback, context=ConversionContext.from_settings(settings),
+                           reemit_of=converter.job_id)
+
+    def submit(self, converter: RemoteConverter, callback: Callable, progress_callback: Optional[Callable], **request) -> RemoteJob:
+        with self.lock:
+            self.start()
+            self.next_job_id += 1
+            job = RemoteJob(self, self.next_job_id, converter, callback, progress_callback)
+            self.jobs[job.job_id] = job
+            self.requests.put(ConversionRequest(job_id=job.job_id, **request))
+        return job
+
+    def cancel(self, job_id: int) -> None:
+        with self.lock:
+            if self.cancelled_job is not None:
+                with self.cancelled_job.get_lock():
+                    self.cancelled_job.value = max(self.cancelled_job.value, job_id)
+
+    def listen(self, process, responses) -> None:
+        while True:
+            try:
+                message = responses.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                self.fail_jobs(f"Error during conversion: conversion process exited with code {process.exitcode}")
+                return
+            if message is None:
+                return
+            if isinstance(message, ConversionResult):
+                self.complete(message)
+            else:
+                job_id, progress = message
+                job = self.jobs.get(job_id)
+                if job is not None and job.progress_callback is not None and not job.is_cancelled:
+                    job.progress_callback(job, progress)
+
+    def complete(self, result: ConversionResult) -> None:
+        with self.lock:
+            job = self.jobs.pop(result.job_id, None)
+        positions = self.attach_positions(result.memory_name, result.count) if result.has_positions else None
+        rapid_code = None
+        if result.rapid_file is not None:
+            if job is not None and not job.is_cancelled:
+                with open(result.rapid_file, "r", encoding="utf-8") as file:
+                    rapid_code = file.read()
+            os.remove(result.rapid_file)
+        if job is None:
+            return
+        if not result.cancelled and not job.is_cancelled:
+            job.converter.statistics = result.statistics
+            job.converter.layers = result.layers
+            if result.restart_index is not None:
+                job.converter.restart_index = result.restart_index
+            if positions is not None and job.converter.job_id is None:
+                job.converter.job_id = result.job_id
+            job.callback(rapid_code, positions)
+        job.done.set()
+
+    def fail_jobs(self, message: str) -> None:
+        with self.lock:
+            jobs, self.jobs = list(self.jobs.values()), {}
+            self.process = None
+        logging.error(message)
+        for job in jobs:
+            if not job.is_cancelled:
+                job.callback(message, None)
+            job.done.set()
+
+    @staticmethod
+    def attach_positions(memory_name: Optional[str], count: int) -> np.ndarray:
+        if memory_name is None:
+            return np.empty((0, POSITION_COLUMNS), dtype=np.float64)
+        memory = shared_memory.SharedMemory(name=memory_name)
+        memory.unlink()
+        columns = np.ndarray((POSITION_COLUMNS, count), dtype=np.float64, buffer=memory.buf)
+        weakref.finalize(columns, memory.close)
+        return columns.T
+
+
+def share_positions(positions: np.ndarray) -> Optional[str]:
+    if not len(positions):
+        return None
+    memory = shared_memory.SharedMemory(create=True, size=positions.nbytes)
+    columns = np.ndarray((POSITION_COLUMNS, len(positions)), dtype=np.float64, buffer=memory.buf)
+    columns[:] = positions.T
+    del columns
+    memory.close()
+    return memory.name
+
+
+def write_rapid_file(rapid_code: str) -> str:
+    handle, path = tempfile.mkstemp(prefix="gconverter_", suffix=".mod")
+    with os.fdopen(handle, "w", encoding="utf-8") as file:
+        file.write(rapid_code)
+    return path
+
+
+def request_work(job: ProcessJob, request: ConversionRequest, reader: Optional[GCodeReader]) -> Callable[[], str]:
+    def work():
+        if request.first is not None:
+            toolpaths = job.converter.restart_toolpaths(reader if reader is not None else request.source, request.context, request.first,
+                                                        request.last, request.by_layer, request.restart_index)
+        elif reader is not None:
+            cache = ToolpathCache.from_settings(request.context, request.cache_dir) if request.cache_dir is not None else None
+            toolpaths = job.iter_toolpaths(reader, cache)
+        else:
+            toolpaths = job.iter_blocks(request.source)
+        if request.output_file is None:
+            return job.converter.toolpaths_to_rapid(toolpaths, request.context)
+        FileHandler().convert_toolpaths(toolpaths, request.output_file, request.context, job.converter)
+        return ""
+
+    return work
+
+
+def serve(requests, responses, cancelled_job) -> None:
+    retained: dict[tuple[bool, Optional[str]], tuple[int, RAPIDConverter]] = {}
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        source_key = (request.is_file, request.source)
+        converter = RAPIDConverter(keep_history=request.output_file is None)
+        if request.reemit_of is not None:
+            source_key, converter = next(((key, kept) for key, (job_id, kept) in retained.items() if job_id == request.reemit_of),
+                                         (None, None))
+        if converter is None:
+            responses.put(ConversionResult(request.job_id, rapid_file=write_rapid_file(
+                "Error during conversion: the previous conversion is no longer available")))
+            continue
+
+        result = ConversionResult(request.job_id, cancelled=True)
+
+        def send_result(rapid_code, positions):
+            result.cancelled = False
+            result.rapid_file = write_rapid_file(rapid_code)
+            if positions is not None:
+                result.has_positions = True
+                result.count = len(positions)
+                result.memory_name = share_positions(positions)
+                result.statistics = Counter(converter.statistics)
+                result.layers = converter.get_layer_index()
+                if request.first is not None and request.restart_index is None:
+                    result.restart_index = converter.restart_index
+
+        job = ProcessJob(request.job_id, cancelled_job, converter, send_result,
+                         lambda _, progress: responses.put((request.job_id, progress)))
+        if request.reemit_of is not None:
+            job.run(lambda: converter.reemit_rapid(request.context))
+        elif request.is_file:
+            with GCodeReader(request.source) as reader:
+                job.run(request_work(job, request, reader))
+        else:
+            job.run(request_work(job, request, None))
+        if result.has_positions and request.keeps_converter:
+            retained.pop(source_key, None)
+            retained[source_key] = (request.job_id if request.reemit_of is None else request.reemit_of, converter)
+            while len(retained) > MAX_RETAINED_CONVERTERS:
+                del retained[next(iter(retained))]
+        responses.put(result)
+    responses.put(None)
@@ -0,0 +1,418 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Optional
+from urllib.parse import urlsplit
+import numpy as np
+from core.Domain.conversion_context import ConversionContext
+from core.Domain.move_filter import MoveFilter
+from core.Domain.rapid_converter import RAPIDConverter
+from core.model.app_settings import AppSettings
+from utils.file_handler import FileHandler
+from utils.settings_manager import SettingsManager
+from utils.worker import ConversionCancelled, ConversionJob, ConversionProgress
+
+MAX_BODY_SIZE = 64 * 1024 * 1024
+MAX_FINISHED_JOBS = 1000
+BYTES_PER_MB = 1024 * 1024
+HTTP_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class ServiceJob:
+    job_id: int
+    gcode_file: str
+    output_file: str
+    context: ConversionContext
+    size: int
+    temporary_input: bool = False
+    status: JobStatus = JobStatus.QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    progress: Optional[ConversionProgress] = None
+    instructions: int = 0
+    statistics: dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    @property
+    def job_dir(self) -> str:
+        return os.path.dirname(self.output_file)
+
+    def as_dict(self) -> dict[str, Any]:
+        progress = None
+        if self.status == JobStatus.DONE:
+            progress = {"fraction": 1.0, "bytes_done": self.size, "total_bytes": self.size, "eta": 0.0}
+        elif self.progress is not None:
+            progress = {"lines": self.progress.lines, "fraction": round(self.progress.fraction, 4),
+                        "bytes_done": self.progress.bytes_done, "total_bytes": self.progress.total_bytes,
+                        "eta": None if self.progress.eta is None else round(self.progress.eta, 2)}
+        return {
+            "id": self.job_id,
+            "status": self.status.value,
+            "gcode_file": None if self.temporary_input else self.gcode_file,
+            "output_file": self.output_file,
+            "size": self.size,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "progress": progress,
+            "instructions": self.instructions,
+            "removed": self.statistics.get('simplified_targets', 0) + self.statistics.get('arc_targets', 0),
+            "skipped": sum(self.statistics.get(reason, 0) for reason in MoveFilter.REASONS),
+            "statistics": self.statistics,
+            "error": self.error,
+        }
+
+
+class ServiceMetrics:
+    WINDOW = 1000
+
+    def __init__(self):
+        self.started = time.time()
+        self.counts = Counter()
+        self.bytes_converted = 0
+        self.busy_seconds = 0.0
+        self.wait_times = deque(maxlen=self.WINDOW)
+        self.run_times = deque(maxlen=self.WINDOW)
+        self.latencies = deque(maxlen=self.WINDOW)
+
+    def record(self, job: ServiceJob) -> None:
+        self.counts[job.status.value] += 1
+        if job.started is None:
+            return
+        run_time = job.finished - job.started
+        self.wait_times.append(job.started - job.submitted)
+        self.run_times.append(run_time)
+        self.latencies.append(job.finished - job.submitted)
+        if job.status == JobStatus.DONE:
+            self.bytes_converted += job.size
+            self.busy_seconds += run_time
+
+    @staticmethod
+    def summarize(values: deque) -> Optional[dict[str, float]]:
+        if not values:
+            return None
+        data = np.fromiter(values, dtype=np.float64)
+        p50, p95 = np.percentile(data, (50, 95))
+        return {"mean": round(float(data.mean()), 4), "p50": round(float(p50), 4), "p95": round(float(p95), 4),
+                "max": round(float(data.max()), 4)}
+
+    def as_dict(self, queued: int, running: int, workers: int) -> dict[str, Any]:
+        uptime = time.time() - self.started
+        return {
+            "uptime": round(uptime, 1),
+            "workers": workers,
+            "queued": queued,
+            "running": running,
+            "jobs": dict(self.counts),
+            "converted_mb": round(self.bytes_converted / BYTES_PER_MB, 3),
+            "throughput_mb_s": round(self.bytes_converted / BYTES_PER_MB / self.busy_seconds, 3) if self.busy_seconds else 0.0,
+            "jobs_per_minute": round(self.counts[JobStatus.DONE.value] * 60.0 / uptime, 3) if uptime else 0.0,
+            "wait_seconds": self.summarize(self.wait_times),
+            "run_seconds": self.summarize(self.run_times),
+            "latency_seconds": self.summarize(self.latencies),
+        }
+
+
+class ServiceConversionJob(ConversionJob):
+    def __init__(self, job_id: int, cancelled, progress):
+        super().__init__(RAPIDConverter(), None, lambda _, update: progress.put((job_id, update)))
+        self.job_id = job_id
+        self.cancelled_jobs = cancelled
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.job_id in self.cancelled_jobs
+
+
+def convert_service_job(job_id: int, gcode_file: str, output_file: str, context: ConversionContext, progress,
+                        cancelled) -> Optional[tuple[int, dict[str, int]]]:
+    job = ServiceConversionJob(job_id, cancelled, progress)
+    try:
+        converter = FileHandler().convert_gcode_file(gcode_file, output_file, context, job=job)
+    except ConversionCancelled:
+        return None
+    return converter.statistics.get('instructions', 0), dict(converter.statistics)
+
+
+class ConversionService:
+    def __init__(self, settings: AppSettings, output_dir: str, workers: int):
+        self.settings = settings
+        self.output_dir = output_dir
+        self.workers = max(workers, 1)
+        self.jobs: dict[int, ServiceJob] = {}
+        self.next_job_id = 0
+        self.metrics = ServiceMetrics()
+        self.queue: Optional[asyncio.Queue] = None
+        self.mp_context = multiprocessing.get_context("spawn")
+        self.manager = None
+        self.progress = None
+        self.cancelled = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.progress_reader = ThreadPoolExecutor(max_workers=1)
+        self.tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue()
+        self.manager = self.mp_context.Manager()
+        self.progress = self.manager.Queue()
+        self.cancelled = self.manager.dict()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context)
+        self.tasks = [asyncio.create_task(self.dispatch()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self.forward_progress()))
+
+    async def stop(self) -> None:
+        for job in self.jobs.values():
+            if not job.is_finished:
+                self.cancel(job)
+        self.progress.put(None)
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.progress_reader.shutdown(wait=False)
+        self.manager.shutdown()
+
+    def submit(self, payload: dict[str, Any]) -> ServiceJob:
+        settings = AppSettings()
+        settings.from_dict(self.merge_settings(self.settings.as_dict(), payload.get("settings") or {}))
+        context = ConversionContext.from_settings(settings)
+        output_name = payload.get("output_file")
+        if output_name is not None and (not isinstance(output_name, str) or os.path.basename(output_name) != output_name
+                                        or output_name in ("", ".", "..")):
+            raise ValueError("'output_file' must be a file name without a directory")
+
+        temporary_input = "gcode" in payload
+        if not temporary_input:
+            if "gcode_file" not in payload:
+                raise ValueError("Either 'gcode_file' or 'gcode' is required")
+            gcode_file = os.path.abspath(payload["gcode_file"])
+            if not os.path.isfile(gcode_file):
+                raise ValueError(f"G-code file {gcode_file} does not exist")
+
+        self.next_job_id += 1
+        job_id = self.next_job_id
+        job_dir = tempfile.mkdtemp(prefix=f"job_{job_id}_", dir=self.output_dir)
+        if temporary_input:
+            gcode_file = os.path.join(job_dir, f"job_{job_id}.gcode")
+            with open(gcode_file, "w", encoding="utf-8") as file:
+                file.write(payload["gcode"])
+        output_file = os.path.join(job_dir, output_name or f"job_{job_id}.mod")
+
+        job = ServiceJob(job_id, gcode_file, output_file, context, os.path.getsize(gcode_file), temporary_input)
+        self.jobs[job_id] = job
+        self.queue.put_nowait(job)
+        self.prune_jobs()
+        logging.info(f"Job {job_id} queued: {gcode_file} -> {output_file}")
+        return job
+
+    @staticmethod
+    def merge_settings(base: dict[str, Any], overrides: dict[str, Any]) -> dict[str, Any]:
+        merged = dict(base)
+        for key, value in overrides.items():
+            merged[key] = ConversionService.merge_settings(base[key], value) \
+                if isinstance(value, dict) and isinstance(base.get(key), dict) else value
+        return merged
+
+    def cancel(self, job: ServiceJob) -> None:
+        if job.is_finished:
+            return
+        if job.status == JobStatus.QUEUED:
+            self.finish(job, JobStatus.CANCELLED)
+        else:
+            self.cancelled[job.job_id] = True
+
+    async def dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job.status != JobStatus.QUEUED:
+                continue
+            job.status = JobStatus.RUNNING
+            job.started = time.time()
+            try:
+                outcome = await loop.run_in_executor(self.pool, convert_service_job, job.job_id, job.gcode_file,
+                                                     job.output_file, job.context, self.progress, self.cancelled)
+            except Exception as e:
+                logging.error(f"Job {job.job_id} failed: {e}")
+                job.error = str(e)
+                self.finish(job, JobStatus.FAILED)
+                continue
+            if outcome is None:
+                self.finish(job, JobStatus.CANCELLED)
+            else:
+                job.instructions, job.statistics = outcome
+                self.finish(job, JobStatus.DONE)
+
+    def finish(self, job: ServiceJob, status: JobStatus) -> None:
+        job.status = status
+        job.finished = time.time()
+        self.cancelled.pop(job.job_id, None)
+        if status != JobStatus.DONE:
+            shutil.rmtree(job.job_dir, ignore_errors=True)
+        elif job.temporary_input and os.path.exists(job.gcode_file):
+            os.remove(job.gcode_file)
+        self.metrics.record(job)
+        logging.info(f"Job {job.job_id} {status.value} in {job.finished - job.submitted:.2f} s")
+
+    async def forward_progress(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await loop.run_in_executor(self.progress_reader, self.progress.get)
+            if message is None:
+                return
+            job_id, progress = message
+            job = self.jobs.get(job_id)
+            if job is not None and job.status == JobStatus.RUNNING:
+                job.progress = progress
+
+    def prune_jobs(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.is_finished]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self.jobs[job_id]
+
+    def get_metrics(self) -> dict[str, Any]:
+        running = sum(job.status == JobStatus.RUNNING for job in self.jobs.values())
+        queued = sum(job.status == JobStatus.QUEUED for job in self.jobs.values())
+        return self.metrics.as_dict(queued, running, self.workers)
+
+    @staticmethod
+    def read_output(job: ServiceJob) -> str:
+        with open(job.output_file, "r", encoding="utf-8") as file:
+            return file.read()
+
+    async def route(self, method: str, path: str, body: bytes) -> tuple[int, Any]:
+        parts = [part for part in path.split("/") if part]
+        if parts == ["health"] and method == "GET":
+            return 200, {"status": "ok"}
+        if parts == ["metrics"] and method == "GET":
+            return 200, self.get_metrics()
+        if parts == ["jobs"]:
+            if method == "GET":
+                return 200, [job.as_dict() for job in self.jobs.values()]
+            if method == "POST":
+                try:
+                    payload = json.loads(body or b"{}")
+                    if not isinstance(payload, dict):
+                        raise ValueError("Request body must be a JSON object")
+                    return 202, self.submit(payload).as_dict()
+                except (ValueError, TypeError, KeyError, OSError) as e:
+                    return 400, {"error": str(e)}
+            return 405, {"error": f"{method} is not allowed on /jobs"}
+        if len(parts) in (2, 3) and parts[0] == "jobs" and parts[1].isdigit():
+            job = self.jobs.get(int(parts[1]))
+            if job is None:
+                return 404, {"error": f"Job {parts[1]} does not exist"}
+            if len(parts) == 3 and parts[2] == "rapid" and method == "GET":
+                if job.status != JobStatus.DONE:
+                    return 409, {"error": f"Job {job.job_id} is {job.status.value}"}
+                return 200, await asyncio.to_thread(self.read_output, job)
+            if len(parts) == 2 and method == "GET":
+                return 200, job.as_dict()
+            if len(parts) == 2 and method == "DELETE":
+                self.cancel(job)
+                return 202, job.as_dict()
+            return 405, {"error": f"{method} is not allowed on {path}"}
+        return 404, {"error": f"Unknown path {path}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if len(request_line) < 2:
+                status, payload = 400, {"error": "Malformed request line"}
+            elif int(headers.get("content-length", 0)) > MAX_BODY_SIZE:
+                status, payload = 413, {"error": f"Request body exceeds {MAX_BODY_SIZE} bytes"}
+            else:
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self.route(request_line[0].upper(), urlsplit(request_line[1]).path, body)
+        except (asyncio.IncompleteReadError, ValueError) as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            logging.exception(f"Request failed: {e}")
+            status, payload = 500, {"error": str(e)}
+
+        if isinstance(payload, str):
+            content, content_type = payload.encode("utf-8"), "text/plain; charset=utf-8"
+        else:
+            content, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        writer.write(f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(content)}\r\nConnection: close\r\n\r\n".encode("latin-1") + content)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(service: ConversionService, host: str, port: int, socket_path: Optional[str]) -> None:
+    await service.start()
+    if socket_path:
+        server = await asyncio.start_unix_server(service.handle, path=socket_path)
+        logging.warning(f"Conversion service listening on {socket_path}")
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        logging.warning(f"Conversion service listening on http://{host}:{port}")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stopping.set)
+    async with server:
+        await stopping.wait()
+    await service.stop()
+    if socket_path and os.path.exists(socket_path):
+        os.remove(socket_path)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="gconverter serve", description="Local G-code to RAPID conversion service.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--socket", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("-s", "--settings", default="settings.json", help="default settings JSON saved by the application")
+    parser.add_argument("-o", "--output-dir", default="service_output", help="directory for RAPID modules and uploaded G-code")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="number of concurrent conversions")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every job")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    if not os.path.isfile(args.settings):
+        parser.error(f"settings file {args.settings} does not exist")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    service = ConversionService(SettingsManager(args.settings).load_all_settings(), os.path.abspath(args.output_dir), args.workers)
+    asyncio.run(serve(service, args.host, args.port, args.socket))
+    return 0
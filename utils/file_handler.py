@@ -1,26 +1,134 @@
 import logging
+import os
+from itertools import chain, islice
+from typing import Iterable, Optional
+from core.Domain.conversion_context import ConversionContext
+from core.Domain.gcode_reader import GCodeReader
+from core.Domain.rapid_converter import RAPIDConverter
 from core.Domain.rapid_formatter import RAPIDFormatter
+from core.Domain.speed_table import SpeedTable
+from core.Domain.toolpath_cache import ToolpathCache
+from core.model.toolpath import MoveTable, Toolpath
+from utils.worker import ConversionJob
+
+BODY_BLOCK_LINES = 1 << 16
+BODY_READ_SIZE = 1 << 20
+ERROR_SPLIT_TABLE_TEXT = "Tabuľkový modul nemožno z textu rozdeliť na časti - skonvertujte G-kód znova alebo nastavte 0 pohybov v module"
 
 
 class FileHandler:
     def __init__(self):
         self.formatter = RAPIDFormatter()
 
-    def write_rapid_file(self, rapid_lines: list[str], output_file: str, app_settings) -> None:
+    def write_rapid_file(self, rapid_lines: Iterable[str], output_file: str, app_settings) -> None:
+        params = app_settings.get_parameters()
+        conversion = app_settings.get_conversion()
+        if conversion.moves_per_module > 0:
+            part_name = self.formatter.part_name(output_file)
+            rapid_lines = iter(rapid_lines)
+            part_count = 0
+            while True:
+                part_lines = list(islice(rapid_lines, conversion.moves_per_module))
+                if not part_lines:
+                    break
+                part_count += 1
+                declarations = self.formatter.iter_speed_declarations(SpeedTable.used_names("\n".join(part_lines)), conversion)
+                self.write_rapid_module(self.formatter.iter_part_module(params, part_name, part_count, part_lines, declarations),
+                                        self.part_file_path(output_file, part_count))
+            self.write_loader_module(output_file, app_settings, part_count)
+            return
+
+        tool_data = self.formatter.format_tool_data(params, app_settings.get_tcp_object(), conversion)
+        workobj_data = self.formatter.format_workobj_data(params, app_settings.get_work_object(), conversion)
+        body_file = f"{output_file}.body"
         try:
-            params = app_settings.get_parameters()
-            tcp = app_settings.get_tcp_object()
-            workobj = app_settings.get_work_object()
-            conversion = app_settings.get_conversion()
+            speed_names = set()
+            with open(body_file, 'w') as body:
+                rapid_lines = iter(rapid_lines)
+                while True:
+                    block = list(islice(rapid_lines, BODY_BLOCK_LINES))
+                    if not block:
+                        break
+                    text = self.formatter.format_module_lines(block)
+                    speed_names |= SpeedTable.used_names(text)
+                    body.write(text)
+            declarations = self.formatter.iter_speed_declarations(speed_names, conversion)
+            with open(body_file) as body:
+                self.write_rapid_module(chain(self.formatter.iter_module_head(params, tool_data, workobj_data, conversion, declarations),
+                                              iter(lambda: body.read(BODY_READ_SIZE), ""),
+                                              (self.formatter.format_module_footer(),)),
+                                        output_file)
+        finally:
+            if os.path.exists(body_file):
+                os.remove(body_file)
+
+    def write_table_module(self, moves: MoveTable, output_file: str, context: ConversionContext) -> None:
+        moves_per_module = context.get_conversion().moves_per_module
+        if moves_per_module <= 0:
+            self.write_rapid_module(self.formatter.iter_table_module(moves, context), output_file)
+            return
+        part_name = self.formatter.part_name(output_file)
+        events = self.formatter.table_events(moves, context)
+        part_count = 0
+        for start in range(0, len(moves), moves_per_module):
+            part_count += 1
+            part_events = None if events is None else events[start:start + moves_per_module]
+            self.write_rapid_module(self.formatter.iter_table_part_module(moves.slice(start, start + moves_per_module), context, part_name,
+                                                                          part_count, part_events),
+                                    self.part_file_path(output_file, part_count))
+        self.write_loader_module(output_file, context, part_count)
+
+    def write_loader_module(self, output_file: str, app_settings, part_count: int) -> None:
+        params = app_settings.get_parameters()
+        tool_data = self.formatter.format_tool_data(params, app_settings.get_tcp_object(), app_settings.get_conversion())
+        workobj_data = self.formatter.format_workobj_data(params, app_settings.get_work_object(), app_settings.get_conversion())
+        conversion = app_settings.get_conversion()
+        if not part_count:
+            self.write_rapid_module(self.formatter.iter_module(params, tool_data, workobj_data, (), conversion), output_file)
+            return
+        self.write_rapid_module(self.formatter.iter_loader_module(params, tool_data, workobj_data, conversion,
+                                                                  self.formatter.part_name(output_file), part_count), output_file)
 
-            tool_data = self.formatter.format_tool_data(params, tcp)
-            workobj_data = self.formatter.format_workobj_data(params, workobj)
-            rapid_module = self.formatter.format_module(params, tool_data, workobj_data, rapid_lines, conversion)
+    def part_file_path(self, output_file: str, part: int) -> str:
+        part_module = self.formatter.part_module_name(self.formatter.part_name(output_file), part)
+        return os.path.join(os.path.dirname(output_file), f"{part_module}.mod")
 
-            with open(output_file, 'w') as file:
-                file.write(rapid_module)
+    def write_rapid_text(self, rapid_code: str, output_file: str, app_settings) -> None:
+        if rapid_code.lstrip().startswith("MODULE"):
+            if app_settings.get_conversion().moves_per_module > 0:
+                raise ValueError(ERROR_SPLIT_TABLE_TEXT)
+            self.write_rapid_module([rapid_code], output_file)
+        else:
+            self.write_rapid_file(rapid_code.splitlines(), output_file, app_settings)
+
+    def write_rapid_module(self, module_chunks: Iterable[str], output_file: str) -> None:
+        temp_file = f"{output_file}.tmp"
+        try:
+            with open(temp_file, 'w') as file:
+                file.writelines(module_chunks)
+            os.replace(temp_file, output_file)
             logging.info(f"RAPID code successfully written to {output_file}")
 
         except Exception as e:
             logging.error(f"Error writing RAPID file: {e}")
-            raise
\ No newline at end of file
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+    def convert_gcode_file(self, gcode_file: str, output_file: str, app_settings,
+                           converter: Optional[RAPIDConverter] = None,
+                           cache: Optional[ToolpathCache] = None, job: Optional[ConversionJob] = None) -> RAPIDConverter:
+        converter = job.converter if job is not None else converter or RAPIDConverter()
+        with GCodeReader(gcode_file) as reader:
+            toolpaths = job.iter_toolpaths(reader, cache) if job is not None else reader.iter_toolpaths(cache=cache)
+            self.convert_toolpaths(toolpaths, output_file, app_settings, converter)
+        return converter
+
+    def convert_toolpaths(self, toolpaths: Iterable[Toolpath], output_file: str, app_settings, converter: RAPIDConverter) -> None:
+        context = ConversionContext.from_settings(app_settings)
+        if context.uses_target_table:
+            moves = converter.plan_toolpaths(toolpaths, context)
+            converter.count_targets(moves)
+            self.write_table_module(moves, output_file, context)
+        else:
+            self.write_rapid_file(converter.iter_rapid_lines(toolpaths, context), output_file, context)
@@ -0,0 +1,45 @@
+import logging
+import time
+from typing import Optional
+
+STARTUP_BUDGET = 2.0
+
+
+class StartupTimer:
+    def __init__(self, budget: float = STARTUP_BUDGET):
+        self.budget = budget
+        self.started = time.perf_counter()
+        self.stages: list[tuple[str, float]] = []
+
+    def mark(self, stage: str) -> None:
+        self.stages.append((stage, time.perf_counter()))
+
+    def elapsed(self) -> float:
+        return (self.stages[-1][1] if self.stages else time.perf_counter()) - self.started
+
+    def format_report(self) -> str:
+        previous = self.started
+        parts = []
+        for stage, moment in self.stages:
+            parts.append(f"{stage} {moment - previous:.2f} s")
+            previous = moment
+        return f"Startup {self.elapsed():.2f} s ({', '.join(parts)})"
+
+    def report(self) -> None:
+        if self.elapsed() > self.budget:
+            logging.warning(f"{self.format_report()} exceeds the budget of {self.budget:.2f} s")
+        else:
+            logging.info(self.format_report())
+
+
+_startup_timer = None
+
+
+def start_startup_timer(budget: float = STARTUP_BUDGET) -> StartupTimer:
+    global _startup_timer
+    _startup_timer = StartupTimer(budget)
+    return _startup_timer
+
+
+def get_startup_timer() -> Optional[StartupTimer]:
+    return _startup_timer
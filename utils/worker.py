@@ -1,18 +1,148 @@
+import logging
 import threading
-from typing import Callable
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Union
+from core.Domain.conversion_context import ConversionContext
+from core.Domain.gcode_reader import GCodeReader
+from core.Domain.gcode_tokenizer import GCodeBuffer, GCodeTokenizer
 from core.Domain.rapid_converter import RAPIDConverter
+from core.Domain.toolpath_cache import ToolpathCache
 from core.model.app_settings import AppSettings
+from core.model.toolpath import RestartIndex, Toolpath
 
 
-def convert_async(gcode_text: str, settings: AppSettings, callback: Callable):
-    def worker():
+class ConversionCancelled(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class ConversionProgress:
+    lines: int
+    bytes_done: int
+    total_bytes: int
+    elapsed: float
+
+    @property
+    def fraction(self) -> float:
+        return min(self.bytes_done / self.total_bytes, 1.0) if self.total_bytes else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        if self.fraction <= 0.0:
+            return None
+        return self.elapsed * (1.0 - self.fraction) / self.fraction
+
+
+class ConversionJob:
+    PROGRESS_INTERVAL = 0.2
+
+    def __init__(self, converter: RAPIDConverter, callback: Callable, progress_callback: Optional[Callable] = None):
+        self.converter = converter
+        self.callback = callback
+        self.progress_callback = progress_callback
+        self.cancelled = threading.Event()
+        self.started = time.perf_counter()
+        self.reported = self.started
+        self.thread: Optional[threading.Thread] = None
+        converter.cancel_check = self.check_cancelled
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def check_cancelled(self) -> None:
+        if self.is_cancelled:
+            raise ConversionCancelled()
+
+    def start(self, work: Callable[[], str]) -> 'ConversionJob':
+        self.started = self.reported = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, args=(work,))
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def run(self, work: Callable[[], str]) -> None:
         try:
-            converter = RAPIDConverter()
-            rapid_code = converter.gcode_to_rapid(gcode_text, settings)
-            callback(rapid_code)
+            rapid_code = work()
+            positions = self.converter.get_move_positions()
+        except ConversionCancelled:
+            logging.info(f"Conversion cancelled after {time.perf_counter() - self.started:.2f} s")
+            return
         except Exception as e:
-            callback(f"Error during conversion: {e}")
+            rapid_code, positions = f"Error during conversion: {e}", None
+        finally:
+            if self.converter.cancel_check == self.check_cancelled:
+                self.converter.cancel_check = None
+        if not self.is_cancelled:
+            self.callback(rapid_code, positions)
+
+    def iter_toolpaths(self, reader: GCodeReader, cache: Optional[ToolpathCache] = None) -> Iterator[Toolpath]:
+        return self.iter_offset_blocks(reader.iter_offset_blocks(cache=cache), len(reader))
+
+    def iter_blocks(self, data: GCodeBuffer) -> Iterator[Toolpath]:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return self.iter_offset_blocks(GCodeTokenizer.iter_offset_blocks(data), len(data))
+
+    def iter_offset_blocks(self, blocks: Iterator[tuple[int, int, Toolpath]], total_bytes: int) -> Iterator[Toolpath]:
+        for offset, first_line, toolpath in blocks:
+            self.report(first_line - 1, offset, total_bytes)
+            yield toolpath
+
+    def report(self, lines: int, bytes_done: int, total_bytes: int) -> None:
+        now = time.perf_counter()
+        if self.progress_callback is None or now - self.reported < self.PROGRESS_INTERVAL:
+            return
+        self.reported = now
+        self.progress_callback(self, ConversionProgress(lines, bytes_done, total_bytes, now - self.started))
+
+
+def conversion_work(job: ConversionJob, gcode_source: Union[str, GCodeReader], context: ConversionContext,
+                    cache: Optional[ToolpathCache] = None) -> Callable[[], str]:
+    def worker():
+        if isinstance(gcode_source, GCodeReader):
+            with GCodeReader(gcode_source.file_path) as reader:
+                return job.converter.toolpaths_to_rapid(job.iter_toolpaths(reader, cache), context)
+        return job.converter.toolpaths_to_rapid(job.iter_blocks(gcode_source), context)
+
+    return worker
+
+
+def convert_async(gcode_source: Union[str, GCodeReader], settings: AppSettings, callback: Callable,
+                  cache: Optional[ToolpathCache] = None, converter: Optional[RAPIDConverter] = None,
+                  progress_callback: Optional[Callable] = None) -> ConversionJob:
+    context = ConversionContext.from_settings(settings)
+    job = ConversionJob(converter or RAPIDConverter(keep_history=True), callback, progress_callback)
+    return job.start(conversion_work(job, gcode_source, context, cache))
+
+
+def convert_range_async(gcode_source: Union[str, GCodeReader], settings: AppSettings, callback: Callable, first: int,
+                        last: Optional[int] = None, by_layer: bool = False, restart_index: Optional[RestartIndex] = None,
+                        converter: Optional[RAPIDConverter] = None, progress_callback: Optional[Callable] = None) -> ConversionJob:
+    context = ConversionContext.from_settings(settings)
+    converter = converter or RAPIDConverter(keep_history=True)
+    convert_range = converter.gcode_layers_to_rapid if by_layer else converter.gcode_range_to_rapid
+    job = ConversionJob(converter, callback, progress_callback)
+
+    def worker():
+        if isinstance(gcode_source, GCodeReader):
+            with GCodeReader(gcode_source.file_path) as reader:
+                return convert_range(reader, context, first, last, restart_index)
+        return convert_range(gcode_source, context, first, last, restart_index)
+
+    return job.start(worker)
+
 
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
+def reemit_async(converter: RAPIDConverter, settings: AppSettings, callback: Callable,
+                 progress_callback: Optional[Callable] = None) -> ConversionJob:
+    context = ConversionContext.from_settings(settings)
+    job = ConversionJob(converter, callback, progress_callback)
+    return job.start(lambda: converter.reemit_rapid(context))